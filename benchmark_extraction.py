@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import Dict, List
+
+from music_extraction import YDL_OPTIONS, create_extractor
+
+logging.basicConfig(level=logging.INFO,
+                   format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+QUERIES = [
+    "Perfect - Ed Sheeran", "Happy - Pharrell Williams", "Uptown Funk - Bruno Mars",
+    "Someone Like You - Adele", "Yesterday - The Beatles", "Waves - Mr Probz",
+    "Stay With Me - Sam Smith", "Eye of the Tiger - Survivor", "Thunderstruck - AC/DC",
+    "All Star - Smash Mouth", "River Flows in You - Yiruma", "Time - Hans Zimmer",
+    "Clocks - Coldplay", "The Scientist - Coldplay", "Good Vibrations - The Beach Boys",
+    "Say Something - A Great Big World", "Better Together - Jack Johnson",
+    "Sunday Morning - Maroon 5", "Stronger - Kanye West", "Can't Hold Us - Macklemore",
+]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+async def measure_lag(stop: asyncio.Event, samples: List[float], interval: float = 0.01):
+    """Record how late the event loop wakes from a short sleep: what a gateway heartbeat would feel"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def run_mode(mode: str, searches: int, workers: int, timeout: float) -> Dict[str, float]:
+    extractor = create_extractor(mode, YDL_OPTIONS, workers=workers, timeout=timeout)
+    started = time.perf_counter()
+    await extractor.warm()
+    warm_ms = (time.perf_counter() - started) * 1000
+
+    latencies: List[float] = []
+    failures = 0
+
+    async def search(query: str):
+        nonlocal failures
+        job_started = time.perf_counter()
+        try:
+            await extractor.extract_info(f"ytsearch5:{query}")
+            latencies.append((time.perf_counter() - job_started) * 1000)
+        except Exception as e:
+            failures += 1
+            logger.warning(f"[{mode}] {query}: {type(e).__name__}: {e}")
+
+    lag: List[float] = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop, lag))
+    started = time.perf_counter()
+    await asyncio.gather(*(search(QUERIES[i % len(QUERIES)]) for i in range(searches)))
+    wall_ms = (time.perf_counter() - started) * 1000
+    stop.set()
+    await lag_task
+    extractor.close()
+
+    return {
+        'warm_ms': warm_ms,
+        'wall_ms': wall_ms,
+        'p50_ms': percentile(latencies, 0.5),
+        'p95_ms': percentile(latencies, 0.95),
+        'failures': failures,
+        'lag_p50_ms': statistics.median(lag) if lag else 0.0,
+        'lag_p95_ms': percentile(lag, 0.95),
+        'lag_max_ms': max(lag, default=0.0),
+    }
+
+
+async def benchmark(modes: List[str], searches: int, workers: int, timeout: float):
+    results = {}
+    for mode in modes:
+        logger.info(f"=== {mode} backend: {searches} concurrent searches, {workers} workers ===")
+        result = await run_mode(mode, searches, workers, timeout)
+        results[mode] = result
+        logger.info(f"Warm-up: {result['warm_ms']:.0f}ms")
+        logger.info(f"Wall time: {result['wall_ms']:.0f}ms ({result['failures']} failed)")
+        logger.info(f"Search latency p50/p95: {result['p50_ms']:.0f}ms / {result['p95_ms']:.0f}ms")
+        logger.info(f"Event loop lag p50/p95/max: {result['lag_p50_ms']:.1f}ms / "
+                    f"{result['lag_p95_ms']:.1f}ms / {result['lag_max_ms']:.1f}ms")
+
+    if len(results) > 1:
+        logger.info("=== Summary ===")
+        for mode, result in results.items():
+            logger.info(f"{mode:>8}: wall {result['wall_ms']:.0f}ms, loop lag p95 {result['lag_p95_ms']:.1f}ms, "
+                        f"max {result['lag_max_ms']:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare thread and process yt-dlp extraction under concurrent searches")
+    parser.add_argument('--modes', nargs='+', default=['thread', 'process'], choices=['thread', 'process'])
+    parser.add_argument('--searches', type=int, default=20, help="Concurrent ytsearch5 searches per mode")
+    parser.add_argument('--workers', type=int, default=4, help="YoutubeDL instances or worker processes")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per-search timeout in seconds")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.modes, args.searches, args.workers, args.timeout))
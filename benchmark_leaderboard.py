@@ -0,0 +1,97 @@
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from bisect import bisect_right
+
+from rank_index import RankIndex
+
+logging.basicConfig(level=logging.INFO,
+                   format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def timed(label: str, func, repeat: int = 1):
+    """Run func repeat times and log the mean time per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    unit, scale = ('ms', 1000) if elapsed >= 0.001 else ('µs', 1_000_000)
+    logger.info(f"{label}: {elapsed * scale:.1f}{unit}")
+    return result
+
+
+def benchmark(users: int, lookups: int, max_xp: int, seed: int, verify: int):
+    rng = random.Random(seed)
+    # Skewed like real servers: most members have little XP, a few have a lot
+    scores = {str(100000000000000000 + i): int(rng.paretovariate(1.2) * 10) % max_xp for i in range(users)}
+    user_ids = list(scores)
+    sample = [rng.choice(user_ids) for _ in range(lookups)]
+
+    logger.info(f"=== In-memory rank index, {users} users ===")
+    index = timed("Build", lambda: RankIndex(scores))
+    timed("Top 10", lambda: index.top(10), repeat=100)
+    it = iter(sample * 2)
+    timed("Rank lookup", lambda: index.rank(next(it)), repeat=lookups)
+    it = iter(sample * 2)
+    timed("XP update", lambda: index.add(next(it), 10), repeat=lookups)
+
+    logger.info(f"=== SQLite guild_xp with (guild_id, xp DESC) index, {users} users ===")
+    with tempfile.TemporaryDirectory() as directory:
+        conn = sqlite3.connect(os.path.join(directory, 'bench.db'))
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE guild_xp (
+                guild_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                xp INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, user_id)
+            )
+        ''')
+        conn.execute('CREATE INDEX idx_guild_xp_rank ON guild_xp(guild_id, xp DESC)')
+        with conn:
+            conn.executemany('INSERT INTO guild_xp VALUES (?, ?, ?)',
+                             (('1', user_id, xp) for user_id, xp in scores.items()))
+
+        timed("Top 10 (ORDER BY xp DESC LIMIT 10)", lambda: conn.execute(
+            "SELECT user_id, xp FROM guild_xp WHERE guild_id = '1' ORDER BY xp DESC LIMIT 10"
+        ).fetchall(), repeat=100)
+
+        it = iter(sample)
+
+        def sql_rank():
+            xp = conn.execute("SELECT xp FROM guild_xp WHERE guild_id = '1' AND user_id = ?",
+                              (next(it),)).fetchone()[0]
+            return conn.execute("SELECT COUNT(*) + 1 FROM guild_xp WHERE guild_id = '1' AND xp > ?",
+                                (xp,)).fetchone()[0]
+        timed("Rank lookup (COUNT(*) over index)", sql_rank, repeat=min(lookups, 200))
+        timed("Load for rank index", lambda: conn.execute(
+            "SELECT user_id, xp FROM guild_xp WHERE guild_id = '1'"
+        ).fetchall())
+        conn.close()
+
+    # Spot-check the index against a full sort: the top 10 plus a sample of individual ranks
+    ranked = sorted(index.scores.items(), key=lambda item: (-item[1], item[0]))
+    if index.top(10) != ranked[:10]:
+        raise ValueError("Top 10 from the rank index does not match a full sort")
+    ordered = sorted(index.scores.values())
+    for user_id in rng.sample(user_ids, min(verify, users)):
+        expected = len(ordered) - bisect_right(ordered, index.scores[user_id]) + 1
+        if index.rank(user_id) != expected:
+            raise ValueError(f"Rank mismatch for {user_id}: {index.rank(user_id)} != {expected}")
+    logger.info(f"Rank index verified against a full sort ({min(verify, users)} sampled ranks)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard rank lookups on synthetic users")
+    parser.add_argument('--users', type=int, default=1_000_000, help="Number of synthetic users")
+    parser.add_argument('--lookups', type=int, default=10_000, help="Rank lookups and updates to time")
+    parser.add_argument('--max-xp', type=int, default=1_000_000, help="Upper bound for synthetic XP")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--verify', type=int, default=1000, help="Random users whose rank is checked against a full sort")
+    args = parser.parse_args()
+    benchmark(args.users, args.lookups, args.max_xp, args.seed, args.verify)
@@ -5,10 +5,14 @@ from typing import Dict, List, Set
 import json
 import os
 from datetime import datetime
-import sqlite3
 import asyncio
 import os
 from utils.badge_generator import AchievementBadgeGenerator
+from utils.database import get_database
+from utils.migrations import migrate
+from rank_index import GuildLeaderboards
+from xp_accumulator import XPAccumulator
+from xp_ledger import XPLedger
 
 class Achievement:
     def __init__(self, id: str, name: str, description: str, emoji: str, points: int, role_name: str = None, secret: bool = False, required_count: int = None):
@@ -26,7 +30,10 @@ class Achievements(commands.Cog):
         self.bot = bot
         self.logger = logging.getLogger('discord_bot')
         self.xp_cooldown = {}
-        self.setup_database()
+        self.db = get_database(bot)
+        self.xp = XPAccumulator(self.db, self.calculate_level)
+        self.leaderboards = GuildLeaderboards(self.db, self.xp)
+        self.ledger = XPLedger(self.db)
         # Ensure static directories exist
         os.makedirs('static/css', exist_ok=True)
         os.makedirs('static/badges', exist_ok=True)
@@ -249,54 +256,35 @@ class Achievements(commands.Cog):
                 required_count=3
             )
         }
-        self.user_achievements = {}
-        self.load_achievements()
+        self.user_achievements: Dict[str, Set[str]] = {}  # user_id -> unlocked ids, filled lazily
         self.badge_generator = AchievementBadgeGenerator()
         self.setup_badges()
         self.logger.info("Achievements system initialized")
 
-    def setup_database(self):
-        """Initialize SQLite database for XP and achievement progress"""
-        try:
-            os.makedirs('data', exist_ok=True)
-            self.db = sqlite3.connect('data/user_data.db')
-            cursor = self.db.cursor()
-
-            # Create XP table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_xp (
-                    user_id TEXT PRIMARY KEY,
-                    xp INTEGER DEFAULT 0,
-                    level INTEGER DEFAULT 1,
-                    last_xp_gain TIMESTAMP
-                )
-            ''')
-
-            # Create achievement progress table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS achievement_progress (
-                    user_id TEXT,
-                    achievement_id TEXT,
-                    current_count INTEGER DEFAULT 0,
-                    completed BOOLEAN DEFAULT 0,
-                    completion_date TIMESTAMP,
-                    PRIMARY KEY (user_id, achievement_id)
-                )
-            ''')
+    async def cog_load(self):
+        await self.setup_database()
+        await self.ledger.start()
+        await self.xp.start()
 
-            self.db.commit()
+    async def cog_unload(self):
+        await self.xp.stop()
+        await self.ledger.stop()
+
+    async def setup_database(self):
+        """Bring the shared schema up to date, then import any old JSON awards"""
+        try:
+            await migrate(self.db)
+            await self.migrate_achievements_json()
             self.logger.info("Database initialized successfully")
         except Exception as e:
             self.logger.error(f"Error setting up database: {str(e)}")
 
     async def get_achievement_progress(self, user_id: str, achievement_id: str) -> tuple:
         """Get current progress for an achievement"""
-        cursor = self.db.cursor()
-        cursor.execute(
+        result = await self.db.fetchone(
             'SELECT current_count, completed FROM achievement_progress WHERE user_id = ? AND achievement_id = ?',
             (user_id, achievement_id)
         )
-        result = cursor.fetchone()
         if result:
             return result[0], bool(result[1])
         return 0, False
@@ -309,13 +297,11 @@ class Achievements(commands.Cog):
 
             if not completed:
                 new_count = current_count + count
-                cursor = self.db.cursor()
-                cursor.execute('''
+                await self.db.execute('''
                     INSERT OR REPLACE INTO achievement_progress 
                     (user_id, achievement_id, current_count, completed, completion_date)
                     VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
                 ''', (user_id, achievement_id, new_count, new_count >= achievement.required_count))
-                self.db.commit()
 
                 # Check if achievement is now completed
                 if new_count >= achievement.required_count and not completed:
@@ -366,11 +352,13 @@ class Achievements(commands.Cog):
                 "🌟 Community": []
             }
 
+            unlocked = await self.get_user_achievements(user_id)
             for achievement_id, achievement in self.achievements.items():
-                if achievement.secret and achievement_id not in self.user_achievements.get(user_id, []):
+                if achievement.secret and achievement_id not in unlocked:
                     continue
 
-                current_count, completed = await self.get_achievement_progress(user_id, achievement_id)
+                current_count, _ = await self.get_achievement_progress(user_id, achievement_id)
+                completed = achievement_id in unlocked
 
                 if completed:
                     total_points += achievement.points
@@ -430,13 +418,17 @@ class Achievements(commands.Cog):
     async def award_achievement(self, user_id: str, achievement_id: str, guild: discord.Guild = None):
         """Award an achievement to a user in a specific guild"""
         try:
-            if user_id not in self.user_achievements:
-                self.user_achievements[user_id] = []
+            # Cheap repeat check from the cache; the primary key settles concurrent awards
+            if achievement_id in await self.get_user_achievements(user_id):
+                return False
 
-            if achievement_id not in self.user_achievements[user_id]:
+            result = await self.db.execute(
+                'INSERT OR IGNORE INTO user_achievements (user_id, achievement_id) VALUES (?, ?)',
+                (user_id, achievement_id)
+            )
+            self.user_achievements[user_id].add(achievement_id)
+            if result.rowcount:
                 achievement = self.achievements[achievement_id]
-                self.user_achievements[user_id].append(achievement_id)
-                self.save_achievements()
 
                 # Create congratulatory message with sparkle effects
                 embed = discord.Embed(
@@ -488,25 +480,47 @@ class Achievements(commands.Cog):
             self.logger.error(f"Error awarding achievement role: {str(e)}")
 
 
-    def load_achievements(self):
-        """Load saved user achievements from file"""
-        try:
-            if os.path.exists('data/achievements.json'):
-                with open('data/achievements.json', 'r') as f:
-                    self.user_achievements = json.load(f)
-            self.logger.info("Successfully loaded user achievements")
-        except Exception as e:
-            self.logger.error(f"Error loading achievements: {str(e)}")
+    async def get_user_achievements(self, user_id: str) -> Set[str]:
+        """Return the achievement ids a user has unlocked, loading them once into the cache"""
+        unlocked = self.user_achievements.get(user_id)
+        if unlocked is None:
+            rows = await self.db.fetchall(
+                'SELECT achievement_id FROM user_achievements WHERE user_id = ?', (user_id,)
+            )
+            # A concurrent caller may have filled the cache while we were waiting
+            unlocked = self.user_achievements.setdefault(user_id, {row[0] for row in rows})
+        return unlocked
+
+    def _import_awards(self, conn, awards: List[tuple]):
+        conn.executemany(
+            'INSERT OR IGNORE INTO user_achievements (user_id, achievement_id) VALUES (?, ?)', awards
+        )
+        # Completed progress rows were the other record of an award; fold them in too
+        conn.execute('''
+            INSERT OR IGNORE INTO user_achievements (user_id, achievement_id, awarded_at)
+            SELECT user_id, achievement_id, COALESCE(completion_date, CURRENT_TIMESTAMP)
+            FROM achievement_progress WHERE completed = 1
+        ''')
+
+    async def migrate_achievements_json(self, path: str = 'data/achievements.json'):
+        """One-time import of the old JSON award file into user_achievements"""
+        if not os.path.exists(path):
+            return
+
+        def read():
+            with open(path, 'r') as f:
+                return json.load(f)
 
-    def save_achievements(self):
-        """Save user achievements to file"""
         try:
-            os.makedirs('data', exist_ok=True)
-            with open('data/achievements.json', 'w') as f:
-                json.dump(self.user_achievements, f)
-            self.logger.info("Successfully saved user achievements")
+            saved = await asyncio.to_thread(read)
+            awards = [(str(user_id), achievement_id)
+                      for user_id, achievement_ids in saved.items()
+                      for achievement_id in achievement_ids]
+            await self.db.transaction(lambda conn: self._import_awards(conn, awards))
+            os.replace(path, path + '.migrated')
+            self.logger.info(f"Migrated {len(awards)} achievements from {path}")
         except Exception as e:
-            self.logger.error(f"Error saving achievements: {str(e)}")
+            self.logger.error(f"Error migrating achievements: {str(e)}")
 
     async def setup_achievement_roles(self, guild: discord.Guild):
         """Create achievement roles if they don't exist"""
@@ -618,8 +632,8 @@ class Achievements(commands.Cog):
         """Calculate XP needed for a specific level"""
         return ((level - 1) ** 2) * 100
 
-    async def add_xp(self, user_id: str, xp_amount: int = 10):
-        """Add XP to user with cooldown"""
+    async def add_xp(self, user_id: str, xp_amount: int = 10, guild_id: str = None):
+        """Add XP to user with cooldown, counting it towards the guild's leaderboard too"""
         try:
             current_time = datetime.now()
             if user_id in self.xp_cooldown:
@@ -627,31 +641,8 @@ class Achievements(commands.Cog):
                     return
 
             self.xp_cooldown[user_id] = current_time
-            cursor = self.db.cursor()
-
-            # Get current XP and level
-            cursor.execute('SELECT xp, level FROM user_xp WHERE user_id = ?', (user_id,))
-            result = cursor.fetchone()
-
-            if result:
-                current_xp, current_level = result
-                new_xp = current_xp + xp_amount
-            else:
-                current_xp, current_level = 0, 1
-                new_xp = xp_amount
-                cursor.execute('INSERT INTO user_xp (user_id, xp, level) VALUES (?, ?, ?)',
-                             (user_id, new_xp, current_level))
-
-            new_level = self.calculate_level(new_xp)
-
-            # Update database
-            cursor.execute('''
-                UPDATE user_xp 
-                SET xp = ?, level = ?, last_xp_gain = CURRENT_TIMESTAMP 
-                WHERE user_id = ?
-            ''', (new_xp, new_level, user_id))
-
-            self.db.commit()
+            # The accumulator also passes the guild's share on to self.leaderboards
+            current_level, new_level = await self.xp.add(user_id, xp_amount, guild_id)
 
             # Handle level up
             if new_level > current_level:
@@ -688,7 +679,7 @@ class Achievements(commands.Cog):
         user_id = str(message.author.id)
         try:
             # Add XP for message
-            await self.add_xp(user_id)
+            await self.add_xp(user_id, guild_id=str(message.guild.id) if message.guild else None)
 
             # Track AI interactions
             if message.content.startswith('!ask') or message.content.startswith('!chat'):
@@ -768,9 +759,9 @@ class Achievements(commands.Cog):
         """Show user's current level and XP progress"""
         try:
             target = member or ctx.author
-            cursor = self.db.cursor()
-            cursor.execute('SELECT xp, level FROM user_xp WHERE user_id = ?', (str(target.id),))
-            result = cursor.fetchone()
+            result = self.xp.totals.get(str(target.id))
+            if result is None:
+                result = await self.db.fetchone('SELECT xp, level FROM user_xp WHERE user_id = ?', (str(target.id),))
 
             if result:
                 xp, level = result
@@ -802,39 +793,109 @@ class Achievements(commands.Cog):
             await ctx.send("❌ An error occurred while fetching level information.")
 
     @commands.command(name='leaderboard')
-    async def show_leaderboard(self, ctx):
-        """Show XP leaderboard"""
+    async def show_leaderboard(self, ctx, period: str = None):
+        """Show this server's XP leaderboard (all time, or this week/month) and your own rank"""
         try:
-            cursor = self.db.cursor()
-            cursor.execute('''
-                SELECT user_id, xp, level 
-                FROM user_xp 
-                ORDER BY xp DESC 
-                LIMIT 10
-            ''')
-            results = cursor.fetchall()
-
-            if results:
-                embed = discord.Embed(
-                    title="🏆 XP Leaderboard",
-                    color=discord.Color.gold()
-                )
+            if ctx.guild is None:
+                await self.show_global_leaderboard(ctx)
+                return
+            if period:
+                period = period.lower()
+                if period not in ('day', 'week', 'month'):
+                    await ctx.send("❓ Usage: `!leaderboard [day|week|month]`")
+                    return
+                await self.show_period_leaderboard(ctx, period)
+                return
 
-                leaderboard_text = ""
-                for i, (user_id, xp, level) in enumerate(results, 1):
-                    member = ctx.guild.get_member(int(user_id))
-                    name = member.display_name if member else "Unknown User"
-                    leaderboard_text += f"{i}. {name} - Level {level} ({xp} XP)\n"
+            board = await self.leaderboards.get(str(ctx.guild.id))
+            results = board.top(10)
+            if not results:
+                await ctx.send("No XP data available yet!")
+                return
 
-                embed.description = f"```\n{leaderboard_text}```"
-                await ctx.send(embed=embed)
+            embed = discord.Embed(
+                title=f"🏆 XP Leaderboard - {ctx.guild.name}",
+                color=discord.Color.gold()
+            )
+
+            leaderboard_text = ""
+            for user_id, xp in results:
+                member = ctx.guild.get_member(int(user_id))
+                name = member.display_name if member else "Unknown User"
+                leaderboard_text += f"{board.rank(user_id)}. {name} - {xp} XP\n"
+            embed.description = f"```\n{leaderboard_text}```"
+
+            rank = board.rank(str(ctx.author.id))
+            if rank:
+                embed.set_footer(text=f"Your rank: #{rank} of {len(board)} ({board.scores[str(ctx.author.id)]} XP)")
             else:
-                await ctx.send("No XP data available yet!")
+                embed.set_footer(text="You haven't earned XP in this server yet!")
+            await ctx.send(embed=embed)
 
         except Exception as e:
             self.logger.error(f"Error showing leaderboard: {str(e)}")
             await ctx.send("❌ Anerror occurred while fetching the leaderboard.")
 
+    async def show_period_leaderboard(self, ctx, period: str):
+        """Top 10 for the current day, week or month, read from the ledger's rollups"""
+        # Bring the rollups up to date; this only folds in events since the last rollup
+        await self.xp.flush()
+        await self.ledger.rollup()
+
+        guild_id = str(ctx.guild.id)
+        results = await self.ledger.top(guild_id, period)
+        if not results:
+            await ctx.send(f"No XP earned this {period} yet!")
+            return
+
+        titles = {'day': "Today", 'week': "This Week", 'month': "This Month"}
+        embed = discord.Embed(
+            title=f"🏆 XP Leaderboard - {titles[period]}",
+            color=discord.Color.gold()
+        )
+
+        leaderboard_text = ""
+        for i, (user_id, xp) in enumerate(results, 1):
+            member = ctx.guild.get_member(int(user_id))
+            name = member.display_name if member else "Unknown User"
+            leaderboard_text += f"{i}. {name} - {xp} XP\n"
+        embed.description = f"```\n{leaderboard_text}```"
+
+        own = await self.ledger.rank(guild_id, period, str(ctx.author.id))
+        if own:
+            embed.set_footer(text=f"Your rank: #{own[0]} ({own[1]} XP)")
+        else:
+            embed.set_footer(text=f"You haven't earned XP this {period} yet!")
+        await ctx.send(embed=embed)
+
+    async def show_global_leaderboard(self, ctx):
+        """Top 10 by total XP across all servers, used outside of a guild"""
+        # Write pending XP first so the ranking includes recent messages
+        await self.xp.flush()
+        results = await self.db.fetchall('''
+            SELECT user_id, xp, level 
+            FROM user_xp 
+            ORDER BY xp DESC 
+            LIMIT 10
+        ''')
+
+        if not results:
+            await ctx.send("No XP data available yet!")
+            return
+
+        embed = discord.Embed(
+            title="🏆 XP Leaderboard",
+            color=discord.Color.gold()
+        )
+
+        leaderboard_text = ""
+        for i, (user_id, xp, level) in enumerate(results, 1):
+            user = self.bot.get_user(int(user_id))
+            name = user.display_name if user else "Unknown User"
+            leaderboard_text += f"{i}. {name} - Level {level} ({xp} XP)\n"
+
+        embed.description = f"```\n{leaderboard_text}```"
+        await ctx.send(embed=embed)
 
 async def setup(bot):
     await bot.add_cog(Achievements(bot))
\ No newline at end of file
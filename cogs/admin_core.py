@@ -67,5 +67,182 @@ class AdminCore(commands.Cog):
         )
         await ctx.send(embed=ping_embed)
 
+    @commands.command(name='aistats')
+    @commands.has_permissions(administrator=True)
+    async def ai_stats(self, ctx):
+        """Show AI provider queue depth and latency"""
+        llm = getattr(self.bot, 'llm', None)
+        if not llm:
+            await ctx.send("❌ AI gateway is not available.")
+            return
+
+        stats = llm.stats()
+        embed = discord.Embed(
+            title="🤖 AI Gateway Stats",
+            color=discord.Color.blue()
+        )
+        for provider, provider_stats in stats.items():
+            if provider in ('loop_lag', 'coalescing'):
+                continue
+            embed.add_field(
+                name=provider.capitalize(),
+                value=(
+                    f"```\nQueued: {provider_stats['queue_depth']}\n"
+                    f"In flight: {provider_stats['in_flight']}\n"
+                    f"Requests: {provider_stats['requests']} ({provider_stats['errors']} errors)\n"
+                    f"p50/p95: {provider_stats['p50_latency']:.2f}s / {provider_stats['p95_latency']:.2f}s```"
+                ),
+                inline=True
+            )
+
+        coalescing = stats['coalescing']
+        embed.add_field(
+            name="Request Coalescing",
+            value=f"```\nUpstream calls: {coalescing['leaders']}\nShared: {coalescing['followers']}```",
+            inline=False
+        )
+
+        cache = getattr(self.bot, 'response_cache', None)
+        if cache:
+            cache_stats = cache.stats()
+            embed.add_field(
+                name="Response Cache",
+                value=(
+                    f"```\nHit rate: {cache_stats['hit_rate']:.1%}\n"
+                    f"Memory/disk hits: {cache_stats['memory_hits']}/{cache_stats['disk_hits']}\n"
+                    f"Misses: {cache_stats['misses']}```"
+                ),
+                inline=False
+            )
+
+        education = self.bot.get_cog('EducationManager')
+        if education:
+            gen_stats = education.question_generator.stats()
+            pool_stats = education.question_pool.stats()
+            embed.add_field(
+                name="Question Generation",
+                value=(
+                    f"```\nQuestions/call: {gen_stats['questions_per_call']:.1f}\n"
+                    f"Questions/sec: {gen_stats['questions_per_second']:.2f}\n"
+                    f"Repaired/failed parses: {gen_stats['repaired']}/{gen_stats['parse_failures']}\n"
+                    f"Pool hit rate: {pool_stats['hit_rate']:.1%} ({pool_stats['buffered']} buffered)\n"
+                    f"Circuit: {gen_stats['breaker']['state']} ({gen_stats['breaker']['trips']} trips)```"
+                ),
+                inline=False
+            )
+
+        lag = stats['loop_lag']
+        embed.add_field(
+            name="Event Loop Lag (under AI load)",
+            value=f"```\np50: {lag['p50_ms']:.1f}ms\np95: {lag['p95_ms']:.1f}ms\nmax: {lag['max_ms']:.1f}ms```",
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name='dbstats')
+    @commands.has_permissions(administrator=True)
+    async def db_stats(self, ctx):
+        """Show the shared database's write queue, slowest queries and XP write batching"""
+        db = getattr(self.bot, 'db', None)
+        if not db:
+            await ctx.send("❌ Database is not available.")
+            return
+
+        db_stats = db.stats()
+        embed = discord.Embed(
+            title="🗄️ Database Stats",
+            color=discord.Color.blue()
+        )
+        slowest = '\n'.join(
+            f"{query['avg_ms']:.1f}ms avg x{query['count']}: {query['sql'][:40]}"
+            for query in db_stats['slowest'][:3]
+        ) or 'No queries yet'
+        embed.add_field(
+            name="Database",
+            value=f"```\nWrite queue: {db_stats['write_queue']}\nQueries: {db_stats['queries']}\n{slowest}```",
+            inline=False
+        )
+
+        achievements = self.bot.get_cog('Achievements')
+        if achievements:
+            xp_stats = achievements.xp.stats()
+            embed.add_field(
+                name="XP Writes",
+                value=(
+                    f"```\nMessages/sec: {xp_stats['messages_per_second']:.2f}\n"
+                    f"Pending users: {xp_stats['pending']}\n"
+                    f"Batches: {xp_stats['batches']} (avg {xp_stats['avg_flush_ms']:.1f}ms)```"
+                ),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    @commands.command(name='musicstats')
+    @commands.has_permissions(administrator=True)
+    async def music_stats(self, ctx):
+        """Show music search cache, stream URL and extraction worker stats"""
+        music = self.bot.get_cog('MusicCommands')
+        if not music:
+            await ctx.send("❌ Music commands are not loaded.")
+            return
+
+        search_stats = music.search_cache.stats()
+        stream_stats = music.streams.stats()
+        extractor_stats = music.extractor.stats()
+        embed = discord.Embed(
+            title="🎵 Music Stats",
+            color=discord.Color.blue()
+        )
+        embed.add_field(
+            name="Search Cache",
+            value=(
+                f"```\nHit rate: {search_stats['hit_rate']:.1%} "
+                f"({search_stats['memory_hits']} memory / {search_stats['db_hits']} db / {search_stats['misses']} miss)\n"
+                f"Avg hit: {search_stats['avg_hit_ms']:.2f}ms\n"
+                f"Entries in memory: {search_stats['entries']}```"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Stream URLs",
+            value=(
+                f"```\nCached: {stream_stats['cached']}\n"
+                f"Extracted: {stream_stats['extractions']} ({stream_stats['failures']} failed)\n"
+                f"Refreshed: {stream_stats['refreshes']}\nCache hits: {stream_stats['hits']}```"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name=f"Extraction ({extractor_stats['mode']} x{extractor_stats['workers']})",
+            value=(
+                f"```\nJobs: {extractor_stats['jobs']} (avg {extractor_stats['avg_ms']:.0f}ms)\n"
+                f"Timeouts: {extractor_stats['timeouts']}\nFailures: {extractor_stats['failures']}```"
+            ),
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name='aicache')
+    @commands.has_permissions(administrator=True)
+    async def ai_cache(self, ctx, action: str = 'stats', command: str = None):
+        """View or clear the AI response cache (optionally for one command)"""
+        cache = getattr(self.bot, 'response_cache', None)
+        if not cache:
+            await ctx.send("❌ Response cache is not available.")
+            return
+
+        if action.lower() == 'clear':
+            removed = await cache.invalidate(command=command)
+            target = f"`{command}`" if command else "all commands"
+            await ctx.send(f"🧹 Cleared {removed} cached responses for {target}.")
+            return
+
+        cache_stats = cache.stats()
+        await ctx.send(
+            f"📦 Cache hit rate: {cache_stats['hit_rate']:.1%} "
+            f"({cache_stats['memory_hits']} memory, {cache_stats['disk_hits']} disk, "
+            f"{cache_stats['misses']} misses, {cache_stats['memory_entries']} in memory)"
+        )
+
 async def setup(bot):
     await bot.add_cog(AdminCore(bot))
@@ -4,12 +4,12 @@ import logging
 import re
 import random
 import os
-from openai import OpenAI
-import google.generativeai as genai
 import base64
 from io import BytesIO
 from typing import Optional
 import asyncio
+from utils.llm_gateway import get_gateway
+from utils.response_cache import get_response_cache
 
 class AIChatCommands(commands.Cog):
     """AI-powered chat commands for educational assistance"""
@@ -19,17 +19,9 @@ class AIChatCommands(commands.Cog):
         self.logger = logging.getLogger('discord_bot')
         self.ai_channel_id = 1340150404775940210  # AI commands channel
 
-        # Initialize OpenAI
-        self.openai = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-        # Initialize Google Gemini
-        try:
-            genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-            self.gemini = genai.GenerativeModel('gemini-pro')
-            self.gemini_vision = genai.GenerativeModel('gemini-pro-vision')
-            self.logger.info("Successfully initialized Gemini models")
-        except Exception as e:
-            self.logger.error(f"Failed to initialize Gemini: {str(e)}")
+        # Shared LLM gateway (Gemini and OpenAI)
+        self.llm = get_gateway(bot)
+        self.response_cache = get_response_cache(bot)
 
     async def _check_channel(self, ctx):
         """Check if command is used in the AI chat channel"""
@@ -117,8 +109,8 @@ class AIChatCommands(commands.Cog):
                • Best practices
             """
 
-            response = self.gemini.generate_content(prompt)
-            if not response or not response.text:
+            response = await self.llm.generate('legacy_chat', prompt, lane='chat')
+            if not response:
                 await loading_msg.edit(content="❌ Failed to analyze code. Please try again.")
                 return
 
@@ -127,7 +119,7 @@ class AIChatCommands(commands.Cog):
                 color=discord.Color.blue()
             )
 
-            content = response.text
+            content = response
             sections = content.split('\n\n')
 
             for section in sections:
@@ -189,8 +181,12 @@ class AIChatCommands(commands.Cog):
             • [Common mistakes to avoid]
             """
 
-            response = self.gemini.generate_content(prompt)
-            if not response or not response.text:
+            model = self.llm.resolve('legacy_chat')[1]
+            response = await self.response_cache.get('solve', model, problem)
+            if not response:
+                response = await self.llm.generate('legacy_chat', prompt, lane='chat')
+                await self.response_cache.set('solve', model, problem, response)
+            if not response:
                 await loading_msg.edit(content="❌ Failed to solve the problem. Please try again.")
                 return
 
@@ -200,7 +196,7 @@ class AIChatCommands(commands.Cog):
                 color=discord.Color.blue()
             )
 
-            content = response.text
+            content = response
             sections = content.split('\n\n')
 
             for section in sections:
@@ -249,22 +245,21 @@ class AIChatCommands(commands.Cog):
 
         try:
             # Using GPT-4 for superior code generation
-            response = self.openai.chat.completions.create(
-                model="gpt-4",
-                messages=[
+            code_response = await self.llm.generate(
+                'code',
+                [
                     {"role": "system", "content": "You are an expert programmer. Generate clean, well-documented code with explanations."},
                     {"role": "user", "content": f"Generate code for: {prompt}. Include comments and explanation."}
                 ],
+                lane='chat',
                 temperature=0.7,
                 max_tokens=1500
             )
 
-            if not response.choices:
+            if not code_response:
                 await loading_msg.edit(content="❌ Code generation failed. Please try again.")
                 return
 
-            code_response = response.choices[0].message.content
-
             # Split into code and explanation
             parts = code_response.split('\n\n')
             code = ""
@@ -331,9 +326,9 @@ class AIChatCommands(commands.Cog):
             3. Any cultural notes or context
             """
 
-            response = self.gemini.generate_content(prompt)
+            response = await self.llm.generate('legacy_chat', prompt, lane='chat')
 
-            if not response or not response.text:
+            if not response:
                 await loading_msg.edit(content="❌ Translation failed. Please try again.")
                 return
 
@@ -348,7 +343,7 @@ class AIChatCommands(commands.Cog):
                 inline=False
             )
 
-            translation_text = response.text
+            translation_text = response
             sections = translation_text.split('\n\n')
 
             for section in sections:
@@ -388,11 +383,11 @@ class AIChatCommands(commands.Cog):
 
         async with ctx.typing():
             try:
-                response = self.gemini.generate_content(question)
-                if response and response.text:
+                response = await self.llm.generate('legacy_chat', question, lane='chat')
+                if response:
                     embed = discord.Embed(
                         title="🤔 Answer",
-                        description=response.text[:4096],
+                        description=response[:4096],
                         color=discord.Color.blue()
                     )
                     embed.set_footer(text="💡 Tip: Use !explain for more detailed explanations")
@@ -433,9 +428,9 @@ class AIChatCommands(commands.Cog):
             [List related topics]
             """
 
-            response = self.gemini.generate_content(prompt)
+            response = await self.llm.generate('legacy_chat', prompt, lane='chat')
 
-            if not response or not response.text:
+            if not response:
                 await loading_msg.edit(content="❌ Explanation failed. Please try again.")
                 return
 
@@ -444,7 +439,7 @@ class AIChatCommands(commands.Cog):
                 color=discord.Color.blue()
             )
 
-            content = response.text
+            content = response
             sections = content.split('\n\n')
 
             for section in sections:
@@ -522,9 +517,9 @@ class AIChatCommands(commands.Cog):
             • Relevant citations
             """
 
-            response = self.gemini.generate_content(prompt)
+            response = await self.llm.generate('legacy_chat', prompt, lane='chat')
 
-            if not response or not response.text:
+            if not response:
                 await loading_msg.edit(content="❌ Failed to generate essay outline. Please try again.")
                 return
 
@@ -534,7 +529,7 @@ class AIChatCommands(commands.Cog):
                 color=discord.Color.blue()
             )
 
-            content = response.text
+            content = response
             sections = content.split('\n\n')
 
             for section in sections:
@@ -612,9 +607,9 @@ class AIChatCommands(commands.Cog):
             {topic2}: [cases]
             """
 
-            response = self.gemini.generate_content(prompt)
+            response = await self.llm.generate('legacy_chat', prompt, lane='chat')
 
-            if not response or not response.text:
+            if not response:
                 await loading_msg.edit(content="❌ Comparison failed. Please try again.")
                 return
 
@@ -623,7 +618,7 @@ class AIChatCommands(commands.Cog):
                 color=discord.Color.blue()
             )
 
-            content = response.text
+            content = response
             sections = content.split('\n\n')
 
             for section in sections:
@@ -701,13 +696,13 @@ class AIChatCommands(commands.Cog):
             • [Point 3]
             """
 
-            response = self.gemini.generate_content(prompt)
+            response = await self.llm.generate('legacy_chat', prompt, lane='chat')
 
-            if not response or not response.text:
+            if not response:
                 await loading_msg.edit(content="❌ No response received. Please try again.")
                 return
 
-            content = response.text
+            content = response
             try:
                 supporting = content.split('Supporting Arguments:')[1].split('Opposing Arguments:')[0].strip()
                 opposing = content.split('Opposing Arguments:')[1].strip()
@@ -765,22 +760,23 @@ class AIChatCommands(commands.Cog):
 
             try:
                 # Generate image analysis using Gemini Vision
-                response = await asyncio.to_thread(
-                    self.gemini_vision.generate_content,
+                response = await self.llm.generate(
+                    'legacy_vision',
                     [
                         "Analyze this image in detail. If it contains text, read and explain it. If it's a meme, explain its context and humor. If it's educational content, provide an explanation.",
                         {"mime_type": attachment.content_type, "data": image_data}
-                    ]
+                    ],
+                    lane='chat'
                 )
 
-                if not response or not response.text:
+                if not response:
                     await loading_msg.edit(content="❌ Failed to analyze the image. Please try again.")
                     return
 
                 # Create embed with analysis
                 embed = discord.Embed(
                     title="🖼️ Image Analysis",
-                    description=response.text[:4096],  # Discord's limit
+                    description=response[:4096],  # Discord's limit
                     color=discord.Color.blue()
                 )
 
@@ -2,15 +2,87 @@ import discord
 from discord.ext import commands
 import logging
 import os
-import google.generativeai as genai
-from typing import Optional
+import time
+from typing import Callable, List, Optional
 import base64
 from io import BytesIO
+from utils.llm_gateway import get_gateway
+from utils.response_cache import get_response_cache
+
+EMBED_DESCRIPTION_LIMIT = 4090  # Discord allows 4096; leave room for the typing cursor
+STREAM_EDIT_INTERVAL = 1.2  # Seconds between message edits, well inside Discord's edit rate limit
+STREAM_ABORTED_NOTE = "\n\n⚠️ *The answer was cut off by an error.*"
+
+
+class StreamingEmbedWriter:
+    """Render streamed text into one or more embeds as it arrives"""
+
+    def __init__(self, ctx, make_embed: Callable[[int], discord.Embed],
+                 limit: int = EMBED_DESCRIPTION_LIMIT, interval: float = STREAM_EDIT_INTERVAL):
+        self.ctx = ctx
+        self.make_embed = make_embed
+        self.limit = limit
+        self.interval = interval
+        self.pages: List[str] = [""]
+        self.text = ""
+        self.message = None
+        self.last_edit = 0.0
+        self.started = time.monotonic()
+        self.first_message_after: Optional[float] = None
+
+    async def feed(self, chunk: str):
+        """Append a chunk; the first chunk is sent immediately, later ones on a cadence"""
+        self.text += chunk
+        self.pages[-1] += chunk
+        if (self.message is None
+                or len(self.pages[-1]) > self.limit
+                or time.monotonic() - self.last_edit >= self.interval):
+            await self._render()
+
+    async def finish(self) -> str:
+        """Render the final state without the typing cursor and return the full text"""
+        await self._render(final=True)
+        return self.text
+
+    async def abort(self, note: str = STREAM_ABORTED_NOTE):
+        """Close an answer whose stream failed: drop the typing cursor and mark it as incomplete"""
+        if self.message is None:
+            return
+        self.pages[-1] += note
+        try:
+            await self._render(final=True)
+        except discord.HTTPException:
+            pass  # The caller reports the stream error itself
+
+    def _split_point(self, page: str) -> int:
+        cut = page.rfind('\n', 0, self.limit)
+        if cut < self.limit // 2:
+            cut = page.rfind(' ', 0, self.limit)
+        return cut if cut > 0 else self.limit
+
+    async def _render(self, final: bool = False):
+        # Roll over into a new embed whenever the current one is full
+        while len(self.pages[-1]) > self.limit:
+            page = self.pages[-1]
+            cut = self._split_point(page)
+            self.pages[-1] = page[:cut]
+            await self._show(len(self.pages) - 1, final=True)
+            self.pages.append(page[cut:].lstrip())
+            self.message = None
+
+        await self._show(len(self.pages) - 1, final=final)
+        self.last_edit = time.monotonic()
+
+    async def _show(self, index: int, final: bool):
+        embed = self.make_embed(index)
+        embed.description = self.pages[index] if final else self.pages[index] + " ▌"
+        if self.message is None:
+            self.message = await self.ctx.send(embed=embed)
+            if self.first_message_after is None:
+                self.first_message_after = time.monotonic() - self.started
+        else:
+            await self.message.edit(embed=embed)
 
-# Initialize Gemini AI with newer model
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-model = genai.GenerativeModel('gemini-2.0-flash')  # Using newer flash model for faster responses
-vision_model = genai.GenerativeModel('gemini-2.0-flash')  # Using same model for vision tasks
 
 class AIChatEnhanced(commands.Cog):
     def __init__(self, bot):
@@ -19,6 +91,8 @@ class AIChatEnhanced(commands.Cog):
         self.ai_channel_id = 1340150404775940210  # AI commands channel
         self.logger.info(f"AIChatEnhanced cog initialized with AI channel ID: {self.ai_channel_id}")
         self.last_responses = {}  # Store last AI response for each user
+        self.llm = get_gateway(bot)
+        self.response_cache = get_response_cache(bot)
 
     async def _check_channel(self, ctx):
         """Check if command is used in the AI channel"""
@@ -33,6 +107,40 @@ class AIChatEnhanced(commands.Cog):
             self.logger.error(f"Error in channel check: {e}")
             return False
 
+    async def _stream_response(self, ctx, model_key: str, contents, make_embed: Callable[[int], discord.Embed],
+                               cache_command: Optional[str] = None, cache_prompt: Optional[str] = None) -> str:
+        """Stream a response into embeds, serving and filling the response cache when requested"""
+        writer = StreamingEmbedWriter(ctx, make_embed)
+        model = self.llm.resolve(model_key)[1]
+
+        if cache_command:
+            cached = await self.response_cache.get(cache_command, model, cache_prompt)
+            if cached:
+                self.logger.debug(f"Response cache hit for {cache_command}")
+                await writer.feed(cached)
+                return await writer.finish()
+
+        try:
+            async for chunk in self.llm.stream(model_key, contents, lane='chat'):
+                await writer.feed(chunk)
+        except Exception:
+            await writer.abort()
+            raise
+        response = await writer.finish()
+
+        if writer.first_message_after is not None:
+            self.logger.debug(f"First streamed message sent after {writer.first_message_after:.2f}s")
+        if cache_command:
+            await self.response_cache.set(cache_command, model, cache_prompt, response)
+        return response
+
+    def _remember_response(self, user_id: int, response: str):
+        """Store the last response for this user and share it with the voice commands cog"""
+        self.last_responses[user_id] = response
+        voice_cog = self.bot.get_cog('VoiceCommands')
+        if voice_cog:
+            voice_cog.last_responses[user_id] = response
+
     @commands.command(name='analyze')
     @commands.cooldown(1, 10, commands.BucketType.user)
     async def analyze(self, ctx, *, text: Optional[str] = None):
@@ -72,72 +180,53 @@ class AIChatEnhanced(commands.Cog):
                         "If there's text in the image, include that in your analysis."
                     )
 
+                    def make_embed(page: int) -> discord.Embed:
+                        embed = discord.Embed(
+                            title="🖼️ Image Analysis" if page == 0 else "🖼️ Image Analysis (continued)",
+                            color=discord.Color.purple()
+                        )
+                        if page == 0:
+                            embed.set_thumbnail(url=attachment.url)
+                        return embed
+
                     self.logger.debug("Sending image to Gemini Vision API...")
                     try:
-                        response = vision_model.generate_content([prompt, image_parts[0]])
-                        response.resolve()
-                        analysis = response.text
+                        analysis = await self._stream_response(ctx, 'vision', [prompt, image_parts[0]], make_embed)
                     except Exception as e:
                         self.logger.error(f"Gemini Vision API error: {e}")
                         raise Exception("Failed to analyze image with Gemini Vision API")
 
-                    embed = discord.Embed(
-                        title="🖼️ Image Analysis",
-                        description="Here's my analysis of your image:",
-                        color=discord.Color.purple()
-                    )
-                    embed.set_thumbnail(url=attachment.url)
-
                 else:
                     # Handle text analysis
                     self.logger.info(f"Processing text from {ctx.author}")
+
+                    def make_embed(page: int) -> discord.Embed:
+                        embed = discord.Embed(
+                            title="📊 Text Analysis" if page == 0 else "📊 Text Analysis (continued)",
+                            color=discord.Color.purple()
+                        )
+                        if page == 0:
+                            embed.add_field(
+                                name="Input Text",
+                                value=text[:1000] + "..." if len(text) > 1000 else text,
+                                inline=False
+                            )
+                        return embed
+
                     try:
-                        response = model.generate_content(
-                            f"Analyze the following text and provide key insights:\n\n{text}"
+                        analysis = await self._stream_response(
+                            ctx,
+                            'chat',
+                            f"Analyze the following text and provide key insights:\n\n{text}",
+                            make_embed
                         )
-                        response.resolve()
-                        analysis = response.text
                     except Exception as e:
                         self.logger.error(f"Gemini text analysis error: {e}")
                         raise Exception("Failed to analyze text with Gemini API")
 
-                    embed = discord.Embed(
-                        title="📊 Text Analysis",
-                        description="Here's my analysis of your text:",
-                        color=discord.Color.purple()
-                    )
-                    if text:
-                        embed.add_field(
-                            name="Input Text",
-                            value=text[:1000] + "..." if len(text) > 1000 else text,
-                            inline=False
-                        )
-
                 # Store the analysis as the last response for this user
-                self.last_responses[ctx.author.id] = analysis
-
-                # Get the voice commands cog to update its last response
-                voice_cog = self.bot.get_cog('VoiceCommands')
-                if voice_cog:
-                    voice_cog.last_responses[ctx.author.id] = analysis
-
-                # Split analysis into chunks if it's too long
-                if len(analysis) > 1024:
-                    chunks = [analysis[i:i + 1024] for i in range(0, len(analysis), 1024)]
-                    for i, chunk in enumerate(chunks):
-                        embed.add_field(
-                            name=f"Analysis {i+1}/{len(chunks)}" if len(chunks) > 1 else "Analysis",
-                            value=chunk,
-                            inline=False
-                        )
-                else:
-                    embed.add_field(
-                        name="Analysis",
-                        value=analysis,
-                        inline=False
-                    )
+                self._remember_response(ctx.author.id, analysis)
 
-                await ctx.send(embed=embed)
                 self.logger.info(
                     f"Successfully analyzed {'image' if ctx.message.attachments else 'text'} "
                     f"for {ctx.author}"
@@ -161,48 +250,28 @@ class AIChatEnhanced(commands.Cog):
         if not await self._check_channel(ctx):
             return
 
-        async with ctx.typing():
-            try:
-                response = model.generate_content(question)
-                response.resolve()
-                answer = response.text
-
-                # Store the answer as the last response for this user
-                self.last_responses[ctx.author.id] = answer
-
-                # Get the voice commands cog to update its last response
-                voice_cog = self.bot.get_cog('VoiceCommands')
-                if voice_cog:
-                    voice_cog.last_responses[ctx.author.id] = answer
-
-                embed = discord.Embed(
-                    title="❓ Question & Answer",
-                    color=discord.Color.blue()
-                )
-
+        def make_embed(page: int) -> discord.Embed:
+            embed = discord.Embed(
+                title="❓ Question & Answer" if page == 0 else "❓ Question & Answer (continued)",
+                color=discord.Color.blue()
+            )
+            if page == 0:
                 embed.add_field(
                     name="Question",
-                    value=question,
+                    value=question[:1024],
                     inline=False
                 )
+            return embed
 
-                # Split answer into chunks if it's too long
-                if len(answer) > 1024:
-                    chunks = [answer[i:i + 1024] for i in range(0, len(answer), 1024)]
-                    for i, chunk in enumerate(chunks):
-                        embed.add_field(
-                            name=f"Answer {i+1}/{len(chunks)}" if len(chunks) > 1 else "Answer",
-                            value=chunk,
-                            inline=False
-                        )
-                else:
-                    embed.add_field(
-                        name="Answer",
-                        value=answer,
-                        inline=False
-                    )
+        async with ctx.typing():
+            try:
+                answer = await self._stream_response(
+                    ctx, 'chat', question, make_embed,
+                    cache_command='ask', cache_prompt=question
+                )
 
-                await ctx.send(embed=embed)
+                # Store the answer as the last response for this user
+                self._remember_response(ctx.author.id, answer)
                 self.logger.info(f"Successfully answered question for {ctx.author}")
             except Exception as e:
                 self.logger.error(f"Error processing question: {e}")
@@ -215,6 +284,13 @@ class AIChatEnhanced(commands.Cog):
         if not await self._check_channel(ctx):
             return
 
+        def make_embed(page: int) -> discord.Embed:
+            title = f"📚 Explaining: {concept}"[:240]
+            return discord.Embed(
+                title=title if page == 0 else f"{title} (continued)",
+                color=discord.Color.green()
+            )
+
         async with ctx.typing():
             try:
                 prompt = (
@@ -223,40 +299,13 @@ class AIChatEnhanced(commands.Cog):
                     f"{concept}"
                 )
 
-                response = model.generate_content(prompt)
-                response.resolve()
-                explanation = response.text
-
-                # Store the explanation as the last response for this user
-                self.last_responses[ctx.author.id] = explanation
-
-                # Get the voice commands cog to update its last response
-                voice_cog = self.bot.get_cog('VoiceCommands')
-                if voice_cog:
-                    voice_cog.last_responses[ctx.author.id] = explanation
-
-                embed = discord.Embed(
-                    title=f"📚 Explaining: {concept}",
-                    color=discord.Color.green()
+                explanation = await self._stream_response(
+                    ctx, 'chat', prompt, make_embed,
+                    cache_command='explain', cache_prompt=prompt
                 )
 
-                # Split explanation into chunks if it's too long
-                if len(explanation) > 1024:
-                    chunks = [explanation[i:i + 1024] for i in range(0, len(explanation), 1024)]
-                    for i, chunk in enumerate(chunks):
-                        embed.add_field(
-                            name=f"Explanation {i+1}/{len(chunks)}" if len(chunks) > 1 else "Explanation",
-                            value=chunk,
-                            inline=False
-                        )
-                else:
-                    embed.add_field(
-                        name="Explanation",
-                        value=explanation,
-                        inline=False
-                    )
-
-                await ctx.send(embed=embed)
+                # Store the explanation as the last response for this user
+                self._remember_response(ctx.author.id, explanation)
                 self.logger.info(f"Successfully explained concept for {ctx.author}")
             except Exception as e:
                 self.logger.error(f"Error explaining concept: {e}")
@@ -265,4 +314,4 @@ class AIChatEnhanced(commands.Cog):
 async def setup(bot):
     cog = AIChatEnhanced(bot)
     await bot.add_cog(cog)
-    logging.getLogger('discord_bot').info("AIChatEnhanced cog loaded successfully")
\ No newline at end of file
+    logging.getLogger('discord_bot').info("AIChatEnhanced cog loaded successfully")
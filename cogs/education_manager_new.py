@@ -4,14 +4,74 @@ import logging
 from typing import Dict, Any, Tuple, Optional
 import asyncio
 from question_generator import QuestionGenerator
+from question_attempts import AnswerKeyStore, AttemptWriter
+from question_pool import QuestionPool
+from seen_questions import SeenQuestionTracker
+from utils.database import get_database
+from utils.llm_gateway import get_gateway
+from utils.timer_service import get_timer_service
+
+ANSWER_REVEAL_DELAY = 60  # Seconds between sending a question and revealing its answer
+
+
+class AnswerButton(discord.ui.DynamicItem[discord.ui.Button],
+                   template=r'edu:ans:(?P<choice>[A-D]):(?P<question_id>\d+)'):
+    """Persistent answer button; the custom id holds only the pick and the question's id
+
+    The answer key stays server-side in question_answer_keys, so it can't be read off the button.
+    """
+
+    def __init__(self, choice: str, question_id: int):
+        self.choice = choice
+        self.question_id = question_id
+        super().__init__(discord.ui.Button(label=choice, style=discord.ButtonStyle.primary,
+                                           custom_id=f"edu:ans:{choice}:{question_id}"))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['choice'], int(match['question_id']))
+
+    async def callback(self, interaction: discord.Interaction):
+        cog = interaction.client.get_cog('EducationManager')
+        if cog is None:
+            await interaction.response.send_message("❌ Answers can't be recorded right now.")
+            return
+        await cog.handle_answer(interaction, self)
+
+
+def answer_view(question_id: int) -> discord.ui.View:
+    """Build the A-D buttons for a stored question"""
+    view = discord.ui.View(timeout=None)
+    for choice in 'ABCD':
+        view.add_item(AnswerButton(choice, question_id))
+    return view
+
+
+def result_view(choice: str, correct: str) -> discord.ui.View:
+    """Disabled copy of the answer buttons showing the pick and the right answer"""
+    view = discord.ui.View(timeout=None)
+    for letter in 'ABCD':
+        if letter == correct:
+            style = discord.ButtonStyle.success
+        elif letter == choice:
+            style = discord.ButtonStyle.danger
+        else:
+            style = discord.ButtonStyle.secondary
+        view.add_item(discord.ui.Button(label=letter, style=style, disabled=True))
+    return view
 
 class EducationManager(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = logging.getLogger('discord_bot')
-        self.question_generator = QuestionGenerator()
+        self.question_generator = QuestionGenerator(get_gateway(bot))
+        self.question_pool = QuestionPool(self.question_generator, get_database(bot))
         self.command_locks = {}
-        self.user_questions = {}
+        self.seen_questions = SeenQuestionTracker(get_database(bot))
+        self.timers = get_timer_service(bot)
+        self.timers.register('question_reveal', self._reveal_answer)
+        self.attempts = AttemptWriter(get_database(bot))
+        self.answer_keys = AnswerKeyStore(get_database(bot))
         self.dm_gif_url = "https://i.imgur.com/v2ak2ph.gif"
         self.option_emojis = {
             'A': '🅰️',
@@ -20,6 +80,36 @@ class EducationManager(commands.Cog):
             'D': '📝'
         }
 
+    async def cog_load(self):
+        self.bot.add_dynamic_items(AnswerButton)
+        await self.question_pool.start()
+        await self.attempts.start()
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(AnswerButton)
+        await self.question_pool.stop()
+        await self.attempts.stop()
+
+    async def handle_answer(self, interaction: discord.Interaction, button: AnswerButton):
+        """Score a button click, queue the attempt and lock the buttons on the question"""
+        key = await self.answer_keys.claim(button.question_id, interaction.user.id, button.choice)
+        if key is None:
+            # Double clicks and clicks on an already answered question record nothing
+            await interaction.response.send_message("You've already answered this question.", ephemeral=True)
+            return
+
+        class_level, subject, topic, correct = key
+        is_correct = button.choice == correct
+        self.attempts.record(interaction.user.id, subject, topic, class_level, button.choice, is_correct)
+
+        await interaction.response.edit_message(view=result_view(button.choice, correct))
+        if is_correct:
+            await interaction.followup.send(f"✅ Correct! {correct} is the right answer.")
+        else:
+            await interaction.followup.send(
+                f"❌ Not quite, you picked {button.choice}. The explanation arrives with the answer reveal."
+            )
+
     async def _handle_question_command(self, ctx, subject: str, topic: Optional[str], class_level: int):
         """Handle question generation for both class 11 and 12"""
         if ctx.author.id not in self.command_locks:
@@ -35,9 +125,11 @@ class EducationManager(commands.Cog):
                     await ctx.send(f"❌ Invalid subject. Available subjects: {', '.join(available_subjects)}")
                     return
 
-                # Initialize tracking for this user and subject
-                if ctx.author.id not in self.user_questions:
-                    self.user_questions[ctx.author.id] = {}
+                # Load which questions this user has already been served for the subject
+                await self.seen_questions.load(ctx.author.id, normalized_subject)
+
+                def seen(q: Dict[str, Any]) -> bool:
+                    return self.seen_questions.has_seen(ctx.author.id, normalized_subject, q)
 
                 # Track achievements with guild context
                 achievements_cog = self.bot.get_cog('Achievements')
@@ -64,21 +156,25 @@ class EducationManager(commands.Cog):
                     if self.user_question_count[user_id] >= 100:
                         await achievements_cog.award_achievement(user_id, "master_student", ctx.guild)
 
-                # Generate question
+                # Take a pre-generated question if one is buffered, otherwise generate inline
                 try:
-                    question = await self.question_generator.generate_question(
-                        subject=normalized_subject,
-                        topic=topic,
-                        class_level=class_level,
-                        user_id=str(ctx.author.id)
-                    )
+                    question = self.question_pool.pop(class_level, normalized_subject, topic, exclude=seen)
+                    if not question:
+                        question = await self.question_generator.generate_question(
+                            subject=normalized_subject,
+                            topic=topic,
+                            class_level=class_level,
+                            user_id=str(ctx.author.id),
+                            exclude=seen
+                        )
 
                     if not question:
                         await ctx.send("❌ Unable to generate a question at this time. Please try again.")
                         return
 
                     # Send question to DM
-                    await self.send_question_to_dm(ctx, question)
+                    await self.seen_questions.mark_seen(ctx.author.id, normalized_subject, question)
+                    await self.send_question_to_dm(ctx, question, class_level, normalized_subject, topic)
 
                 except Exception as e:
                     self.logger.error(f"Error generating question: {str(e)}")
@@ -115,8 +211,9 @@ class EducationManager(commands.Cog):
 
         return True, normalized_subject
 
-    async def send_question_to_dm(self, ctx, question_data: Dict[str, Any]):
-        """Send a question to user's DM with fancy formatting"""
+    async def send_question_to_dm(self, ctx, question_data: Dict[str, Any], class_level: int = 11,
+                                  subject: str = '', topic: Optional[str] = None):
+        """Send a question to user's DM with fancy formatting and answer buttons"""
         try:
             question_embed = discord.Embed(
                 title="📝 Practice Question",
@@ -132,10 +229,22 @@ class EducationManager(commands.Cog):
                     inline=False
                 )
 
-            question_embed.set_footer(text="💫 The answer will be revealed in 60 seconds... 💫")
+            question_embed.set_footer(
+                text=f"💫 Tap a button to answer! The answer will be revealed in {ANSWER_REVEAL_DELAY} seconds... 💫"
+            )
 
             try:
-                await ctx.author.send(embed=question_embed)
+                view = None
+                if subject and question_data.get('correct_answer') in ('A', 'B', 'C', 'D'):
+                    question_id = await self.answer_keys.create(
+                        ctx.author.id, class_level, subject, (topic or '').strip() or None,
+                        question_data['correct_answer']
+                    )
+                    view = answer_view(question_id)
+                if view:
+                    await ctx.author.send(embed=question_embed, view=view)
+                else:
+                    await ctx.author.send(embed=question_embed)
 
                 channel_embed = discord.Embed(
                     title="📨 Question Generated!",
@@ -146,23 +255,13 @@ class EducationManager(commands.Cog):
                 channel_embed.set_footer(text="Made with ❤️ by Rohanpreet Singh Pathania")
                 await ctx.send(embed=channel_embed)
 
-                await asyncio.sleep(60)
-
                 if 'correct_answer' in question_data:
-                    answer_embed = discord.Embed(
-                        title="✨ Answer Revealed! ✨",
-                        color=discord.Color.gold()
-                    )
-
-                    correct_letter = question_data['correct_answer']
-                    emoji = self.option_emojis.get(correct_letter, '✅')
-
-                    answer_text = f"{emoji} The correct answer is {correct_letter}"
-                    if 'explanation' in question_data:
-                        answer_text += f"\n\n**Explanation:**\n{question_data['explanation']}"
-
-                    answer_embed.description = answer_text
-                    await ctx.author.send(embed=answer_embed)
+                    # The reveal is persisted and sent by the timer service, so the user's lock is freed now
+                    await self.timers.schedule('question_reveal', ANSWER_REVEAL_DELAY, {
+                        'user_id': ctx.author.id,
+                        'correct_answer': question_data['correct_answer'],
+                        'explanation': question_data.get('explanation')
+                    })
 
             except discord.Forbidden:
                 error_embed = discord.Embed(
@@ -177,6 +276,28 @@ class EducationManager(commands.Cog):
             self.logger.error(f"Error sending question to DM: {str(e)}")
             await ctx.send("❌ An error occurred while sending the question.")
 
+    async def _reveal_answer(self, payload: Dict[str, Any]):
+        """Timer handler that DMs the answer for a previously sent question"""
+        user = self.bot.get_user(payload['user_id']) or await self.bot.fetch_user(payload['user_id'])
+
+        answer_embed = discord.Embed(
+            title="✨ Answer Revealed! ✨",
+            color=discord.Color.gold()
+        )
+
+        correct_letter = payload['correct_answer']
+        emoji = self.option_emojis.get(correct_letter, '✅')
+
+        answer_text = f"{emoji} The correct answer is {correct_letter}"
+        if payload.get('explanation'):
+            answer_text += f"\n\n**Explanation:**\n{payload['explanation']}"
+
+        answer_embed.description = answer_text
+        try:
+            await user.send(embed=answer_embed)
+        except discord.Forbidden:
+            self.logger.warning(f"Cannot DM answer to user {payload['user_id']}")
+
     @commands.command(name='11')
     @commands.cooldown(1, 5, commands.BucketType.user)
     async def class_11(self, ctx, subject: str, topic: Optional[str] = None):
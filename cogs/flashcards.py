@@ -1,14 +1,15 @@
 import discord
 from discord.ext import commands
 import json
-import sqlite3
 import logging
 import asyncio
-import google.generativeai as genai
 import os
 from typing import List, Dict, Optional
 from datetime import datetime
 from tenacity import retry, stop_after_attempt, wait_exponential
+from utils.database import get_database
+from utils.llm_gateway import get_gateway
+from utils.migrations import migrate
 
 class Flashcard:
     """A class representing a flashcard with front and back content."""
@@ -24,41 +25,18 @@ class Flashcards(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = logging.getLogger('discord_bot')
-        # Configure Gemini
         if not os.getenv('GOOGLE_API_KEY'):
             self.logger.error("Google API key not found in environment variables")
-        else:
-            try:
-                genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-                self.logger.info("Successfully configured Gemini API")
-                # Test model configuration
-                model = genai.GenerativeModel('gemini-pro')
-                self.logger.info("Successfully initialized Gemini model")
-            except Exception as e:
-                self.logger.error(f"Failed to configure Gemini: {str(e)}")
-        self.setup_database()
+        self.llm = get_gateway(bot)
+        self.db = get_database(bot)
 
-    def setup_database(self):
-        """Initialize SQLite database for flashcards"""
-        try:
-            self.db = sqlite3.connect('data/user_data.db')
-            cursor = self.db.cursor()
-
-            # Create flashcards table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS flashcards (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    subject TEXT,
-                    front TEXT NOT NULL,
-                    back TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_reviewed TIMESTAMP,
-                    review_count INTEGER DEFAULT 0
-                )
-            ''')
+    async def cog_load(self):
+        await self.setup_database()
 
-            self.db.commit()
+    async def setup_database(self):
+        """Make sure the shared schema, including the flashcards table, is current"""
+        try:
+            await migrate(self.db)
             self.logger.info("Flashcards database initialized")
         except Exception as e:
             self.logger.error(f"Error setting up flashcards database: {str(e)}")
@@ -67,22 +45,12 @@ class Flashcards(commands.Cog):
     async def _generate_with_gemini(self, prompt: str) -> str:
         """Make API call to Gemini with retry logic"""
         try:
-            # List available models for debugging
-            self.logger.debug("Available Gemini models:")
-            for m in genai.list_models():
-                self.logger.debug(f"- {m.name}")
-
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            response = await asyncio.to_thread(model.generate_content, prompt)
+            text = await self.llm.generate('study', prompt, lane='study')
+            self.logger.debug(f"Raw Gemini response: {text}")
 
-            # Log response type and structure for debugging
-            self.logger.debug(f"Gemini response type: {type(response)}")
-            self.logger.debug(f"Gemini response attributes: {dir(response)}")
-            self.logger.debug(f"Raw Gemini response: {response.text}")
-
-            if not response.text:
+            if not text:
                 raise ValueError("Empty response from Gemini")
-            return response.text
+            return text
         except Exception as e:
             if "SERVICE_DISABLED" in str(e):
                 self.logger.error("Gemini API service is not enabled. Please enable it in the Google Cloud Console.")
@@ -182,14 +150,10 @@ Text: {text}"""
                     return
 
                 # Save flashcards to database
-                cursor = self.db.cursor()
-                for card in flashcards:
-                    cursor.execute('''
-                        INSERT INTO flashcards (user_id, subject, front, back, created_at)
-                        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    ''', (card.user_id, card.subject, card.front, card.back))
-
-                self.db.commit()
+                await self.db.executemany('''
+                    INSERT INTO flashcards (user_id, subject, front, back, created_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', [(card.user_id, card.subject, card.front, card.back) for card in flashcards])
 
                 # Create embed to show the generated flashcards
                 embed = discord.Embed(
@@ -236,26 +200,22 @@ Text: {text}"""
     async def review_flashcards(self, ctx, subject: Optional[str] = None):
         """Review flashcards interactively"""
         try:
-            cursor = self.db.cursor()
-
             # Get flashcards for review
             if subject:
-                cursor.execute('''
+                cards = await self.db.fetchall('''
                     SELECT id, front, back FROM flashcards 
                     WHERE user_id = ? AND subject = ?
                     ORDER BY last_reviewed ASC NULLS FIRST
                     LIMIT 5
                 ''', (str(ctx.author.id), subject))
             else:
-                cursor.execute('''
+                cards = await self.db.fetchall('''
                     SELECT id, front, back FROM flashcards 
                     WHERE user_id = ?
                     ORDER BY last_reviewed ASC NULLS FIRST
                     LIMIT 5
                 ''', (str(ctx.author.id),))
 
-            cards = cursor.fetchall()
-
             if not cards:
                 await ctx.send("No flashcards found for review!" + (f" in {subject}" if subject else ""))
                 return
@@ -282,13 +242,12 @@ Text: {text}"""
                     await card_msg.edit(embed=embed)
 
                     # Update review count and timestamp
-                    cursor.execute('''
+                    await self.db.execute('''
                         UPDATE flashcards 
                         SET review_count = review_count + 1,
                             last_reviewed = CURRENT_TIMESTAMP 
                         WHERE id = ?
                     ''', (card_id,))
-                    self.db.commit()
 
                 except asyncio.TimeoutError:
                     await ctx.send("Review session timed out!")
@@ -305,10 +264,8 @@ Text: {text}"""
     async def flashcard_stats(self, ctx):
         """View flashcard statistics"""
         try:
-            cursor = self.db.cursor()
-
             # Get user's flashcard stats
-            cursor.execute('''
+            stats = await self.db.fetchone('''
                 SELECT 
                     COUNT(*) as total_cards,
                     COUNT(DISTINCT subject) as subjects,
@@ -318,8 +275,6 @@ Text: {text}"""
                 WHERE user_id = ?
             ''', (str(ctx.author.id),))
 
-            stats = cursor.fetchone()
-
             if not stats or stats[0] == 0:
                 await ctx.send("No flashcard statistics available!")
                 return
@@ -5,9 +5,11 @@ import logging
 import asyncio
 import json
 from datetime import datetime, timedelta
-import google.generativeai as genai
 import os
 from typing import List, Dict, Optional
+from utils.database import get_database
+from utils.llm_gateway import get_gateway
+from utils.migrations import migrate
 
 class LearningAssistant(commands.Cog):
     """A cog for AI-powered learning assistance features"""
@@ -15,77 +17,18 @@ class LearningAssistant(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = logging.getLogger('discord_bot')
-        # Configure Gemini
         if not os.getenv('GOOGLE_API_KEY'):
             self.logger.error("Google API key not found in environment variables")
-        else:
-            try:
-                genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-                self.logger.info("Successfully configured Gemini API")
-                self.model = genai.GenerativeModel('gemini-2.0-flash')
-                self.logger.info("Successfully initialized Gemini model")
-            except Exception as e:
-                self.logger.error(f"Failed to configure Gemini: {str(e)}")
-        self.setup_database()
+        self.llm = get_gateway(bot)
+        self.db = get_database(bot)
 
-    def setup_database(self):
-        """Initialize SQLite database for learning assistant features"""
-        try:
-            self.db = sqlite3.connect('data/user_data.db')
-            cursor = self.db.cursor()
-
-            # Create study_progress table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS study_progress (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    subject TEXT NOT NULL,
-                    topic TEXT NOT NULL,
-                    correct_answers INTEGER DEFAULT 0,
-                    total_attempts INTEGER DEFAULT 0,
-                    last_study_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Create study_schedule table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS study_schedule (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    subject TEXT NOT NULL,
-                    start_date DATE NOT NULL,
-                    end_date DATE NOT NULL,
-                    daily_topics TEXT NOT NULL,
-                    completed_topics TEXT DEFAULT '[]',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Create study_tip_categories table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS study_tip_categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    category_name TEXT NOT NULL,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(user_id, category_name)
-                )
-            ''')
-
-            # Create study_tips table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS study_tips (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category_id INTEGER NOT NULL,
-                    user_id TEXT NOT NULL,
-                    tip_content TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(category_id) REFERENCES study_tip_categories(id)
-                )
-            ''')
+    async def cog_load(self):
+        await self.setup_database()
 
-            self.db.commit()
+    async def setup_database(self):
+        """Make sure the shared schema, including the study tables, is current"""
+        try:
+            await migrate(self.db)
             self.logger.info("Learning assistant database initialized")
         except Exception as e:
             self.logger.error(f"Error setting up learning assistant database: {str(e)}")
@@ -126,8 +69,7 @@ class LearningAssistant(commands.Cog):
         """Generate a personalized quiz based on user's weak areas"""
         try:
             # Get user's study progress
-            cursor = self.db.cursor()
-            cursor.execute('''
+            weak_topic = await self.db.fetchone('''
                 SELECT topic, correct_answers, total_attempts 
                 FROM study_progress 
                 WHERE user_id = ? AND subject = ?
@@ -135,8 +77,6 @@ class LearningAssistant(commands.Cog):
                 LIMIT 1
             ''', (str(ctx.author.id), subject))
 
-            weak_topic = cursor.fetchone()
-
             # Generate question prompt
             if weak_topic and weak_topic[1] > 0:
                 topic = weak_topic[0]
@@ -149,9 +89,9 @@ class LearningAssistant(commands.Cog):
             msg = await ctx.send("🤔 Generating your personalized question...")
 
             try:
-                response = await asyncio.to_thread(self.model.generate_content, prompt)
+                response_text = await self.llm.generate('study', prompt, lane='study')
 
-                question = response.text.strip()
+                question = response_text.strip()
 
                 embed = discord.Embed(
                     title=f"📝 {subject} Question",
@@ -187,26 +127,23 @@ class LearningAssistant(commands.Cog):
                 Each topic should be specific and achievable in one study session.
                 Example format: ["Introduction to {subject}", "Basic Concepts", ...]"""
 
-                response = await asyncio.to_thread(self.model.generate_content, prompt)
+                response_text = await self.llm.generate('study', prompt, lane='study')
 
                 # Parse the study plan
                 try:
-                    daily_topics = json.loads(response.text.strip())
+                    daily_topics = json.loads(response_text.strip())
                 except:
                     # If JSON parsing fails, split by newlines as fallback
-                    daily_topics = [topic.strip() for topic in response.text.split('\n') if topic.strip()]
+                    daily_topics = [topic.strip() for topic in response_text.split('\n') if topic.strip()]
 
                 # Save to database
-                cursor = self.db.cursor()
                 start_date = datetime.now().date()
                 end_date = start_date + timedelta(days=days)
 
-                cursor.execute('''
+                await self.db.execute('''
                     INSERT INTO study_schedule (user_id, subject, start_date, end_date, daily_topics)
                     VALUES (?, ?, ?, ?, ?)
-                ''', (str(ctx.author.id), subject, start_date, end_date, json.dumps(daily_topics)))
-
-                self.db.commit()
+                ''', (str(ctx.author.id), subject, start_date.isoformat(), end_date.isoformat(), json.dumps(daily_topics)))
 
                 # Create embed with schedule
                 embed = discord.Embed(
@@ -259,9 +196,9 @@ class LearningAssistant(commands.Cog):
                 4. Explain each step
                 5. Give the final answer"""
 
-                response = await asyncio.to_thread(self.model.generate_content, prompt)
+                response_text = await self.llm.generate('study', prompt, lane='study')
 
-                solution = response.text.strip()
+                solution = response_text.strip()
 
                 # Create embed with solution
                 embed = discord.Embed(
@@ -284,20 +221,26 @@ class LearningAssistant(commands.Cog):
     async def check_progress(self, ctx):
         """Check study progress and schedule"""
         try:
-            cursor = self.db.cursor()
-
             # Get active study schedules
-            cursor.execute('''
+            schedules = await self.db.fetchall('''
                 SELECT subject, start_date, end_date, daily_topics, completed_topics
                 FROM study_schedule
                 WHERE user_id = ? AND end_date >= date('now')
                 ORDER BY start_date ASC
             ''', (str(ctx.author.id),))
 
-            schedules = cursor.fetchall()
+            # Per-topic accuracy is kept up to date by the answer pipeline, so this is a plain read
+            topic_progress = await self.db.fetchall('''
+                SELECT subject, topic, correct_answers, total_attempts
+                FROM study_progress
+                WHERE user_id = ? AND total_attempts > 0
+                ORDER BY total_attempts DESC
+                LIMIT 10
+            ''', (str(ctx.author.id),))
 
-            if not schedules:
-                await ctx.send("You don't have any active study schedules. Use `!learn schedule` to create one!")
+            if not schedules and not topic_progress:
+                await ctx.send("You don't have any active study schedules or answered questions yet. "
+                               "Use `!learn schedule` to create a plan or `!11`/`!12` to practice!")
                 return
 
             # Create embed with progress
@@ -307,6 +250,17 @@ class LearningAssistant(commands.Cog):
                 color=discord.Color.blue()
             )
 
+            if topic_progress:
+                lines = [
+                    f"{subject.replace('_', ' ').title()} - {topic[:30]}: {correct}/{total} ({correct / total:.0%})"
+                    for subject, topic, correct, total in topic_progress
+                ]
+                embed.add_field(
+                    name="🎯 Question Accuracy",
+                    value="```\n" + "\n".join(lines) + "```",
+                    inline=False
+                )
+
             for subject, start_date, end_date, daily_topics, completed_topics in schedules:
                 try:
                     daily_topics = json.loads(daily_topics)
@@ -362,23 +316,23 @@ class LearningAssistant(commands.Cog):
             return
 
         try:
-            cursor = self.db.cursor()
             if action.lower() == 'add':
-                cursor.execute('''
+                await self.db.execute('''
                     INSERT INTO study_tip_categories (user_id, category_name, description)
                     VALUES (?, ?, ?)
                 ''', (str(ctx.author.id), name, description))
-                self.db.commit()
                 await ctx.send(f"✅ Created new category: **{name}**")
             else:  # delete
-                cursor.execute('''
-                    DELETE FROM study_tips WHERE category_id IN 
-                    (SELECT id FROM study_tip_categories WHERE user_id = ? AND category_name = ?)
-                ''', (str(ctx.author.id), name))
-                cursor.execute('''
-                    DELETE FROM study_tip_categories WHERE user_id = ? AND category_name = ?
-                ''', (str(ctx.author.id), name))
-                self.db.commit()
+                def delete_category(conn):
+                    conn.execute('''
+                        DELETE FROM study_tips WHERE category_id IN 
+                        (SELECT id FROM study_tip_categories WHERE user_id = ? AND category_name = ?)
+                    ''', (str(ctx.author.id), name))
+                    conn.execute('''
+                        DELETE FROM study_tip_categories WHERE user_id = ? AND category_name = ?
+                    ''', (str(ctx.author.id), name))
+
+                await self.db.transaction(delete_category)
                 await ctx.send(f"✅ Deleted category: **{name}** and all its tips")
         except sqlite3.IntegrityError:
             await ctx.send(f"❌ Category **{name}** already exists!")
@@ -390,8 +344,7 @@ class LearningAssistant(commands.Cog):
     async def list_categories(self, ctx):
         """List all study tip categories"""
         try:
-            cursor = self.db.cursor()
-            cursor.execute('''
+            categories = await self.db.fetchall('''
                 SELECT category_name, description, 
                        (SELECT COUNT(*) FROM study_tips WHERE category_id = c.id) as tip_count
                 FROM study_tip_categories c
@@ -399,8 +352,6 @@ class LearningAssistant(commands.Cog):
                 ORDER BY category_name
             ''', (str(ctx.author.id),))
 
-            categories = cursor.fetchall()
-
             if not categories:
                 await ctx.send("📝 You don't have any tip categories yet. Create one with `!tips category add <name>`!")
                 return
@@ -429,25 +380,22 @@ class LearningAssistant(commands.Cog):
     async def add_tip(self, ctx, category: str, *, tip: str):
         """Add a new study tip to a category"""
         try:
-            cursor = self.db.cursor()
             # Get category ID
-            cursor.execute('''
+            result = await self.db.fetchone('''
                 SELECT id FROM study_tip_categories
                 WHERE user_id = ? AND category_name = ?
             ''', (str(ctx.author.id), category))
 
-            result = cursor.fetchone()
             if not result:
                 await ctx.send(f"❌ Category **{category}** not found!")
                 return
 
             category_id = result[0]
-            cursor.execute('''
+            await self.db.execute('''
                 INSERT INTO study_tips (category_id, user_id, tip_content)
                 VALUES (?, ?, ?)
             ''', (category_id, str(ctx.author.id), tip))
 
-            self.db.commit()
             await ctx.send(f"✅ Added tip to **{category}**!")
 
         except Exception as e:
@@ -458,8 +406,7 @@ class LearningAssistant(commands.Cog):
     async def view_tips(self, ctx, category: str):
         """View tips in a category"""
         try:
-            cursor = self.db.cursor()
-            cursor.execute('''
+            tips = await self.db.fetchall('''
                 SELECT t.id, t.tip_content, t.created_at
                 FROM study_tips t
                 JOIN study_tip_categories c ON t.category_id = c.id
@@ -467,7 +414,6 @@ class LearningAssistant(commands.Cog):
                 ORDER BY t.created_at DESC
             ''', (str(ctx.author.id), category))
 
-            tips = cursor.fetchall()
             if not tips:
                 await ctx.send(f"📝 No tips found in category **{category}**!")
                 return
@@ -497,15 +443,13 @@ class LearningAssistant(commands.Cog):
     async def delete_tip(self, ctx, category: str, tip_id: int):
         """Delete a specific tip from a category"""
         try:
-            cursor = self.db.cursor()
-            cursor.execute('''
+            result = await self.db.execute('''
                 DELETE FROM study_tips
                 WHERE id = ? AND user_id = ? AND category_id IN 
                     (SELECT id FROM study_tip_categories WHERE category_name = ? AND user_id = ?)
             ''', (tip_id, str(ctx.author.id), category, str(ctx.author.id)))
 
-            if cursor.rowcount > 0:
-                self.db.commit()
+            if result.rowcount > 0:
                 await ctx.send(f"✅ Deleted tip #{tip_id} from **{category}**!")
             else:
                 await ctx.send(f"❌ Tip #{tip_id} not found in **{category}**!")
@@ -12,8 +12,15 @@ from discord import SelectOption
 from discord.ui import Select, View
 import os
 import json
+import time
 from dotenv import load_dotenv
 
+from music_player import GuildPlayer, LOOP_MODES
+from music_extraction import YDL_OPTIONS, create_extractor
+from music_search import SearchCache
+from stream_resolver import StreamResolver, parse_expiry, video_id
+from utils.database import get_database
+
 # Load environment variables
 load_dotenv()
 
@@ -51,6 +58,17 @@ class MusicCommands(commands.Cog):
             'slowand_reverb': 'atempo=0.90,asetrate=44100*0.90,aecho=0.8:0.9:1000|1800:0.2|0.1,areverse,aecho=0.8:0.88:60|50:0.2|0.1,areverse'
         }
         self.progress_update_tasks = {}
+        self.players: Dict[int, GuildPlayer] = {}
+        self.db = get_database(bot)
+        self.search_cache = SearchCache(self.db)
+        # MUSIC_EXTRACTOR=process (default) keeps yt-dlp's parsing off the event loop's GIL; thread is lighter
+        self.extractor = create_extractor(
+            os.getenv('MUSIC_EXTRACTOR', 'process'), YDL_OPTIONS,
+            workers=int(os.getenv('MUSIC_EXTRACTOR_WORKERS', '2')),
+            timeout=float(os.getenv('MUSIC_EXTRACTOR_TIMEOUT', '30'))
+        )
+        self.streams = StreamResolver(self.extractor.extract_info, self._active_streams)
+        self.warm_task: Optional[asyncio.Task] = None
         self.mood_playlists = {
             "happy": [
                 "Don't Stop Believin' - Journey",
@@ -293,55 +311,157 @@ class MusicCommands(commands.Cog):
             self.logger.error(f"Error in progress update task: {str(e)}")
 
     async def get_song_results(self, query: str) -> List[Dict[str, Any]]:
-        """Search for songs using yt-dlp"""
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-            'default_search': 'ytsearch5',
-            'simulate': True,
-            'skip_download': True,
-            'force_generic_extractor': False
-        }
+        """Search for songs using yt-dlp, answering repeated queries from the search cache
 
+        Results are a flat listing (title, duration, thumbnail); stream URLs are resolved
+        only for the song that is actually queued.
+        """
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                self.logger.info(f"Searching for query: {query}")
-                info = await asyncio.to_thread(ydl.extract_info, f"ytsearch5:{query}", download=False)
-                if not info or 'entries' not in info:
-                    self.logger.error("No search results found or invalid response format")
-                    return []
-
-                results = []
-                for entry in info['entries'][:5]:
-                    try:
-                        # Store URL in track info for effect switching
-                        url = entry.get('url', '') or entry.get('webpage_url', '')
-                        if not url:
-                            continue
-
-                        result = {
-                            'title': entry.get('title', 'Unknown Title'),
-                            'url': url,
-                            'webpage_url': entry.get('webpage_url', url),
-                            'thumbnail': entry.get('thumbnail', ''),
-                            'duration': int(entry.get('duration', 0)),
-                            'duration_string': self.format_duration(int(entry.get('duration', 0))),
-                            'uploader': entry.get('uploader', 'Unknown Artist')
-                        }
+            return await self.search_cache.get(query, self._search_youtube)
+        except Exception as e:
+            self.logger.error(f"Error in song search: {str(e)}")
+            return []
 
-                        results.append(result)
+    async def _search_youtube(self, query: str) -> List[Dict[str, Any]]:
+        self.logger.info(f"Searching for query: {query}")
+        info = await self.extractor.extract_info(f"ytsearch5:{query}")
+        if not info or 'entries' not in info:
+            self.logger.error("No search results found or invalid response format")
+            return []
 
-                    except Exception as e:
-                        self.logger.error(f"Error processing search result: {str(e)}")
-                        continue
+        results = []
+        for entry in info['entries'][:5]:
+            try:
+                webpage_url = entry.get('webpage_url') or entry.get('url', '')
+                if not webpage_url:
+                    continue
+
+                duration = int(entry.get('duration') or 0)
+                result = {
+                    'id': entry.get('id', ''),
+                    'title': entry.get('title', 'Unknown Title'),
+                    'webpage_url': webpage_url,
+                    'thumbnail': entry.get('thumbnail', ''),
+                    'duration': duration,
+                    'duration_string': self.format_duration(duration),
+                    'uploader': entry.get('uploader') or entry.get('channel') or 'Unknown Artist'
+                }
 
-                return results
+                results.append(result)
 
-        except Exception as e:
-            self.logger.error(f"Error in song search: {str(e)}")
-            return []
+            except Exception as e:
+                self.logger.error(f"Error processing search result: {str(e)}")
+                continue
+
+        return results
+
+    async def cog_load(self):
+        await self.search_cache.setup_database()
+        self.streams.start()
+        # Warm in the background so loading the cog doesn't wait on yt-dlp's extractor imports
+        self.warm_task = asyncio.create_task(self.extractor.warm())
+
+    async def cog_unload(self):
+        for player in self.players.values():
+            await player.close()
+        self.players.clear()
+        await self.streams.stop()
+        if self.warm_task:
+            self.warm_task.cancel()
+        self.extractor.close()
+
+    def get_player(self, guild_id: int) -> GuildPlayer:
+        """Get the guild's queue player, creating it on first use"""
+        player = self.players.get(guild_id)
+        if player is None:
+            player = GuildPlayer(
+                self.bot.get_guild(guild_id),
+                resolve=self.resolve_stream,
+                create_source=self.create_source,
+                on_start=self.announce_track,
+                on_end=lambda track, error: self.song_finished(guild_id, error),
+                is_stale=self.stream_is_stale
+            )
+            self.players[guild_id] = player
+        return player
+
+    def make_track(self, song: Dict[str, Any], ctx, **extra) -> Dict[str, Any]:
+        """Queue entry for a search result; extra keys customise the Now Playing embed"""
+        return {**song, 'requester': ctx.author, 'ctx': ctx, **extra}
+
+    def track_video_id(self, track: Dict[str, Any]) -> str:
+        return track.get('id') or video_id(track['webpage_url'])
+
+    def _active_streams(self):
+        """(video_id, webpage_url) of every playing or queued track, kept fresh by the resolver"""
+        for player in self.players.values():
+            tracks = player.queue.tracks()
+            if player.current:
+                tracks.append(player.current)
+            for track in tracks:
+                yield self.track_video_id(track), track['webpage_url']
+
+    async def resolve_stream(self, track: Dict[str, Any]):
+        """Point the track at a valid stream URL; only extracts if none is cached"""
+        track['url'] = await self.streams.resolve(self.track_video_id(track), track['webpage_url'])
+
+    def stream_is_stale(self, track: Dict[str, Any]) -> bool:
+        """Whether a repeating track's stream URL is too close to expiry to play again"""
+        expires_at = parse_expiry(track.get('url', ''))
+        return expires_at is None or expires_at - time.time() < self.streams.refresh_margin
+
+    def create_source(self, track: Dict[str, Any], position: int = 0) -> discord.AudioSource:
+        """FFmpeg source for the track from position seconds, with its audio effect if any"""
+        ffmpeg_options = {
+            'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
+            'options': '-vn'
+        }
+        if position:
+            ffmpeg_options['before_options'] += f' -ss {position}'
+        effect = track.get('effect')
+        if effect and effect in self.audio_filters:
+            ffmpeg_options['options'] = f"-vn -af {self.audio_filters[effect]}"
+        audio_source = discord.FFmpegPCMAudio(track['url'], **ffmpeg_options)
+        return discord.PCMVolumeTransformer(audio_source, volume=self.volume)
+
+    async def announce_track(self, track: Dict[str, Any]):
+        """Send the Now Playing embed for a track the player just started"""
+        ctx = track['ctx']
+        track['start_time'] = asyncio.get_event_loop().time()
+        self.current_tracks[ctx.guild.id] = track
+
+        artist_line = track.get('announce_artist') or f"Artist: **{track['uploader']}**"
+        playing_embed = discord.Embed(
+            title=track.get('announce_title', "🎵 Now Playing"),
+            description=f"**{track['title']}**\n{artist_line}",
+            color=discord.Color.blue()
+        )
+
+        if track['thumbnail']:
+            playing_embed.set_thumbnail(url=track['thumbnail'])
+
+        progress_bar = self.create_progress_bar(0, track['duration'])
+        playing_embed.add_field(
+            name="Progress",
+            value=f"{progress_bar}\nTime: `00:00 / {track['duration_string']}`\nDuration: `{track['duration_string']}`",
+            inline=False
+        )
+
+        playing_embed.add_field(
+            name="Requested by",
+            value=track['requester'].mention,
+            inline=False
+        )
+
+        now_playing_msg = await ctx.send(embed=playing_embed)
+
+        # Cancel existing progress update task if any
+        if ctx.guild.id in self.progress_update_tasks:
+            self.progress_update_tasks[ctx.guild.id].cancel()
+
+        self.progress_update_tasks[ctx.guild.id] = asyncio.create_task(
+            self.update_progress(ctx, now_playing_msg.id, track)
+        )
 
     @commands.command(name='play')
     async def play(self, ctx, *, query: str):
@@ -419,6 +539,15 @@ class MusicCommands(commands.Cog):
             await interaction.response.defer()
 
             try:
+                # Add audio filter if specified in the query
+                filter_keywords = ['bassboost', '8d', 'nightcore', 'slowand_reverb']
+                applied_filter = next((f for f in filter_keywords if f in query.lower()), None)
+                if applied_filter:
+                    self.logger.info(f"Applying audio filter: {applied_filter}")
+
+                player = self.get_player(ctx.guild.id)
+                ahead = await player.enqueue(self.make_track(song, ctx, effect=applied_filter))
+
                 # Create embedded message for queue addition
                 queue_embed = discord.Embed(
                     title="✅ Song Added to Queue",
@@ -427,91 +556,17 @@ class MusicCommands(commands.Cog):
                 )
                 if song['thumbnail']:
                     queue_embed.set_thumbnail(url=song['thumbnail'])
+                if ahead:
+                    queue_embed.add_field(name="Position", value=f"#{ahead} in queue", inline=True)
                 await loading_msg.edit(content=None, embed=queue_embed, view=None)
 
-                # Play the song
-                voice_client = self.voice_clients[ctx.guild.id]
-
-                # Setup FFmpeg options with filter if specified
-                ffmpeg_options = {
-                    'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
-                    'options': '-vn'
-                }
-
-                # Add audio filter if specified in the query
-                filter_keywords = ['bassboost', '8d', 'nightcore', 'slowand_reverb']
-                applied_filter = next((f for f in filter_keywords if f in query.lower()), None)
-                if applied_filter and applied_filter in self.audio_filters:
-                    ffmpeg_options['options'] = f'-vn -af {self.audio_filters[applied_filter]}'
-                    self.logger.info(f"Applying audio filter: {applied_filter} with options: {ffmpeg_options['options']}")
-
-                # Create audio source
-                try:
-                    self.logger.info(f"Creating audio source with URL: {song['url']}")
-                    audio_source = discord.FFmpegPCMAudio(song['url'], **ffmpeg_options)
-                    voice_client.play(
-                        discord.PCMVolumeTransformer(audio_source, volume=self.volume),
-                        after=lambda e: asyncio.run_coroutine_threadsafe(
-                            self.song_finished(ctx.guild.id, e), self.bot.loop
-                        ) if e else None
-                    )
-                    self.logger.info("Successfully started playing audio")
-                except Exception as e:
-                    self.logger.error(f"Error creating audio source: {e}")
-                    raise
-
-                # Save current track info
-                start_time = asyncio.get_event_loop().time()
-                self.current_tracks[ctx.guild.id] = {
-                    'title': song['title'],
-                    'duration': song['duration'],
-                    'thumbnail': song['thumbnail'],
-                    'uploader': song['uploader'],
-                    'requester': ctx.author,
-                    'start_time': start_time,
-                    'url': song['url']
-                }
-
-                # Create Now Playing embed
-                playing_embed = discord.Embed(
-                    title="🎵 Now Playing",
-                    description=f"**{song['title']}**\nArtist: **{song['uploader']}**",
-                    color=discord.Color.blue()
-                )
-
-                if song['thumbnail']:
-                    playing_embed.set_thumbnail(url=song['thumbnail'])
-
-                progress_bar = self.create_progress_bar(0, song['duration'])
-                playing_embed.add_field(
-                    name="Progress",
-                    value=f"{progress_bar}\nTime: `00:00 / {song['duration_string']}`\nDuration: `{song['duration_string']}`",
-                    inline=False
-                )
-
-                playing_embed.add_field(
-                    name="Requested by",
-                    value=ctx.author.mention,
-                    inline=False
-                )
-
-                # Send and start progress updates
-                now_playing_msg = await ctx.send(embed=playing_embed)
-
-                # Cancel existing progress update task if any
-                if ctx.guild.id in self.progress_update_tasks:
-                    self.progress_update_tasks[ctx.guild.id].cancel()
-
-                # Start new progress update task
-                update_task = asyncio.create_task(
-                    self.update_progress(ctx, now_playing_msg.id, self.current_tracks[ctx.guild.id])
-                )
-                self.progress_update_tasks[ctx.guild.id] = update_task
-
             except Exception as e:
                 self.logger.error(f"Error playing song: {e}")
                 await ctx.send("❌ An error occurred while playing the song.")
 
+        # Most picks are the top result, so start resolving its stream while the menu is open
+        self.streams.prefetch(self.track_video_id(results[0]), results[0]['webpage_url'])
+
         # Create and send selection menu
         select_view = View()
         select_view.add_item(SongSelect(results, select_callback))
@@ -562,13 +617,84 @@ class MusicCommands(commands.Cog):
         if ctx.guild.id in self.voice_clients:
             vc = self.voice_clients[ctx.guild.id]
             if vc.is_playing() or vc.is_paused():
-                vc.stop()
+                self.get_player(ctx.guild.id).stop()
                 await ctx.send("⏹️ Stopped playing")
             else:
                 await ctx.send("❌ Nothing is playing!")
         else:
             await ctx.send("❌ I'm not in a voice channel!")
 
+    @commands.command(name='skip')
+    async def skip(self, ctx):
+        """Skip to the next song in the queue"""
+        player = self.players.get(ctx.guild.id)
+        if player and player.skip():
+            await ctx.send("⏭️ Skipped the current song")
+        else:
+            await ctx.send("❌ Nothing is playing!")
+
+    @commands.command(name='queue')
+    async def show_queue(self, ctx):
+        """Show the song queue"""
+        player = self.players.get(ctx.guild.id)
+        if not player or (not player.current and player.queue.empty()):
+            await ctx.send("📭 The queue is empty!")
+            return
+
+        embed = discord.Embed(title="🎶 Song Queue", color=discord.Color.blue())
+        if player.current:
+            embed.add_field(
+                name="Now Playing",
+                value=f"**{player.current['title']}** `{player.current['duration_string']}`",
+                inline=False
+            )
+
+        upcoming = player.queue.tracks()
+        if upcoming:
+            lines = [f"{i}. **{track['title'][:60]}** `{track['duration_string']}` - {track['requester'].display_name}"
+                     for i, track in enumerate(upcoming[:10], start=1)]
+            if len(upcoming) > 10:
+                lines.append(f"...and {len(upcoming) - 10} more")
+            embed.add_field(name="Up Next", value="\n".join(lines), inline=False)
+
+        embed.set_footer(text=f"Loop: {player.loop_mode} | {len(upcoming)} song(s) queued")
+        await ctx.send(embed=embed)
+
+    @commands.command(name='loop')
+    async def loop(self, ctx, mode: str = None):
+        """Loop the current song or the whole queue (off/track/queue)"""
+        player = self.players.get(ctx.guild.id)
+        if not player:
+            await ctx.send("❌ Nothing is playing!")
+            return
+
+        if mode is None:
+            # Cycle off -> track -> queue -> off
+            mode = LOOP_MODES[(LOOP_MODES.index(player.loop_mode) + 1) % len(LOOP_MODES)]
+        mode = mode.lower()
+        if mode not in LOOP_MODES:
+            await ctx.send(f"❌ Loop mode must be one of: {', '.join(f'`{m}`' for m in LOOP_MODES)}")
+            return
+
+        player.set_loop(mode)
+        messages = {
+            'off': "➡️ Looping disabled",
+            'track': "🔂 Looping the current song",
+            'queue': "🔁 Looping the queue"
+        }
+        await ctx.send(messages[mode])
+
+    @commands.command(name='shuffle')
+    async def shuffle(self, ctx):
+        """Shuffle the upcoming songs"""
+        player = self.players.get(ctx.guild.id)
+        if not player or player.queue.qsize() < 2:
+            await ctx.send("❌ Need at least two queued songs to shuffle!")
+            return
+
+        player.shuffle()
+        await ctx.send(f"🔀 Shuffled {player.queue.qsize()} songs")
+
     @commands.command(name='musichelp')
     async def music_help(self, ctx):
         """Show all music-related commands"""
@@ -588,7 +714,11 @@ class MusicCommands(commands.Cog):
         `!play <song> slowand_reverb` - Play with slow + reverb effect
         `!pause` - Pause current song
         `!resume` - Resume paused song
-        `!stop` - Stop playing
+        `!stop` - Stop playing and clear the queue
+        `!skip` - Skip to the next song
+        `!queue` - Show the song queue
+        `!loop [off/track/queue]` - Loop the song or the queue
+        `!shuffle` - Shuffle the upcoming songs
         `!volume <0-200>` - Adjust volume
         `!seek <forward/back> <seconds>` - Skip forward/backward in song
         `!normal` - Remove all audio effects
@@ -839,24 +969,11 @@ class MusicCommands(commands.Cog):
             await ctx.send("❌ Cannot seek beyond the end of the track!")
             return
 
-        # Stop current playback
-        ctx.voice_client.stop()
-
-        # Setup FFmpeg options with timestamp
-        ffmpeg_options = {
-            'before_options': f'-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -ss {new_position}',
-            'options': '-vn'
-        }
-
-        # Create new audio source and play
+        # Swap the source in place so the queue does not advance
         try:
-            audio_source = discord.FFmpegPCMAudio(current_track['url'], **ffmpeg_options)
-            ctx.voice_client.play(
-                discord.PCMVolumeTransformer(audio_source, volume=self.volume),
-                after=lambda e: asyncio.run_coroutine_threadsafe(
-                    self.song_finished(ctx.guild.id, e), self.bot.loop
-                ) if e else None
-            )
+            await self.resolve_stream(current_track)
+            player = self.get_player(guild_id)
+            player.swap_source(self.create_source(current_track, position=new_position))
 
             # Update start time to account for seeking
             self.current_tracks[guild_id]['start_time'] = asyncio.get_event_loop().time() - new_position
@@ -906,27 +1023,12 @@ class MusicCommands(commands.Cog):
         current_track = self.current_tracks[guild_id]
         current_position = int(asyncio.get_event_loop().time() - current_track['start_time'])
 
-        # Stop current playback
-        ctx.voice_client.stop()
-
-        # Setup FFmpeg options with timestamp and effect
-        ffmpeg_options = {
-            'before_options': f'-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -ss {current_position}',
-            'options': '-vn'
-        }
-
-        if effect and effect in self.audio_filters:
-            ffmpeg_options['options'] = f"-vn -af {self.audio_filters[effect]}"
-
-        # Create new audio source and play
+        # Swap the source in place so the queue does not advance
         try:
-            audio_source = discord.FFmpegPCMAudio(current_track['url'], **ffmpeg_options)
-            ctx.voice_client.play(
-                discord.PCMVolumeTransformer(audio_source, volume=self.volume),
-                after=lambda e: asyncio.run_coroutine_threadsafe(
-                    self.song_finished(ctx.guild.id, e), self.bot.loop
-                ) if e else None
-            )
+            current_track['effect'] = effect
+            await self.resolve_stream(current_track)
+            player = self.get_player(guild_id)
+            player.swap_source(self.create_source(current_track, position=current_position))
 
             # Update start time to maintain progress
             self.current_tracks[guild_id]['start_time'] = asyncio.get_event_loop().time() - current_position
@@ -1125,70 +1227,14 @@ class MusicCommands(commands.Cog):
             # Get first result
             song_info = results[0]
 
-            # Play the song
-            try:
-                ffmpeg_options = {
-                    'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
-                    'options': '-vn'
-                }
-                audio_source = discord.FFmpegPCMAudio(song_info['url'], **ffmpeg_options)
-                self.voice_clients[ctx.guild.id].play(
-                    discord.PCMVolumeTransformer(audio_source, volume=self.volume),
-                    after=lambda e: asyncio.run_coroutine_threadsafe(
-                        self.song_finished(ctx.guild.id, e), self.bot.loop
-                    ) if e else None
-                )
-            except Exception as e:
-                self.logger.error(f"Error playing song: {e}")
-                await loading_msg.edit(content="❌ Error playing the song. Please try again.")
-                return
-
-            # Update current track info
-            self.current_tracks[ctx.guild.id] = {
-                'title': song_info['title'],
-                'duration': song_info['duration'],
-                'thumbnail': song_info['thumbnail'],
-                'uploader': song_info['uploader'],
-                'requester': ctx.author,
-                'start_time': asyncio.get_event_loop().time(),
-                'url': song_info['url']
-            }
-
-            # Create and send Now Playing embed
-            playing_embed = discord.Embed(
-                title=f"{emoji} Now Playing ({mood.title()} Mood)",
-                description=f"**{song_info['title']}**\nArtist: **{song_info['uploader']}**",
-                color=discord.Color.blue()
-            )
-
-            if song_info['thumbnail']:
-                playing_embed.set_thumbnail(url=song_info['thumbnail'])
-
-            # Add progress information
-            progress_bar = self.create_progress_bar(0, song_info['duration'])
-            playing_embed.add_field(
-                name="Progress",
-                value=f"{progress_bar}\nTime: `00:00 / {song_info['duration_string']}`\nDuration: `{song_info['duration_string']}`",
-                inline=False
-            )
-
-            playing_embed.add_field(
-                name="Requested by",
-                value=ctx.author.mention,
-                inline=False
-            )
-
-            # Send embed and start progress updates
-            now_playing_msg = await ctx.send(embed=playing_embed)
-            await loading_msg.edit(content=f"{emoji} Playing a **{mood}** song: `{song_info['title']}`")
-
-            # Update progress
-            if ctx.guild.id in self.progress_update_tasks:
-                self.progress_update_tasks[ctx.guild.id].cancel()
-
-            self.progress_update_tasks[ctx.guild.id] = asyncio.create_task(
-                self.update_progress(ctx, now_playing_msg.id, self.current_tracks[ctx.guild.id])
-            )
+            # Queue the song; the player announces it when it starts
+            ahead = await self.get_player(ctx.guild.id).enqueue(self.make_track(
+                song_info, ctx, announce_title=f"{emoji} Now Playing ({mood.title()} Mood)"
+            ))
+            if ahead:
+                await loading_msg.edit(content=f"{emoji} Queued a **{mood}** song: `{song_info['title']}` (#{ahead} in queue)")
+            else:
+                await loading_msg.edit(content=f"{emoji} Playing a **{mood}** song: `{song_info['title']}`")
 
         except Exception as e:
             self.logger.error(f"Error in moodplay command: {str(e)}")
@@ -1232,74 +1278,15 @@ class MusicCommands(commands.Cog):
                     await loading_msg.edit(content="❌ Could not join the voice channel.")
                     return
 
-            # Setup FFmpeg options
-            ffmpeg_options = {
-                'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',
-                'options': '-vn'
-            }
-
-            # Create and play audio
-            try:
-                audio_source = discord.FFmpegPCMAudio(song_info['url'], **ffmpeg_options)
-                self.voice_clients[ctx.guild.id].play(
-                    discord.PCMVolumeTransformer(audio_source, volume=self.volume),
-                    after=lambda e: asyncio.run_coroutine_threadsafe(
-                        self.song_finished(ctx.guild.id, e), self.bot.loop
-                    ) if e else None
-                )
-            except Exception as e:
-                self.logger.error(f"Error playing song: {e}")
-                await loading_msg.edit(content="❌ Error playing the song. Please try again.")
-                return
-
-            # Update current track info
-            self.current_tracks[ctx.guild.id] = {
-                'title': song_info['title'],
-                'duration': song_info['duration'],
-                'thumbnail': song_info['thumbnail'],
-                'uploader': song_info['uploader'],
-                'requester': ctx.author,
-                'start_time': asyncio.get_event_loop().time(),
-                'url': song_info['url']
-            }
-
-            # Create Now Playing embed
-            playing_embed = discord.Embed(
-                title="🎤 Now Playing",
-                description=f"**{song_info['title']}**\nBy: **{singer_name}**",
-                color=discord.Color.blue()
-            )
-
-            if song_info['thumbnail']:
-                playing_embed.set_thumbnail(url=song_info['thumbnail'])
-
-            # Add progress information
-            progress_bar = self.create_progress_bar(0, song_info['duration'])
-            playing_embed.add_field(
-                name="Progress",
-                value=f"{progress_bar}\nTime: `00:00 / {song_info['duration_string']}`\nDuration: `{song_info['duration_string']}`",
-                inline=False
-            )
-
-            playing_embed.add_field(
-                name="Requested by",
-                value=ctx.author.mention,
-                inline=False
-            )
-
-            # Send Now Playing embed and update loading message
-            now_playing_msg = await ctx.send(embed=playing_embed)
-
-            # Delete the loading message instead of updating it
-            await loading_msg.delete()
-
-            # Update progress
-            if ctx.guild.id in self.progress_update_tasks:
-                self.progress_update_tasks[ctx.guild.id].cancel()
-
-            self.progress_update_tasks[ctx.guild.id] = asyncio.create_task(
-                self.update_progress(ctx, now_playing_msg.id, self.current_tracks[ctx.guild.id])
-            )
+            # Queue the song; the player announces it when it starts
+            ahead = await self.get_player(ctx.guild.id).enqueue(self.make_track(
+                song_info, ctx, announce_title="🎤 Now Playing", announce_artist=f"By: **{singer_name}**"
+            ))
+            if ahead:
+                await loading_msg.edit(content=f"🎤 Queued `{song_info['title']}` by **{singer_name}** (#{ahead} in queue)")
+            else:
+                # Delete the loading message instead of updating it
+                await loading_msg.delete()
 
         except Exception as e:
             self.logger.error(f"Error in singer command: {str(e)}")
@@ -7,8 +7,8 @@ import random
 import json
 from datetime import datetime, timedelta
 from tenacity import retry, stop_after_attempt, wait_exponential
-import aiohttp
 from .personality import BotPersonality
+from utils.llm_gateway import get_gateway
 
 class NaturalConversation(commands.Cog):
     """A cog for AI-powered assistance with personality"""
@@ -18,18 +18,10 @@ class NaturalConversation(commands.Cog):
         self.logger = logging.getLogger('discord_bot')
         self.personality = BotPersonality()
 
-        # Initialize OpenRouter configuration
-        self.api_key = os.getenv('OPENROUTER_API_KEY')  # Get from environment variable
-        if not self.api_key:
+        # OpenRouter requests go through the shared LLM gateway
+        if not os.getenv('OPENROUTER_API_KEY'):
             self.logger.error("OPENROUTER_API_KEY not found in environment variables")
-        self.api_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": "https://github.com/replicate/extensions",
-            "X-Title": "EduSphere Bot"
-        }
-        self.logger.info("Initialized OpenRouter configuration")
+        self.llm = get_gateway(bot)
 
         # Conversation management - balanced settings
         self.conversation_history = {}
@@ -87,52 +79,36 @@ class NaturalConversation(commands.Cog):
                 {"role": "user", "content": message_text}
             ]
 
-            payload = {
-                "model": "google/gemini-2.0-flash-thinking-exp:free",
-                "messages": messages,
-                "temperature": 0.8  # Higher temperature for more natural responses
-            }
-
             self.logger.info(f"Generating response in {mode} mode...")
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, headers=self.headers, json=payload, timeout=30) as response:
-                    response_text = await response.text()
-                    self.logger.debug(f"API Response Status: {response.status}")
-                    self.logger.debug(f"Raw API Response: {response_text[:200]}...")
-
-                    error_templates = self.personality.error_templates["hinglish" if mode == "hinglish" else "default"]
-
-                    if response.status != 200:
-                        self.logger.error(f"API error: {response_text}")
-                        return error_templates["api_error"]
-
-                    try:
-                        data = json.loads(response_text)
-                        if "choices" in data and len(data["choices"]) > 0:
-                            content = data["choices"][0]["message"]["content"].strip()
-                            if content:
-                                # Format response with personality
-                                content = self.personality.format_message(content, mode)
-                                self.logger.info(f"Formatted response with personality (mode: {mode}): {content[:100]}...")
-
-                                # Clean up response
-                                content = content.replace('```', '').replace('`', '')  # Remove code blocks
-                                content = content.replace('> ', '').replace('\n', ' ')  # Clean formatting
-                                content = ' '.join(content.split())  # Normalize whitespace
-
-                                # Ensure appropriate length
-                                if len(content) > 2000:
-                                    content = content[:1997] + "..."
-
-                                self.logger.info(f"Final response in {mode} mode (length: {len(content)})")
-                                return content
-
-                        self.logger.error("Invalid or empty response from API")
-                        return error_templates["parsing_error"]
-
-                    except json.JSONDecodeError as e:
-                        self.logger.error(f"JSON parse error: {str(e)}")
-                        return error_templates["parsing_error"]
+            error_templates = self.personality.error_templates["hinglish" if mode == "hinglish" else "default"]
+
+            content = await self.llm.generate(
+                'conversation',
+                messages,
+                lane='conversation',
+                timeout=30,
+                temperature=0.8  # Higher temperature for more natural responses
+            )
+
+            if content:
+                # Format response with personality
+                content = self.personality.format_message(content, mode)
+                self.logger.info(f"Formatted response with personality (mode: {mode}): {content[:100]}...")
+
+                # Clean up response
+                content = content.replace('```', '').replace('`', '')  # Remove code blocks
+                content = content.replace('> ', '').replace('\n', ' ')  # Clean formatting
+                content = ' '.join(content.split())  # Normalize whitespace
+
+                # Ensure appropriate length
+                if len(content) > 2000:
+                    content = content[:1997] + "..."
+
+                self.logger.info(f"Final response in {mode} mode (length: {len(content)})")
+                return content
+
+            self.logger.error("Invalid or empty response from API")
+            return error_templates["parsing_error"]
 
         except asyncio.TimeoutError:
             error_templates = self.personality.error_templates["hinglish" if mode == "hinglish" else "default"]
@@ -0,0 +1,47 @@
+import argparse
+import json
+import logging
+import os
+
+from question_store import (CLASS_LEVELS, PACKED_BANK_DIR, PackedQuestionStore, load_packed_bank,
+                            write_packed_bank)
+
+logging.basicConfig(level=logging.INFO,
+                   format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def convert(bank_dir: str, additions=(), class_levels=CLASS_LEVELS):
+    """Merge {subject: {topic: [questions]}} JSON files into the packed bank and rewrite it"""
+    store = load_packed_bank(bank_dir)
+    before = len(store.questions)
+    for path in additions:
+        with open(path, encoding='utf-8') as f:
+            store.add_bank(json.load(f), class_levels=class_levels)
+    logger.info(f"Added {len(store.questions) - before} new questions to the {before} already packed")
+
+    counts = write_packed_bank(store, bank_dir)
+    logger.info(f"Wrote {sum(counts.values())} questions across {len(counts)} subjects to {bank_dir}")
+
+    # Read everything back through the packed store to make sure offsets line up
+    expected = sorted(range(len(store.questions)), key=lambda i: store.placement[i][0])
+    packed = PackedQuestionStore(bank_dir)
+    for subject in counts:
+        packed._ensure_subject(subject)
+    for packed_index, index in enumerate(expected):
+        if packed.question_at(packed_index) != store.question_at(index):
+            raise ValueError(f"Round trip mismatch for question {index}")
+    packed.close()
+
+    size = sum(os.path.getsize(os.path.join(bank_dir, name)) for name in os.listdir(bank_dir))
+    logger.info(f"Verified round trip, {size / 1024:.1f} KiB on disk")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add questions to the packed question bank")
+    parser.add_argument('additions', nargs='*', help="JSON files of {subject: {topic: [questions]}}")
+    parser.add_argument('--bank', default=PACKED_BANK_DIR, help="Directory of the packed bank")
+    parser.add_argument('--class-level', type=int, choices=CLASS_LEVELS,
+                        help="Class the added questions are for (default: both)")
+    args = parser.parse_args()
+    convert(args.bank, args.additions, (args.class_level,) if args.class_level else CLASS_LEVELS)
@@ -4,6 +4,11 @@ from discord.ext import commands
 from dotenv import load_dotenv
 import logging
 from utils.logger import setup_logger
+from utils.database import Database
+from utils.llm_gateway import LLMGateway
+from utils.migrations import migrate
+from utils.response_cache import ResponseCache
+from utils.timer_service import TimerService
 import asyncio
 
 # Load environment variables before anything else
@@ -32,6 +37,11 @@ class EducationalBot(commands.Bot):
             help_command=None  # Disable default help command
         )
         self.logger = logger
+        self.llm = LLMGateway()  # Shared LLM gateway with per-provider limits for all cogs
+        self.gemini = self.llm.gemini
+        self.db = Database()  # Shared async SQLite access to user_data.db for all cogs
+        self.response_cache = ResponseCache(self.db)  # Cached answers for repeated AI questions
+        self.timers = TimerService(self.db)  # Persistent delayed jobs such as answer reveals
         self.initial_extensions = [
             'cogs.ai_chat_enhanced',  # Using enhanced AI chat with Gemini
             'cogs.admin_core',
@@ -53,6 +63,9 @@ class EducationalBot(commands.Bot):
     async def setup_hook(self):
         """Initial setup and load extensions"""
         logger.info("Starting bot initialization...")
+        await self.llm.start()
+        await migrate(self.db)
+        await self.response_cache.start()
         logger.info("Loading extensions...")
 
         for extension in self.initial_extensions:
@@ -64,6 +77,18 @@ class EducationalBot(commands.Bot):
                 logger.error(f"Failed to load extension {extension}: {str(e)}")
                 logger.exception(e)
 
+        # Started after extensions so every cog has registered its timer handlers
+        await self.timers.start()
+
+    async def close(self):
+        """Shut down shared services before closing the connection"""
+        await self.timers.stop()
+        await self.llm.close()
+        await self.response_cache.stop()
+        await super().close()
+        # Cogs flush their buffered writes while unloading in super().close(), so close last
+        self.db.close()
+
     async def on_ready(self):
         """Called when the bot is ready and connected"""
         logger.info(f'Bot is ready! Logged in as {self.user.name}')
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+import yt_dlp
+
+# Shared by searches and stream resolution: "in_playlist" makes a ytsearch5 a cheap flat listing
+# (title, duration, thumbnail) while a single watch URL is still fully resolved to a stream
+YDL_OPTIONS = {
+    'format': 'bestaudio/best',
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': 'in_playlist',
+    'simulate': True,
+    'skip_download': True,
+    'force_generic_extractor': False
+}
+
+# Large per-format/per-caption data the bot never reads; dropped before results cross the process boundary
+HEAVY_KEYS = ('formats', 'requested_formats', 'thumbnails', 'subtitles', 'automatic_captions',
+              'heatmap', 'chapters', 'http_headers', 'fragments')
+
+
+def _build_ydl(ydl_opts: Dict[str, Any]) -> yt_dlp.YoutubeDL:
+    ydl = yt_dlp.YoutubeDL(ydl_opts)
+    ydl.get_info_extractor('Youtube')  # Instantiates the extractor and its imports
+    ydl.get_info_extractor('YoutubeSearch')
+    return ydl
+
+
+def slim_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    slim = {key: value for key, value in info.items() if key not in HEAVY_KEYS}
+    if not slim.get('thumbnail') and info.get('thumbnails'):
+        slim['thumbnail'] = info['thumbnails'][-1].get('url', '')  # Flat entries only list thumbnails
+    if info.get('entries') is not None:
+        slim['entries'] = [slim_info(entry) for entry in info['entries'] if entry]
+    return slim
+
+
+# --- worker process side ---
+
+_worker_ydl: Optional[yt_dlp.YoutubeDL] = None
+
+
+def _init_worker(ydl_opts: Dict[str, Any]):
+    global _worker_ydl
+    _worker_ydl = _build_ydl(ydl_opts)
+
+
+def _worker_ready() -> bool:
+    return _worker_ydl is not None
+
+
+def _worker_extract(url: str) -> Dict[str, Any]:
+    return slim_info(_worker_ydl.extract_info(url, download=False))
+
+
+# --- backends ---
+
+class ThreadExtractor:
+    """Reusable YoutubeDL instances run on threads, each used by one extraction at a time
+
+    Building a YoutubeDL and its YouTube extractor is the slow part of a cold search, so
+    instances are created once up front and handed out per call. A timed-out extraction
+    can't be interrupted; its instance returns to the pool when the thread finishes.
+    """
+
+    mode = 'thread'
+
+    def __init__(self, ydl_opts: Dict[str, Any], workers: int = 2, timeout: float = 30.0):
+        self.logger = logging.getLogger('discord_bot')
+        self.ydl_opts = ydl_opts
+        self.workers = workers
+        self.timeout = timeout
+        self.metrics = {'jobs': 0, 'timeouts': 0, 'failures': 0, 'total_ms': 0.0}
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+
+    async def warm(self):
+        """Create every instance now instead of on the first searches"""
+        missing = self.workers - self._created
+        if missing <= 0:
+            return
+        self._created += missing
+        started = time.perf_counter()
+        instances = await asyncio.gather(*(asyncio.to_thread(_build_ydl, self.ydl_opts) for _ in range(missing)))
+        for ydl in instances:
+            self._idle.put_nowait(ydl)
+        self.logger.info(f"Warmed {missing} YoutubeDL instances in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    async def extract_info(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        if self._idle.empty() and self._created < self.workers:
+            self._created += 1
+            ydl = await asyncio.to_thread(_build_ydl, self.ydl_opts)
+        else:
+            ydl = await self._idle.get()
+        started = time.perf_counter()
+        job = asyncio.ensure_future(asyncio.to_thread(ydl.extract_info, url, download=False))
+        job.add_done_callback(lambda _: self._idle.put_nowait(ydl))
+        try:
+            info = await asyncio.wait_for(asyncio.shield(job), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics['timeouts'] += 1
+            raise
+        except Exception:
+            self.metrics['failures'] += 1
+            raise
+        self.metrics['jobs'] += 1
+        self.metrics['total_ms'] += (time.perf_counter() - started) * 1000
+        return slim_info(info)  # Same shape as the process backend, thumbnail fallback included
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics, 'mode': self.mode, 'workers': self.workers,
+                'avg_ms': self.metrics['total_ms'] / max(self.metrics['jobs'], 1)}
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class ProcessExtractor:
+    """yt-dlp extraction in worker processes, so its GIL-bound parsing never stalls the event loop
+
+    At most `workers` jobs run at once and each has a timeout. A job cancelled before it starts
+    is dropped; one cancelled while running finishes in its worker and the result is discarded.
+    A running job that times out may be hung, so the worker pool is replaced and any other job
+    caught in it is retried once on the new pool.
+    """
+
+    mode = 'process'
+
+    def __init__(self, ydl_opts: Dict[str, Any], workers: int = 2, timeout: float = 30.0):
+        self.logger = logging.getLogger('discord_bot')
+        self.ydl_opts = ydl_opts
+        self.workers = workers
+        self.timeout = timeout
+        self.metrics = {'jobs': 0, 'timeouts': 0, 'failures': 0, 'recycles': 0, 'total_ms': 0.0}
+        self._slots = asyncio.Semaphore(workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the bot process has running threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.ydl_opts,)
+            )
+        return self._executor
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """Kill a pool whose worker is stuck on an abandoned job and start a fresh one lazily"""
+        if executor is not self._executor:
+            return
+        self._executor = None
+        self.metrics['recycles'] += 1
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.logger.warning("Replaced extraction worker pool after an abandoned job")
+
+    async def warm(self):
+        """Start every worker process and build its YoutubeDL ahead of the first search"""
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, _worker_ready) for _ in range(self.workers)))
+        self.logger.info(f"Warmed {self.workers} extraction processes in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def _release_when_done(self, future):
+        """Hold a cancelled job's slot until its worker is actually free again"""
+        loop = asyncio.get_running_loop()
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self._slots.release)
+            except RuntimeError:  # Loop already closed on shutdown
+                pass
+        future.add_done_callback(release)
+
+    async def extract_info(self, url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        await self._slots.acquire()
+        release = True
+        try:
+            started = time.perf_counter()
+            for attempt in range(2):
+                executor = self._pool()
+                future = executor.submit(_worker_extract, url)
+                try:
+                    info = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+                except BrokenProcessPool:
+                    self._recycle(executor)
+                    if attempt:
+                        self.metrics['failures'] += 1
+                        raise
+                    continue
+                except asyncio.TimeoutError:
+                    self.metrics['timeouts'] += 1
+                    if not future.done():  # Hung in a worker: replacing the pool is the only way to stop it
+                        self._recycle(executor)
+                    raise
+                except asyncio.CancelledError:
+                    if not future.cancel():  # Already running: let it finish and drop the result
+                        release = False
+                        self._release_when_done(future)
+                    raise
+                except Exception:
+                    self.metrics['failures'] += 1
+                    raise
+                self.metrics['jobs'] += 1
+                self.metrics['total_ms'] += (time.perf_counter() - started) * 1000
+                return info
+        finally:
+            if release:
+                self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics, 'mode': self.mode, 'workers': self.workers,
+                'avg_ms': self.metrics['total_ms'] / max(self.metrics['jobs'], 1)}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def create_extractor(mode: str, ydl_opts: Dict[str, Any], workers: int = 2, timeout: float = 30.0):
+    """Extraction backend by name: 'process' (default) or 'thread'"""
+    backends = {'thread': ThreadExtractor, 'process': ProcessExtractor}
+    if mode not in backends:
+        raise ValueError(f"Unknown extraction mode: {mode} (expected one of {', '.join(backends)})")
+    return backends[mode](ydl_opts, workers=workers, timeout=timeout)
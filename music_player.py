@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import discord
+
+Track = Dict[str, Any]
+LOOP_MODES = ('off', 'track', 'queue')
+
+
+class TrackQueue(asyncio.Queue):
+    """asyncio.Queue of tracks that can also be listed, shuffled and edited in place"""
+
+    def _init(self, maxsize):
+        self._queue: Deque[Track] = deque()
+
+    def _put(self, item: Track):
+        self._queue.append(item)
+
+    def _get(self) -> Track:
+        return self._queue.popleft()
+
+    def peek(self) -> Optional[Track]:
+        return self._queue[0] if self._queue else None
+
+    def tracks(self) -> List[Track]:
+        return list(self._queue)
+
+    def shuffle(self):
+        items = list(self._queue)
+        random.shuffle(items)
+        self._queue.clear()
+        self._queue.extend(items)
+
+    def remove(self, index: int) -> Track:
+        track = self._queue[index]
+        del self._queue[index]
+        return track
+
+    def clear(self):
+        self._queue.clear()
+
+
+class GuildPlayer:
+    """Plays one guild's queue from a single task, resolving the next track's stream while one plays"""
+
+    def __init__(self, guild: discord.Guild,
+                 resolve: Callable[[Track], Awaitable[None]],
+                 create_source: Callable[[Track], discord.AudioSource],
+                 on_start: Callable[[Track], Awaitable[None]],
+                 on_end: Callable[[Track, Optional[Exception]], Awaitable[None]],
+                 is_stale: Optional[Callable[[Track], bool]] = None):
+        self.logger = logging.getLogger('discord_bot')
+        self.guild = guild
+        self.guild_id = guild.id
+        self.resolve = resolve
+        self.is_stale = is_stale  # Whether a repeating track's stream URL must be resolved again
+        self.create_source = create_source
+        self.on_start = on_start
+        self.on_end = on_end
+        self.queue = TrackQueue()
+        self.current: Optional[Track] = None
+        self.loop_mode = 'off'
+        self.metrics = {'played': 0, 'prefetched': 0, 'prefetch_hits': 0, 'total_gap_ms': 0.0, 'max_gap_ms': 0.0}
+        self._prefetch: Dict[int, asyncio.Task] = {}  # id(track) -> resolve task
+        self._track_done = asyncio.Event()
+        self._last_error: Optional[Exception] = None
+        self._skipping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def voice_client(self) -> Optional[discord.VoiceClient]:
+        # Looked up on every use: a reconnect replaces the guild's voice client
+        return self.guild.voice_client
+
+    # --- public API ---
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def enqueue(self, track: Track) -> int:
+        """Add a track and return how many tracks will play before it"""
+        ahead = self.queue.qsize() + (1 if self.current else 0)
+        await self.queue.put(track)
+        self._schedule_prefetch()
+        self.start()
+        return ahead
+
+    def skip(self) -> bool:
+        """End the current track now; a track loop moves on, a queue loop keeps it for the next round"""
+        voice_client = self.voice_client
+        if not self.current or voice_client is None or not voice_client.is_connected():
+            return False
+        self._skipping = True
+        voice_client.stop()
+        return True
+
+    def shuffle(self):
+        self.queue.shuffle()
+        self._schedule_prefetch()
+
+    def set_loop(self, mode: str):
+        if mode not in LOOP_MODES:
+            raise ValueError(f"Unknown loop mode: {mode}")
+        self.loop_mode = mode
+
+    def swap_source(self, source: discord.AudioSource):
+        """Replace what is playing (seek, effects) without ending the track or advancing the queue"""
+        voice_client = self.voice_client
+        if voice_client is None:
+            source.cleanup()
+            return
+        old = voice_client.source
+        voice_client.source = source
+        if old is not None:
+            old.cleanup()
+
+    def stop(self):
+        """Clear the queue and stop playback; the player task waits for the next enqueue"""
+        self.queue.clear()
+        for task in self._prefetch.values():
+            task.cancel()
+        self._prefetch.clear()
+        self.current = None
+        voice_client = self.voice_client
+        if voice_client is not None and (voice_client.is_playing() or voice_client.is_paused()):
+            voice_client.stop()
+
+    async def close(self):
+        self.stop()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        played = self.metrics['played']
+        return {
+            **self.metrics,
+            'queued': self.queue.qsize(),
+            'avg_gap_ms': self.metrics['total_gap_ms'] / max(played - 1, 1)
+        }
+
+    # --- internals ---
+
+    def _schedule_prefetch(self):
+        """Start resolving the next track's stream URL in the background"""
+        upcoming = self.queue.peek()
+        if upcoming is None or id(upcoming) in self._prefetch:
+            return
+        self._prefetch[id(upcoming)] = asyncio.create_task(self.resolve(upcoming))
+        self.metrics['prefetched'] += 1
+
+    async def _ready(self, track: Track):
+        task = self._prefetch.pop(id(track), None)
+        if task is not None and not task.cancelled():
+            try:
+                await task
+                self.metrics['prefetch_hits'] += 1
+                return
+            except Exception as e:
+                self.logger.warning(f"Prefetch failed for {track.get('title')}, resolving again: {str(e)}")
+        await self.resolve(track)
+
+    def _after(self, error: Optional[Exception]):
+        # Called from the audio thread via call_soon_threadsafe
+        self._last_error = error
+        self._track_done.set()
+
+    def _next_track(self, previous: Optional[Track], error: Optional[Exception]) -> Optional[Track]:
+        """Apply the loop mode to the track that just finished"""
+        if previous is None or error is not None:
+            return None
+        if self.loop_mode == 'track' and not self._skipping:
+            return previous
+        if self.loop_mode == 'queue':
+            self.queue.put_nowait(previous)  # Skipped tracks too: they come round again with the rest
+        return None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        ended_at: Optional[float] = None
+        previous: Optional[Track] = None
+        error: Optional[Exception] = None
+        while True:
+            track = self._next_track(previous, error)
+            self._skipping = False
+            if track is None:
+                self.current = None
+                if self.queue.empty():
+                    ended_at = None  # An idle wait is not a gap between tracks
+                track = await self.queue.get()
+
+            try:
+                # A repeat of the track that just played reuses its stream URL while it is still valid
+                if track is not previous or (self.is_stale is not None and self.is_stale(track)):
+                    await self._ready(track)
+                source = self.create_source(track)
+            except Exception as e:
+                self.logger.error(f"Could not prepare {track.get('title')}: {str(e)}")
+                previous, error = None, e
+                continue
+
+            self._track_done.clear()
+            self.current = track
+            try:
+                voice_client = self.voice_client
+                if voice_client is None:
+                    raise RuntimeError("not connected to voice")
+                voice_client.play(source, after=lambda e: loop.call_soon_threadsafe(self._after, e))
+            except Exception as e:
+                self.logger.error(f"Could not start {track.get('title')}: {str(e)}")
+                source.cleanup()
+                previous, error = None, e
+                continue
+
+            if ended_at is not None:
+                gap = (time.perf_counter() - ended_at) * 1000
+                self.metrics['total_gap_ms'] += gap
+                self.metrics['max_gap_ms'] = max(self.metrics['max_gap_ms'], gap)
+            self.metrics['played'] += 1
+            self._schedule_prefetch()
+
+            try:
+                await self.on_start(track)
+            except Exception as e:
+                self.logger.error(f"Error announcing track: {str(e)}")
+
+            await self._track_done.wait()
+            ended_at = time.perf_counter()
+            error = self._last_error
+            # stop() clears current; a stopped track must not loop back in
+            previous = track if self.current is track else None
+            try:
+                await self.on_end(track, error)
+            except Exception as e:
+                self.logger.error(f"Error finishing track: {str(e)}")
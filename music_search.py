@@ -0,0 +1,120 @@
+import asyncio
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.database import Database
+from utils.migrations import migrate
+
+SongResults = List[Dict[str, Any]]
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a search: case, punctuation and spacing don't change what YouTube returns"""
+    query = unicodedata.normalize('NFKC', query).casefold()
+    return ' '.join(re.sub(r'[^\w]+', ' ', query).split())
+
+
+class SearchCache:
+    """Search results by normalized query: an in-memory LRU in front of a SQLite table, both with a TTL"""
+
+    def __init__(self, db: Database, max_entries: int = 512, ttl: float = 24 * 3600):
+        self.logger = logging.getLogger('discord_bot')
+        self.db = db
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: 'OrderedDict[str, Tuple[float, SongResults]]' = OrderedDict()
+        self.metrics = {'memory_hits': 0, 'db_hits': 0, 'misses': 0, 'hit_ms': 0.0}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def setup_database(self):
+        try:
+            await migrate(self.db)
+            removed = await self.prune()
+            if removed:
+                self.logger.info(f"Pruned {removed} expired search cache entries")
+        except Exception as e:
+            self.logger.error(f"Error setting up search cache database: {str(e)}")
+
+    # --- public API ---
+
+    async def get(self, query: str, fetch: Callable[[str], Awaitable[SongResults]]) -> SongResults:
+        """Cached results for query, calling fetch(query) on a miss; concurrent misses share one fetch"""
+        key = normalize_query(query)
+        started = time.perf_counter()
+        results = await self._lookup(key)
+        if results is not None:
+            self.metrics['hit_ms'] += (time.perf_counter() - started) * 1000
+            return [dict(song) for song in results]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return [dict(song) for song in await asyncio.shield(inflight)]
+
+        self.metrics['misses'] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            results = await fetch(query)
+            if results:
+                await self.put(key, results)
+            future.set_result(results)
+            return [dict(song) for song in results]
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; waiters still receive it
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def put(self, key: str, results: SongResults):
+        now = time.time()
+        self._remember(key, now, results)
+        await self.db.execute('''
+            INSERT OR REPLACE INTO music_search_cache (query, results, created_at) VALUES (?, ?, ?)
+        ''', (key, json.dumps(results), now))
+
+    async def prune(self) -> int:
+        result = await self.db.execute('DELETE FROM music_search_cache WHERE created_at < ?',
+                                       (time.time() - self.ttl,))
+        return result.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.metrics['memory_hits'] + self.metrics['db_hits']
+        lookups = hits + self.metrics['misses']
+        return {
+            **self.metrics,
+            'entries': len(self.entries),
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'avg_hit_ms': self.metrics['hit_ms'] / hits if hits else 0.0
+        }
+
+    # --- internals ---
+
+    def _remember(self, key: str, created_at: float, results: SongResults):
+        self.entries[key] = (created_at, results)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def _lookup(self, key: str) -> Optional[SongResults]:
+        now = time.time()
+        entry = self.entries.get(key)
+        if entry is not None:
+            if now - entry[0] < self.ttl:
+                self.entries.move_to_end(key)
+                self.metrics['memory_hits'] += 1
+                return entry[1]
+            del self.entries[key]
+
+        row = await self.db.fetchone('SELECT results, created_at FROM music_search_cache WHERE query = ?', (key,))
+        if row is None or now - row[1] >= self.ttl:
+            return None
+        results = json.loads(row[0])
+        self._remember(key, row[1], results)
+        self.metrics['db_hits'] += 1
+        return results
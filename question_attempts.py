@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.database import Database
+from utils.migrations import migrate
+
+Attempt = Tuple[str, str, str, int, str, int, float]  # user, subject, topic, class, answer, correct, time
+
+
+class AttemptWriter:
+    """Buffer answer attempts in memory and write them, with study_progress deltas, in batches"""
+
+    def __init__(self, db: Database, flush_interval: float = 2.0, max_batch: int = 200):
+        self.logger = logging.getLogger('discord_bot')
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.buffer: List[Attempt] = []
+        self.metrics = {'recorded': 0, 'flushed': 0, 'batches': 0, 'flush_failures': 0}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def setup_database(self):
+        """Make sure the attempts table and the study_progress upsert key exist"""
+        try:
+            await migrate(self.db)
+        except Exception as e:
+            self.logger.error(f"Error setting up attempts database: {str(e)}")
+
+    # --- public API ---
+
+    def record(self, user_id: str, subject: str, topic: Optional[str], class_level: int,
+               answer: str, correct: bool):
+        """Queue one attempt; never touches the disk on the caller's path"""
+        self.buffer.append((str(user_id), subject, topic or 'General', int(class_level),
+                            answer, int(correct), time.time()))
+        self.metrics['recorded'] += 1
+        if len(self.buffer) >= self.max_batch:
+            self._wakeup.set()
+
+    async def start(self):
+        await self.setup_database()
+        self._stopping = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still buffered"""
+        if self._task:
+            # Let an in-flight flush finish; cancelling it mid-write would drop its batch
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        try:
+            await self.db.transaction(lambda conn: self._write_batch(conn, batch))
+            self.metrics['flushed'] += len(batch)
+            self.metrics['batches'] += 1
+        except Exception as e:
+            # Put the batch back in front so the next flush retries it
+            self.buffer[:0] = batch
+            self.metrics['flush_failures'] += 1
+            self.logger.error(f"Error flushing {len(batch)} attempts: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.metrics, 'buffered': len(self.buffer)}
+
+    # --- internals ---
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Attempt]):
+        # Fold the batch into one delta per (user, subject, topic) before touching the aggregates
+        deltas: Dict[Tuple[str, str, str], List] = {}
+        for user_id, subject, topic, _, _, correct, answered_at in batch:
+            delta = deltas.setdefault((user_id, subject, topic), [0, 0, answered_at])
+            delta[0] += correct
+            delta[1] += 1
+            delta[2] = max(delta[2], answered_at)
+
+        conn.executemany('''
+            INSERT INTO question_attempts
+                (user_id, subject, topic, class_level, answer, correct, answered_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        conn.executemany('''
+            INSERT INTO study_progress (user_id, subject, topic, correct_answers, total_attempts, last_study_time)
+            VALUES (?, ?, ?, ?, ?, datetime(?, 'unixepoch'))
+            ON CONFLICT(user_id, subject, topic) DO UPDATE SET
+                correct_answers = correct_answers + excluded.correct_answers,
+                total_attempts = total_attempts + excluded.total_attempts,
+                last_study_time = excluded.last_study_time
+        ''', [(*key, correct, total, last) for key, (correct, total, last) in deltas.items()])
+
+
+class AnswerKeyStore:
+    """Correct answers for sent questions, kept server-side so buttons only carry a question id"""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def create(self, user_id: str, class_level: int, subject: str, topic: Optional[str],
+                     correct_answer: str) -> int:
+        result = await self.db.execute('''
+            INSERT INTO question_answer_keys (user_id, class_level, subject, topic, correct_answer, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (str(user_id), int(class_level), subject, topic, correct_answer, time.time()))
+        return result.lastrowid
+
+    async def claim(self, question_id: int, user_id: str, choice: str) -> Optional[Tuple[int, str, Optional[str], str]]:
+        """Record the user's one answer to a question; None if it's already answered or not theirs
+
+        Returns (class_level, subject, topic, correct_answer). The check and the write happen in
+        one transaction on the writer thread, so double clicks can't both get through.
+        """
+        def run(conn: sqlite3.Connection):
+            claimed = conn.execute('''
+                UPDATE question_answer_keys SET answered_choice = ?, answered_at = ?
+                WHERE id = ? AND user_id = ? AND answered_choice IS NULL
+            ''', (choice, time.time(), question_id, str(user_id))).rowcount
+            if not claimed:
+                return None
+            return conn.execute('''
+                SELECT class_level, subject, topic, correct_answer FROM question_answer_keys WHERE id = ?
+            ''', (question_id,)).fetchone()
+        return await self.db.transaction(run)
@@ -2,39 +2,56 @@ import os
 import json
 import logging
 import random
-from typing import Optional, Dict, Any
-import google.generativeai as genai
-from question_bank import get_stored_question
+import time
+from typing import Optional, Dict, Any, List, Callable
+from question_parser import QuestionParser, QUESTION_LIST_SCHEMA, QUESTION_SCHEMA
+from question_store import get_stored_question
+from utils.circuit_breaker import CircuitBreaker
+from utils.llm_gateway import LLMGateway, get_gateway
+
+# Upper bound on how long a command waits for Gemini before using the stored bank
+QUESTION_TIMEOUT = 10.0
 
 class QuestionGenerator:
-    def __init__(self):
+    def __init__(self, llm: Optional[LLMGateway] = None):
         self.logger = logging.getLogger('discord_bot')
-        genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.llm = llm or get_gateway()
+        self.parser = QuestionParser()
+        self.breaker = CircuitBreaker('questions', latency_slo=6.0)
+        self.metrics = {'api_calls': 0, 'questions': 0, 'generation_time': 0.0}
 
     async def generate_question(
         self,
         subject: str,
         topic: Optional[str] = None,
         class_level: int = 11,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        exclude: Optional[Callable[[Dict[str, Any]], bool]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Generate a question using Gemini API or fallback to stored questions
+        (stored questions matching exclude are skipped where possible)
         """
-        try:
-            # First try to generate using Gemini
-            question = await self._generate_with_gemini(subject, topic, class_level)
-            if question:
-                self.logger.info("Successfully generated question using Gemini")
-                return question
-
-        except Exception as e:
-            self.logger.error(f"Gemini question generation failed: {str(e)}")
+        if self.breaker.allow():
+            question = None
+            start = time.perf_counter()
+            try:
+                # First try to generate using Gemini
+                question = await self._generate_with_gemini(subject, topic, class_level, timeout=QUESTION_TIMEOUT)
+                if question:
+                    self.logger.info("Successfully generated question using Gemini")
+                    return question
+
+            except Exception as e:
+                self.logger.error(f"Gemini question generation failed: {str(e)}")
+            finally:
+                self.breaker.record(question is not None, time.perf_counter() - start)
+        else:
+            self.logger.info("Question circuit open, skipping Gemini")
 
         # Fallback to stored questions
         self.logger.info(f"Falling back to stored questions for {subject} {topic if topic else ''}")
-        stored_question = get_stored_question(subject, topic)
+        stored_question = get_stored_question(subject, topic, class_level, exclude)
 
         if not stored_question:
             self.logger.error(f"No stored questions found for {subject} {topic if topic else ''}")
@@ -53,11 +70,57 @@ class QuestionGenerator:
 
         return stored_question
 
+    async def generate_batch(
+        self,
+        subject: str,
+        topic: Optional[str],
+        class_level: int,
+        count: int = 5,
+        lane: str = 'prefetch'
+    ) -> List[Dict[str, Any]]:
+        """Generate several questions in one Gemini call, keeping every item that validates"""
+        if not self.breaker.closed or not self.breaker.allow():
+            # Background refills wait for interactive probes to confirm recovery
+            return []
+        prompt = self._create_batch_prompt(subject, topic, class_level, count)
+        questions: List[Dict[str, Any]] = []
+        start = time.perf_counter()
+        try:
+            # Errors and timeouts come back as an empty response and count as failures below
+            response = await self._get_gemini_response(prompt, lane=lane, coalesce=False,
+                                                       schema=QUESTION_LIST_SCHEMA)
+            if response:
+                questions = self.parser.parse_many(response)
+        finally:
+            elapsed = time.perf_counter() - start
+            # A batch does count questions' worth of work, so judge it on the time per question
+            self.breaker.record(bool(questions), elapsed / max(count, 1))
+        self.metrics['api_calls'] += 1
+        self.metrics['generation_time'] += elapsed
+        self.metrics['questions'] += len(questions)
+        self.logger.info(f"Batch generation kept {len(questions)} questions for {subject}")
+        return questions
+
+    def stats(self) -> Dict[str, float]:
+        """Batch throughput in questions per API call and per second, plus parser outcomes"""
+        calls = self.metrics['api_calls']
+        elapsed = self.metrics['generation_time']
+        return {
+            **self.metrics,
+            'questions_per_call': self.metrics['questions'] / calls if calls else 0.0,
+            'questions_per_second': self.metrics['questions'] / elapsed if elapsed else 0.0,
+            **self.parser.metrics,
+            'breaker': self.breaker.stats()
+        }
+
     async def _generate_with_gemini(
         self,
         subject: str,
         topic: Optional[str],
-        class_level: int
+        class_level: int,
+        lane: str = 'questions',
+        coalesce: bool = True,
+        timeout: Optional[float] = None
     ) -> Optional[Dict[str, Any]]:
         """Generate a question using Gemini API"""
         try:
@@ -65,7 +128,7 @@ class QuestionGenerator:
             self.logger.debug(f"Sending prompt to Gemini: {prompt}")
 
             # Generate response using Gemini
-            response = await self._get_gemini_response(prompt)
+            response = await self._get_gemini_response(prompt, lane=lane, coalesce=coalesce, timeout=timeout)
 
             if not response:
                 return None
@@ -73,28 +136,10 @@ class QuestionGenerator:
             # Log the raw response for debugging
             self.logger.debug(f"Raw Gemini response: {response}")
 
-            # Try to extract JSON from the response
-            try:
-                # Look for JSON-like structure in the response
-                start_idx = response.find('{')
-                end_idx = response.rfind('}') + 1
-
-                if start_idx >= 0 and end_idx > start_idx:
-                    json_str = response[start_idx:end_idx]
-                    question_data = json.loads(json_str)
-
-                    # Validate required fields
-                    required_fields = ['question', 'options', 'correct_answer']
-                    if all(field in question_data for field in required_fields):
-                        self.logger.info("Successfully parsed Gemini response")
-                        return question_data
-
-                self.logger.error("Generated question missing required fields")
-                return None
-
-            except json.JSONDecodeError as e:
-                self.logger.error(f"Failed to parse Gemini response as JSON: {str(e)}")
-                return None
+            question_data = self.parser.parse_one(response)
+            if question_data:
+                self.logger.info("Successfully parsed Gemini response")
+            return question_data
 
         except Exception as e:
             self.logger.error(f"Error in Gemini question generation: {str(e)}")
@@ -123,11 +168,42 @@ class QuestionGenerator:
         )
         return base_prompt
 
-    async def _get_gemini_response(self, prompt: str) -> Optional[str]:
-        """Get response from Gemini API"""
+    def _create_batch_prompt(self, subject: str, topic: Optional[str], class_level: int, count: int) -> str:
+        """Create a prompt asking for several questions as one JSON array"""
+        return (
+            "You are a question generator for NCERT curriculum. "
+            f"Generate {count} different multiple-choice questions for class {class_level} {subject}"
+            f"{' on ' + topic if topic else ''}. "
+            "\nIMPORTANT: You must respond with ONLY a JSON array in the following format:\n"
+            "[\n"
+            "  {\n"
+            '    "question": "The question text",\n'
+            '    "options": ["A) option1", "B) option2", "C) option3", "D) option4"],\n'
+            '    "correct_answer": "A",\n'
+            '    "explanation": "Detailed explanation of the answer"\n'
+            "  }\n"
+            "]\n\n"
+            "Requirements:\n"
+            "1. Response must be ONLY the JSON array, no other text\n"
+            f"2. The array must contain exactly {count} questions, each on a different concept\n"
+            "3. Questions must be age-appropriate for the class level\n"
+            "4. Each question must have exactly four options and exactly one correct answer\n"
+            "5. Each question must include a detailed explanation\n"
+            "6. All JSON fields are required"
+        )
+
+    async def _get_gemini_response(self, prompt: str, lane: str = 'questions', coalesce: bool = True,
+                                   schema: Optional[Dict[str, Any]] = None,
+                                   timeout: Optional[float] = None) -> Optional[str]:
+        """Get a JSON response from Gemini API, constrained to the question schema"""
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return await self.llm.generate(
+                'questions', prompt, lane=lane, coalesce=coalesce, timeout=timeout,
+                generation_config={
+                    'response_mime_type': 'application/json',
+                    'response_schema': schema or QUESTION_SCHEMA
+                }
+            )
 
         except Exception as e:
             self.logger.error(f"Gemini API error: {str(e)}")
@@ -0,0 +1,196 @@
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Response schemas for Gemini structured output (OpenAPI subset accepted by generation_config)
+QUESTION_SCHEMA: Dict[str, Any] = {
+    'type': 'OBJECT',
+    'properties': {
+        'question': {'type': 'STRING'},
+        'options': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'correct_answer': {'type': 'STRING', 'enum': ['A', 'B', 'C', 'D']},
+        'explanation': {'type': 'STRING'}
+    },
+    'required': ['question', 'options', 'correct_answer', 'explanation']
+}
+
+QUESTION_LIST_SCHEMA: Dict[str, Any] = {'type': 'ARRAY', 'items': QUESTION_SCHEMA}
+
+LETTERS = 'ABCD'
+
+_SMART_QUOTES = str.maketrans({'“': '"', '”': '"', '„': '"', '″': '"',
+                               '‘': "'", '’': "'", '′': "'"})
+_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$', re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_OPTION_PREFIX = re.compile(r'^\s*\(?([A-Ea-e])\s*[).:]\s*')
+_ANSWER_LETTER = re.compile(r'^\s*(?:option\s+)?\(?([A-Ea-e])\)?(?:[\s.):]|$)', re.IGNORECASE)
+
+
+class QuestionParser:
+    """Strict validation with cheap repairs for common model output defects"""
+
+    def __init__(self):
+        self.logger = logging.getLogger('discord_bot')
+        self.metrics = {'parsed': 0, 'repaired': 0, 'rejected': 0, 'parse_failures': 0}
+
+    # --- JSON extraction ---
+
+    @staticmethod
+    def _balanced(text: str, opener: str) -> Optional[str]:
+        """Return the first balanced JSON value starting with opener, ignoring anything after it"""
+        closer = ']' if opener == '[' else '}'
+        start = text.find(opener)
+        if start < 0:
+            return None
+        depth = 0
+        in_string = False
+        escaped = False
+        for i in range(start, len(text)):
+            char = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '[{':
+                depth += 1
+            elif char in ']}':
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1] if char == closer else None
+        return None
+
+    def _load(self, text: str, opener: str) -> Tuple[Any, bool]:
+        """Decode JSON, retrying with trailing prose, fences, smart quotes and trailing commas fixed"""
+        text = text.strip()
+        try:
+            return json.loads(text), False
+        except json.JSONDecodeError:
+            pass
+
+        candidates = [_FENCE.sub('', text)]
+        candidates.append(candidates[0].translate(_SMART_QUOTES))
+        for candidate in candidates:
+            fragment = self._balanced(candidate, opener)
+            if fragment is None:
+                continue
+            for attempt in (fragment, _TRAILING_COMMA.sub(r'\1', fragment)):
+                try:
+                    return json.loads(attempt), True
+                except json.JSONDecodeError:
+                    continue
+        raise ValueError(f"no parseable JSON {'array' if opener == '[' else 'object'} in response")
+
+    # --- field validation ---
+
+    def normalize(self, data: Any) -> Optional[Dict[str, Any]]:
+        """Return a question with four "X) text" options and a single answer letter, or None"""
+        if not isinstance(data, dict):
+            return None
+
+        question = data.get('question')
+        options = data.get('options')
+        answer = data.get('correct_answer')
+        if not isinstance(question, str) or not question.strip():
+            return None
+        if isinstance(options, dict):
+            options = [options[key] for key in sorted(options)]
+        if not isinstance(options, list) or len(options) != 4:
+            return None
+        if not all(isinstance(o, (str, int, float)) and str(o).strip() for o in options):
+            return None
+        if not isinstance(answer, (str, int)):
+            return None
+
+        # Relabel options by position so letters always run A-D regardless of what the model wrote
+        labels = [_OPTION_PREFIX.match(str(o)) for o in options]
+        labels = [m.group(1).upper() if m else None for m in labels]
+        texts = [_OPTION_PREFIX.sub('', str(o).strip(), count=1).strip() for o in options]
+        letter = self._answer_letter(str(answer), texts, labels)
+        if letter is None:
+            return None
+
+        normalized = dict(data)
+        normalized['question'] = question.strip()
+        normalized['options'] = [f"{LETTERS[i]}) {text}" for i, text in enumerate(texts)]
+        normalized['correct_answer'] = letter
+        normalized.setdefault('explanation', '')
+        return normalized
+
+    @staticmethod
+    def _answer_letter(answer: str, texts: List[str], labels: List[Optional[str]]) -> Optional[str]:
+        answer = answer.strip()
+        if answer.isdigit() and 1 <= int(answer) <= 4:
+            return LETTERS[int(answer) - 1]
+        match = _ANSWER_LETTER.match(answer)
+        if match:
+            letter = match.group(1).upper()
+            # Map through the model's own labels when it lettered the options differently
+            if letter in labels and labels != list(LETTERS):
+                return LETTERS[labels.index(letter)]
+            return letter if letter in LETTERS else None
+        # The model sometimes answers with the option text instead of its letter
+        stripped = _OPTION_PREFIX.sub('', answer, count=1).strip().lower()
+        for i, text in enumerate(texts):
+            if text.lower() == stripped:
+                return LETTERS[i]
+        return None
+
+    # --- public API ---
+
+    def parse_one(self, text: str) -> Optional[Dict[str, Any]]:
+        """Parse a single question object, counting a parse failure if nothing usable comes back"""
+        try:
+            data, repaired = self._load(text, '{')
+        except ValueError as e:
+            self.metrics['parse_failures'] += 1
+            self.logger.error(f"Failed to parse question response: {str(e)}")
+            return None
+
+        if isinstance(data, list) and data:
+            data = data[0]
+        question = self.normalize(data)
+        if question is None:
+            self.metrics['rejected'] += 1
+            self.metrics['parse_failures'] += 1
+            self.logger.error("Generated question failed validation")
+            return None
+
+        self.metrics['parsed'] += 1
+        if repaired or question != data:
+            self.metrics['repaired'] += 1
+        return question
+
+    def parse_many(self, text: str) -> List[Dict[str, Any]]:
+        """Parse an array of questions, keeping every item that validates"""
+        try:
+            data, repaired = self._load(text, '[')
+        except ValueError as e:
+            self.metrics['parse_failures'] += 1
+            self.logger.error(f"Failed to parse question batch: {str(e)}")
+            return []
+
+        if isinstance(data, dict):
+            data = data.get('questions', [data])
+        if not isinstance(data, list):
+            self.metrics['parse_failures'] += 1
+            return []
+
+        questions = []
+        for item in data:
+            question = self.normalize(item)
+            if question is None:
+                self.metrics['rejected'] += 1
+                continue
+            questions.append(question)
+            if repaired or question != item:
+                self.metrics['repaired'] += 1
+        self.metrics['parsed'] += len(questions)
+        if not questions:
+            self.metrics['parse_failures'] += 1
+        return questions
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import logging
+import math
+import sqlite3
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from utils.database import Database
+
+PoolKey = Tuple[int, str, str]
+MAX_EXCLUDE_SCAN = 5  # Buffered questions inspected when skipping excluded ones
+
+
+class DemandTracker:
+    """Exponentially decayed request counter giving a requests-per-minute estimate"""
+
+    def __init__(self, half_life: float = 600.0, count: float = 0.0, updated: Optional[float] = None):
+        self.tau = half_life / math.log(2)
+        self.count = count
+        self.updated = updated or time.time()
+
+    def _decay(self, now: float):
+        self.count *= math.exp(-(now - self.updated) / self.tau)
+        self.updated = now
+
+    def hit(self):
+        self._decay(time.time())
+        self.count += 1
+
+    def rate_per_minute(self) -> float:
+        self._decay(time.time())
+        return self.count / (self.tau / 60)
+
+
+class QuestionPool:
+    """Background-refilled buffers of generated questions per (class, subject, topic)"""
+
+    def __init__(self, generator, db: Database, min_size: int = 2, max_size: int = 25,
+                 lead_minutes: float = 3.0, refill_interval: float = 5.0, max_concurrent_refills: int = 2,
+                 batch_size: int = 5, min_rate: float = 0.2, prune_below: float = 0.001):
+        self.logger = logging.getLogger('discord_bot')
+        self.generator = generator
+        self.db = db
+        self.min_size = min_size
+        self.max_size = max_size
+        self.lead_minutes = lead_minutes
+        self.refill_interval = refill_interval
+        self.max_concurrent_refills = max_concurrent_refills
+        self.batch_size = batch_size
+        self.min_rate = min_rate  # Requests/minute before a key is worth paying to prefetch
+        self.prune_below = prune_below  # Decayed request count at which a key is forgotten
+        self.buffers: Dict[PoolKey, Deque[Tuple[int, Dict[str, Any]]]] = {}
+        self.demand: Dict[PoolKey, DemandTracker] = {}
+        self.metrics = {'hits': 0, 'misses': 0, 'generated': 0, 'refill_failures': 0}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._deletes: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def make_key(class_level: int, subject: str, topic: Optional[str]) -> PoolKey:
+        return int(class_level), subject.lower(), (topic or '').strip().lower()
+
+    # --- persistence (runs on the database writer thread) ---
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, key: PoolKey, questions: List[Dict[str, Any]]) -> List[int]:
+        now = time.time()
+        return [
+            conn.execute(
+                'INSERT INTO question_pool (class_level, subject, topic, payload, created_at) VALUES (?, ?, ?, ?, ?)',
+                (*key, json.dumps(question), now)
+            ).lastrowid
+            for question in questions
+        ]
+
+    @staticmethod
+    def _forget(conn: sqlite3.Connection, keys: List[PoolKey]):
+        conn.executemany(
+            'DELETE FROM question_pool WHERE class_level = ? AND subject = ? AND topic = ?', keys
+        )
+        conn.executemany(
+            'DELETE FROM question_pool_demand WHERE class_level = ? AND subject = ? AND topic = ?', keys
+        )
+
+    # --- lifecycle ---
+
+    async def start(self):
+        """Restore persisted pools and demand, then start the refill worker"""
+        try:
+            items = await self.db.fetchall(
+                'SELECT id, class_level, subject, topic, payload FROM question_pool ORDER BY id'
+            )
+            demand = await self.db.fetchall(
+                'SELECT class_level, subject, topic, count, updated FROM question_pool_demand'
+            )
+            for row_id, class_level, subject, topic, payload in items:
+                key = (class_level, subject, topic)
+                self.buffers.setdefault(key, deque()).append((row_id, json.loads(payload)))
+            for class_level, subject, topic, count, updated in demand:
+                self.demand[(class_level, subject, topic)] = DemandTracker(count=count, updated=updated)
+            self.logger.info(f"Question pool restored {len(items)} questions across {len(self.buffers)} keys")
+        except Exception as e:
+            self.logger.error(f"Error restoring question pool: {str(e)}")
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._deletes:
+            await asyncio.gather(*self._deletes, return_exceptions=True)
+        await self._persist_demand()
+
+    async def _persist_demand(self):
+        rows = [(*key, tracker.count, tracker.updated) for key, tracker in self.demand.items()]
+        if not rows:
+            return
+        try:
+            await self.db.executemany('''
+                INSERT OR REPLACE INTO question_pool_demand (class_level, subject, topic, count, updated)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+        except Exception as e:
+            self.logger.error(f"Error saving question pool demand: {str(e)}")
+
+    # --- public API ---
+
+    def pop(self, class_level: int, subject: str, topic: Optional[str],
+            exclude: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Optional[Dict[str, Any]]:
+        """Take a pre-generated question in O(1), recording demand for this key
+
+        Questions matching exclude are left in the buffer for other users; only the first
+        MAX_EXCLUDE_SCAN entries are inspected.
+        """
+        key = self.make_key(class_level, subject, topic)
+        self.demand.setdefault(key, DemandTracker()).hit()
+        self._wakeup.set()
+
+        buffer = self.buffers.get(key)
+        if not buffer:
+            self.metrics['misses'] += 1
+            return None
+
+        position = 0
+        if exclude is not None:
+            limit = min(len(buffer), MAX_EXCLUDE_SCAN)
+            while position < limit and exclude(buffer[position][1]):
+                position += 1
+            if position == limit:
+                self.metrics['misses'] += 1
+                return None
+        row_id, question = buffer[position]
+        del buffer[position]
+        self.metrics['hits'] += 1
+        task = asyncio.create_task(self.db.execute('DELETE FROM question_pool WHERE id = ?', (row_id,)))
+        self._deletes.add(task)
+        task.add_done_callback(self._deletes.discard)
+        return question
+
+    def target_size(self, key: PoolKey) -> int:
+        """Buffer size that covers the expected demand over the refill lead time"""
+        tracker = self.demand.get(key)
+        if tracker is None:
+            return 0
+        rate = tracker.rate_per_minute()
+        if rate < self.min_rate:
+            return 0  # One-off or cold key; not worth paid generation ahead of time
+        return max(self.min_size, min(self.max_size, math.ceil(rate * self.lead_minutes)))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        return {
+            **self.metrics,
+            'keys': len(self.buffers),
+            'buffered': sum(len(buffer) for buffer in self.buffers.values()),
+            'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0
+        }
+
+    # --- background refill ---
+
+    def _deficits(self) -> List[Tuple[float, PoolKey, int]]:
+        deficits = []
+        for key in list(self.demand):
+            missing = self.target_size(key) - len(self.buffers.get(key, ()))
+            if missing > 0:
+                deficits.append((self.demand[key].rate_per_minute(), key, missing))
+        # Most requested keys are refilled first
+        deficits.sort(reverse=True)
+        return deficits
+
+    async def _prune_cold(self):
+        """Forget keys nobody has asked for in a long time, with their buffered questions"""
+        cold = []
+        for key, tracker in list(self.demand.items()):
+            tracker.rate_per_minute()  # Brings the decayed count up to date
+            if tracker.count < self.prune_below:
+                cold.append(key)
+        # Questions restored for keys with no demand record at all are dropped too
+        cold.extend(key for key in self.buffers if key not in self.demand)
+        if not cold:
+            return
+        for key in cold:
+            self.demand.pop(key, None)
+            self.buffers.pop(key, None)
+        await self.db.transaction(lambda conn: self._forget(conn, cold))
+        self.logger.info(f"Question pool pruned {len(cold)} cold keys")
+
+    async def _refill_key(self, key: PoolKey, missing: int):
+        class_level, subject, topic = key
+        # One batched call covers the deficit; cap it so other keys get a turn
+        questions = await self.generator.generate_batch(
+            subject, topic or None, class_level, count=min(missing, self.batch_size)
+        )
+        if not questions:
+            self.metrics['refill_failures'] += 1
+            return
+        # The model may return more than asked for, and the buffer may have changed meanwhile
+        buffer = self.buffers.setdefault(key, deque())
+        questions = questions[:max(0, min(missing, self.max_size - len(buffer)))]
+        if not questions:
+            return
+        row_ids = await self.db.transaction(lambda conn: self._insert(conn, key, questions))
+        buffer.extend(zip(row_ids, questions))
+        self.metrics['generated'] += len(questions)
+
+    async def _refill_loop(self):
+        last_persist = time.time()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                deficits = self._deficits()[:self.max_concurrent_refills]
+                if deficits:
+                    await asyncio.gather(*(self._refill_key(key, missing) for _, key, missing in deficits))
+
+                if time.time() - last_persist > 60:
+                    await self._prune_cold()
+                    await self._persist_demand()
+                    last_persist = time.time()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error refilling question pool: {str(e)}")
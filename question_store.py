@@ -0,0 +1,321 @@
+import difflib
+import json
+import logging
+import mmap
+import os
+import random
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CLASS_LEVELS = (11, 12)
+DEFAULT_TOPIC = 'General'
+PACKED_BANK_DIR = 'data/question_bank'
+MAX_EXCLUDE_ATTEMPTS = 8  # Random draws before accepting a repeat
+
+StoreKey = Tuple[int, str, str]
+
+
+def normalize_subject(subject: str) -> str:
+    return '_'.join((subject or '').lower().replace('-', ' ').split())
+
+
+def normalize_topic(topic: Optional[str]) -> str:
+    return ' '.join((topic or '').lower().split())
+
+
+class AliasTable:
+    """Vose alias table: O(n) to build, O(1) weighted sampling"""
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        if n == 0:
+            raise ValueError("AliasTable needs at least one weight")
+        if any(w < 0 for w in weights):
+            raise ValueError("AliasTable weights must not be negative")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("AliasTable weights must not all be zero")
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class QuestionStore:
+    """Flat question array with precomputed per-(class, subject, topic) index arrays"""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.logger = logging.getLogger('discord_bot')
+        self.rng = rng or random.Random()
+        self.questions: List[Any] = []
+        self.weights: List[float] = []
+        self.placement: List[Tuple[str, str, Tuple[int, ...]]] = []  # (subject, topic, class levels)
+        self.by_topic: Dict[StoreKey, List[int]] = {}
+        self.by_subject: Dict[Tuple[int, str], List[int]] = {}
+        self.topic_names: Dict[Tuple[int, str], Dict[str, str]] = {}  # normalized -> display name
+        self._aliases: Dict[Any, Optional[AliasTable]] = {}
+        self._topic_matches: Dict[Tuple[int, str, str], Optional[str]] = {}
+        self._by_text: Dict[Tuple[str, str, str], int] = {}
+        self._indexed: set = set()
+
+    # --- building ---
+
+    def add(self, question: Dict[str, Any], subject: str, topic: Optional[str],
+            class_levels: Iterable[int] = CLASS_LEVELS):
+        """Index one question under each class level it applies to; repeats across banks are merged"""
+        topic = topic or DEFAULT_TOPIC
+        subject_key = normalize_subject(subject)
+        text_key = (subject_key, normalize_topic(topic), question.get('question', '').strip())
+        index = self._by_text.get(text_key)
+        if index is None:
+            index = self._append(question, float(question.get('weight', 1.0)), subject_key, topic, ())
+            self._by_text[text_key] = index
+        self._index(index, subject_key, topic, class_levels)
+
+    def _append(self, question: Any, weight: float, subject_key: str, topic: str,
+                class_levels: Tuple[int, ...]) -> int:
+        self.questions.append(question)
+        self.weights.append(weight)
+        self.placement.append((subject_key, topic, class_levels))
+        return len(self.questions) - 1
+
+    def _index(self, index: int, subject_key: str, topic: str, class_levels: Iterable[int]):
+        topic_key = normalize_topic(topic)
+        class_levels = tuple(class_levels)
+        placed_subject, placed_topic, levels = self.placement[index]
+        self.placement[index] = (placed_subject, placed_topic, tuple(sorted(set(levels) | set(class_levels))))
+        for class_level in class_levels:
+            key = (class_level, subject_key, topic_key)
+            if (key, index) in self._indexed:
+                continue
+            self._indexed.add((key, index))
+            self.by_topic.setdefault(key, []).append(index)
+            self.by_subject.setdefault((class_level, subject_key), []).append(index)
+            self.topic_names.setdefault((class_level, subject_key), {}).setdefault(topic_key, topic)
+        self._aliases.clear()
+        self._topic_matches.clear()
+
+    def add_bank(self, bank: Dict[str, Any], class_levels: Iterable[int] = CLASS_LEVELS):
+        """Index a {subject: {topic: [questions]}} bank; a bare list is filed under the default topic"""
+        class_levels = tuple(class_levels)
+        for subject, topics in bank.items():
+            if isinstance(topics, list):
+                topics = {DEFAULT_TOPIC: topics}
+            for topic, questions in topics.items():
+                for question in questions:
+                    self.add(question, subject, topic, class_levels)
+
+    # --- lookup ---
+
+    def _ensure_subject(self, subject_key: str):
+        """Hook for stores that load subjects on first access"""
+
+    def question_at(self, index: int) -> Dict[str, Any]:
+        return self.questions[index]
+
+    def resolve_topic(self, class_level: int, subject: str, topic: str) -> Optional[str]:
+        """Map a user-typed topic to an indexed one: exact, then prefix/substring, then fuzzy"""
+        subject_key = normalize_subject(subject)
+        wanted = normalize_topic(topic)
+        cache_key = (class_level, subject_key, wanted)
+        if cache_key in self._topic_matches:
+            return self._topic_matches[cache_key]
+
+        known = list(self.topic_names.get((class_level, subject_key), {}))
+        match = None
+        if wanted in known:
+            match = wanted
+        else:
+            partial = [t for t in known if t.startswith(wanted) or wanted in t]
+            if partial:
+                match = min(partial, key=len)
+            else:
+                close = difflib.get_close_matches(wanted, known, n=1, cutoff=0.6)
+                match = close[0] if close else None
+        self._topic_matches[cache_key] = match
+        return match
+
+    def candidates(self, subject: str, topic: Optional[str] = None,
+                   class_level: Optional[int] = None) -> Tuple[Any, List[int]]:
+        """Return the cache key and index array for a lookup (empty when nothing matches)"""
+        subject_key = normalize_subject(subject)
+        self._ensure_subject(subject_key)
+        levels = (class_level,) if class_level in CLASS_LEVELS else CLASS_LEVELS
+        for level in levels:
+            if topic:
+                topic_key = self.resolve_topic(level, subject_key, topic)
+                if topic_key is None:
+                    continue
+                key = (level, subject_key, topic_key)
+                return key, self.by_topic[key]
+            key = (level, subject_key)
+            if key in self.by_subject:
+                return key, self.by_subject[key]
+        return None, []
+
+    def _alias_for(self, key: Any, indices: List[int]) -> Optional[AliasTable]:
+        if key not in self._aliases:
+            weights = [self.weights[i] for i in indices]
+            # Uniform keys skip the table and use a plain random index
+            self._aliases[key] = AliasTable(weights) if len(set(weights)) > 1 else None
+        return self._aliases[key]
+
+    def random_question(self, subject: str, topic: Optional[str] = None,
+                        class_level: Optional[int] = None,
+                        exclude: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Optional[Dict[str, Any]]:
+        """Pick a question in O(1); questions with a 'weight' field are sampled proportionally
+
+        exclude rejects questions the caller does not want (e.g. already seen). At most
+        MAX_EXCLUDE_ATTEMPTS candidates are tried; after that a repeat is returned.
+        """
+        key, indices = self.candidates(subject, topic, class_level)
+        if not indices:
+            return None
+        if exclude is not None and len(indices) <= MAX_EXCLUDE_ATTEMPTS:
+            # Small keys: walk every candidate once from a random start
+            start = self.rng.randrange(len(indices))
+            for offset in range(len(indices)):
+                question = self.question_at(indices[(start + offset) % len(indices)])
+                if not exclude(question):
+                    return question
+            return question
+
+        alias = self._alias_for(key, indices)
+        for _ in range(MAX_EXCLUDE_ATTEMPTS if exclude else 1):
+            position = alias.sample(self.rng) if alias else self.rng.randrange(len(indices))
+            question = self.question_at(indices[position])
+            if exclude is None or not exclude(question):
+                break
+        return question
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'questions': len(self.questions),
+            'topics': len(self.by_topic),
+            'subjects': len(self.by_subject)
+        }
+
+
+class PackedQuestionStore(QuestionStore):
+    """Question store backed by per-subject JSON lines files, loaded lazily through an offset index
+
+    Layout of the bank directory:
+        index.json          {"version": 1, "subjects": {subject: {"count": n}}}
+        <subject>.jsonl     one question object per line
+        <subject>.idx.json  [[offset, length, topic, [class levels], weight], ...]
+
+    Only the offset index is held in memory; question bodies are decoded on selection.
+    """
+
+    def __init__(self, directory: str = PACKED_BANK_DIR, rng: Optional[random.Random] = None):
+        super().__init__(rng)
+        self.directory = directory
+        with open(os.path.join(directory, 'index.json'), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self._loaded: Dict[str, Optional[mmap.mmap]] = {}
+        self._files = []
+
+    def _ensure_subject(self, subject_key: str):
+        if subject_key in self._loaded:
+            return
+        self._loaded[subject_key] = None
+        if subject_key not in self.manifest.get('subjects', {}):
+            return
+        try:
+            with open(os.path.join(self.directory, f"{subject_key}.idx.json"), encoding='utf-8') as f:
+                entries = json.load(f)
+            data_file = open(os.path.join(self.directory, f"{subject_key}.jsonl"), 'rb')
+            self._files.append(data_file)
+            data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error loading question bank for {subject_key}: {str(e)}")
+            return
+
+        self._loaded[subject_key] = data
+        for offset, length, topic, class_levels, weight in entries:
+            index = self._append((subject_key, offset, length), weight, subject_key, topic, ())
+            self._index(index, subject_key, topic, class_levels)
+        self.logger.info(f"Loaded {len(entries)} {subject_key} questions from packed bank")
+
+    def question_at(self, index: int) -> Dict[str, Any]:
+        subject_key, offset, length = self.questions[index]
+        return json.loads(self._loaded[subject_key][offset:offset + length])
+
+    def close(self):
+        for data in self._loaded.values():
+            if data is not None:
+                data.close()
+        for data_file in self._files:
+            data_file.close()
+        self._loaded.clear()
+        self._files.clear()
+
+
+def write_packed_bank(store: QuestionStore, directory: str = PACKED_BANK_DIR) -> Dict[str, int]:
+    """Write every question in store to the packed per-subject format; returns counts per subject"""
+    os.makedirs(directory, exist_ok=True)
+    by_subject: Dict[str, List[int]] = {}
+    for index, (subject_key, _, _) in enumerate(store.placement):
+        by_subject.setdefault(subject_key, []).append(index)
+
+    counts = {}
+    for subject_key, indices in sorted(by_subject.items()):
+        entries = []
+        offset = 0
+        with open(os.path.join(directory, f"{subject_key}.jsonl"), 'wb') as f:
+            for index in indices:
+                line = json.dumps(store.question_at(index), ensure_ascii=False).encode('utf-8')
+                f.write(line + b'\n')
+                _, topic, class_levels = store.placement[index]
+                entries.append([offset, len(line), topic, list(class_levels), store.weights[index]])
+                offset += len(line) + 1
+        with open(os.path.join(directory, f"{subject_key}.idx.json"), 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False)
+        counts[subject_key] = len(entries)
+
+    with open(os.path.join(directory, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'subjects': {s: {'count': n} for s, n in counts.items()}}, f, indent=2)
+    return counts
+
+
+def load_packed_bank(directory: str = PACKED_BANK_DIR) -> QuestionStore:
+    """Read every subject of a packed bank into an in-memory store, e.g. to edit and rewrite it"""
+    packed = PackedQuestionStore(directory)
+    store = QuestionStore()
+    try:
+        for subject_key in packed.manifest.get('subjects', {}):
+            packed._ensure_subject(subject_key)
+        for index, (subject_key, topic, class_levels) in enumerate(packed.placement):
+            store.add(packed.question_at(index), subject_key, topic, class_levels)
+    finally:
+        packed.close()
+    return store
+
+
+_default_store: Optional[QuestionStore] = None
+
+
+def get_question_store() -> QuestionStore:
+    """Return the process-wide store over the packed bank"""
+    global _default_store
+    if _default_store is None:
+        _default_store = PackedQuestionStore(PACKED_BANK_DIR)
+    return _default_store
+
+
+def get_stored_question(subject: str, topic: Optional[str] = None, class_level: Optional[int] = None,
+                        exclude: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Optional[Dict[str, Any]]:
+    """Random stored question for a subject, optional topic and class, avoiding excluded ones"""
+    return get_question_store().random_question(subject, topic, class_level, exclude)
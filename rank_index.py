@@ -0,0 +1,211 @@
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils.database import Database
+from xp_accumulator import XPAccumulator
+
+
+class RankIndex:
+    """Order statistics over one guild's XP: a Fenwick tree counting users per XP bucket
+
+    XP is grouped into at most max_buckets equal-width buckets, so the tree stays small however
+    high scores climb; each bucket keeps the distinct scores in it sorted to order its users.
+    Updates, rank and k-th place lookups are O(log buckets) plus a scan of one bucket's distinct
+    scores (at most its width). The tree grows, and the width doubles, when a score outgrows it.
+    """
+
+    def __init__(self, scores: Optional[Dict[str, int]] = None, max_buckets: int = 1 << 16):
+        self.max_buckets = max_buckets
+        self.scores: Dict[str, int] = {}
+        self.holders: Dict[int, Set[str]] = {}  # xp -> users on exactly that score
+        for user_id, xp in (scores or {}).items():
+            xp = max(int(xp), 0)
+            self.scores[user_id] = xp
+            self.holders.setdefault(xp, set()).add(user_id)
+        self._build(max(self.holders, default=0))
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def _build(self, max_score: int):
+        """Rebuild the buckets and tree in O(n log n) large enough to hold max_score"""
+        width = 1
+        while max_score // width >= self.max_buckets:
+            width <<= 1
+        size = 1
+        while size <= max_score // width:
+            size <<= 1
+        buckets: Dict[int, List[int]] = {}  # bucket -> distinct scores in it, ascending
+        tree = array('q', bytes(8 * (size + 1)))
+        for xp in sorted(self.holders):
+            buckets.setdefault(xp // width, []).append(xp)
+            tree[xp // width + 1] += len(self.holders[xp])
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self.width = width
+        self.size = size
+        self.tree = tree
+        self.buckets = buckets
+
+    def _update(self, bucket: int, delta: int):
+        i = bucket + 1
+        tree, size = self.tree, self.size
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+
+    def _count_at_most(self, bucket: int) -> int:
+        i = min(bucket + 1, self.size)
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _kth_smallest(self, k: int) -> int:
+        """Bucket holding the k-th lowest score (1-based) by binary lifting"""
+        position, step = 0, self.size
+        tree = self.tree
+        while step:
+            candidate = position + step
+            if candidate <= self.size and tree[candidate] < k:
+                position = candidate
+                k -= tree[candidate]
+            step >>= 1
+        return position
+
+    def _insert(self, xp: int):
+        """Count a user newly on xp (already added to holders)"""
+        bucket = xp // self.width
+        if len(self.holders[xp]) == 1:
+            insort(self.buckets.setdefault(bucket, []), xp)
+        self._update(bucket, 1)
+
+    def _remove(self, xp: int):
+        """Uncount a user who left xp (already removed from holders)"""
+        bucket = xp // self.width
+        if xp not in self.holders:
+            values = self.buckets[bucket]
+            del values[bisect_left(values, xp)]
+            if not values:
+                del self.buckets[bucket]
+        self._update(bucket, -1)
+
+    # --- public API ---
+
+    def set(self, user_id: str, xp: int):
+        xp = max(int(xp), 0)
+        old = self.scores.get(user_id)
+        if old == xp:
+            return
+        if old is not None:
+            users = self.holders[old]
+            users.discard(user_id)
+            if not users:
+                del self.holders[old]
+            self._remove(old)
+        self.scores[user_id] = xp
+        self.holders.setdefault(xp, set()).add(user_id)
+        if xp // self.width >= self.size:
+            self._build(xp)
+        else:
+            self._insert(xp)
+
+    def add(self, user_id: str, amount: int):
+        self.set(user_id, self.scores.get(user_id, 0) + amount)
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based position of the user; users tied on XP share a rank"""
+        xp = self.scores.get(user_id)
+        if xp is None:
+            return None
+        bucket = xp // self.width
+        values = self.buckets[bucket]
+        above = len(self.scores) - self._count_at_most(bucket)
+        above += sum(len(self.holders[higher]) for higher in values[bisect_right(values, xp):])
+        return above + 1
+
+    def top(self, count: int = 10) -> List[Tuple[str, int]]:
+        """Highest scores first as (user_id, xp), ties ordered by user id"""
+        results: List[Tuple[str, int]] = []
+        total = len(self.scores)
+        placed = 0
+        while len(results) < count and placed < total:
+            for xp in reversed(self.buckets[self._kth_smallest(total - placed)]):
+                users = self.holders[xp]
+                placed += len(users)
+                if len(results) < count:
+                    results.extend((user_id, xp) for user_id in sorted(users))
+        return results[:count]
+
+
+class GuildLeaderboards:
+    """Per-guild rank indexes, loaded lazily from guild_xp and kept current as XP is awarded
+
+    Only the max_boards most recently viewed guilds stay in memory; an evicted guild is simply
+    reloaded from guild_xp on its next lookup.
+    """
+
+    def __init__(self, db: Database, xp: XPAccumulator, max_boards: int = 100):
+        self.logger = logging.getLogger('discord_bot')
+        self.db = db
+        self.xp = xp
+        self.max_boards = max_boards
+        self.boards: OrderedDict[str, RankIndex] = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._buffered: Dict[str, List[Tuple[str, int]]] = {}
+        xp.guild_listeners.append(self.record)
+
+    def record(self, guild_id: str, user_id: str, amount: int):
+        """Apply an XP gain to the guild's index (or hold it while the index is loading)"""
+        board = self.boards.get(guild_id)
+        if board is not None:
+            board.add(user_id, amount)
+        elif guild_id in self._buffered:
+            self._buffered[guild_id].append((user_id, amount))
+
+    async def get(self, guild_id: str) -> RankIndex:
+        board = self.boards.get(guild_id)
+        if board is not None:
+            self.boards.move_to_end(guild_id)
+            return board
+        loading = self._loading.get(guild_id)
+        if loading is not None:
+            return await asyncio.shield(loading)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[guild_id] = future
+        self._buffered[guild_id] = []
+        # The read runs on the writer thread, after any XP batch already queued there; gains
+        # still held by the accumulator are added on top, and later ones are buffered above
+        unflushed = self.xp.guild_pending_for(guild_id)
+        try:
+            rows = await self.db.transaction(lambda conn: conn.execute(
+                'SELECT user_id, xp FROM guild_xp WHERE guild_id = ?', (guild_id,)
+            ).fetchall())
+            scores = dict(rows)
+            for user_id, amount in unflushed.items():
+                scores[user_id] = scores.get(user_id, 0) + amount
+            board = await asyncio.to_thread(RankIndex, scores)
+            for user_id, amount in self._buffered.pop(guild_id):
+                board.add(user_id, amount)
+            self.boards[guild_id] = board
+            while len(self.boards) > self.max_boards:
+                self.boards.popitem(last=False)
+            future.set_result(board)
+            self.logger.info(f"Loaded leaderboard for guild {guild_id} with {len(board)} members")
+            return board
+        except Exception as e:
+            self._buffered.pop(guild_id, None)
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; waiters still receive it
+            raise
+        finally:
+            self._loading.pop(guild_id, None)
@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import math
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from utils.database import Database
+
+SeenKey = Tuple[str, str]
+
+
+def question_fingerprint(question: Dict[str, Any]) -> bytes:
+    """Stable 16-byte digest of a question's normalized text"""
+    text = ' '.join(str(question.get('question', '')).lower().split())
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class BloomFilter:
+    """Bloom filter over question fingerprints using double hashing"""
+
+    def __init__(self, bits: Optional[bytearray] = None, size_bits: int = 16384, hashes: int = 5):
+        self.size_bits = size_bits if bits is None else len(bits) * 8
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray(size_bits // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> 'BloomFilter':
+        """Smallest filter holding capacity items at the given false positive rate"""
+        size_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2 / 8) * 8
+        return cls(size_bits=size_bits, hashes=max(1, round(size_bits / capacity * math.log(2))))
+
+    def capacity(self, error_rate: float) -> int:
+        """Items this filter holds before its false positive rate passes error_rate"""
+        return int(-self.size_bits / self.hashes * math.log(1 - error_rate ** (1 / self.hashes)))
+
+    def _positions(self, fingerprint: bytes):
+        h1 = int.from_bytes(fingerprint[:8], 'little')
+        h2 = int.from_bytes(fingerprint[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, fingerprint: bytes):
+        for pos in self._positions(fingerprint):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, fingerprint: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fingerprint))
+
+
+class SeenQuestionTracker:
+    """Per-user, per-subject Bloom filters of questions already served, persisted to SQLite
+
+    Each filter is sized for `capacity` questions at `error_rate`. Once it is full it becomes the
+    previous generation and a fresh filter takes over, so lookups check both and the false
+    positive rate stays near the target while the oldest questions are eventually forgotten.
+    """
+
+    def __init__(self, db: Database, max_cached: int = 5000, capacity: int = 1000, error_rate: float = 0.01):
+        self.logger = logging.getLogger('discord_bot')
+        self.db = db
+        self.max_cached = max_cached
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.filters: Dict[SeenKey, BloomFilter] = {}
+        self.previous: Dict[SeenKey, BloomFilter] = {}
+        self.counts: Dict[SeenKey, int] = {}  # Questions in the current generation
+        self.metrics = {'marked': 0, 'skipped': 0, 'rotations': 0}
+
+    # --- public API ---
+
+    async def load(self, user_id: str, subject: str):
+        """Bring a user's filter for this subject into memory; call before has_seen()"""
+        key = (str(user_id), subject.lower())
+        if key in self.filters:
+            return
+        try:
+            row = await self.db.fetchone(
+                'SELECT bits, count, hashes, previous, previous_hashes FROM seen_questions '
+                'WHERE user_id = ? AND subject = ?', key
+            )
+        except Exception as e:
+            self.logger.error(f"Error loading seen questions: {str(e)}")
+            row = None
+
+        if len(self.filters) >= self.max_cached:
+            # Filters are persisted on every mark, so dropping the oldest one loses nothing
+            oldest = next(iter(self.filters))
+            self.filters.pop(oldest)
+            self.previous.pop(oldest, None)
+            self.counts.pop(oldest, None)
+        if row:
+            bits, count, hashes, previous, previous_hashes = row
+            self.filters[key] = BloomFilter(bytearray(bits), hashes=hashes)
+            if previous:
+                self.previous[key] = BloomFilter(bytearray(previous), hashes=previous_hashes)
+            self.counts[key] = count
+        else:
+            self.filters[key] = BloomFilter.for_capacity(self.capacity, self.error_rate)
+            self.counts[key] = 0
+
+    def has_seen(self, user_id: str, subject: str, question: Dict[str, Any]) -> bool:
+        """Constant-time membership test (false positives possible, never false negatives)"""
+        key = (str(user_id), subject.lower())
+        seen_filter = self.filters.get(key)
+        if seen_filter is None:
+            return False
+        fingerprint = question_fingerprint(question)
+        previous = self.previous.get(key)
+        if fingerprint not in seen_filter and (previous is None or fingerprint not in previous):
+            return False
+        self.metrics['skipped'] += 1
+        return True
+
+    async def mark_seen(self, user_id: str, subject: str, question: Dict[str, Any]):
+        """Record that a question was served to a user and persist the filter"""
+        key = (str(user_id), subject.lower())
+        if key not in self.filters:
+            await self.load(user_id, subject)
+        seen_filter = self.filters[key]
+        if self.counts.get(key, 0) >= seen_filter.capacity(self.error_rate):
+            self.previous[key] = seen_filter
+            seen_filter = self.filters[key] = BloomFilter.for_capacity(self.capacity, self.error_rate)
+            self.counts[key] = 0
+            self.metrics['rotations'] += 1
+        seen_filter.add(question_fingerprint(question))
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.metrics['marked'] += 1
+        previous = self.previous.get(key)
+        try:
+            await self.db.execute('''
+                INSERT OR REPLACE INTO seen_questions
+                    (user_id, subject, bits, count, updated, hashes, previous, previous_hashes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (*key, bytes(seen_filter.bits), self.counts[key], time.time(), seen_filter.hashes,
+                  bytes(previous.bits) if previous else None, previous.hashes if previous else None))
+        except Exception as e:
+            self.logger.error(f"Error saving seen questions: {str(e)}")
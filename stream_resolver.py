@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+_PATH_EXPIRE = re.compile(r'/expire/(\d+)')
+
+
+def parse_expiry(url: str) -> Optional[float]:
+    """Unix time a googlevideo stream URL stops working, from its expire parameter"""
+    parsed = urlparse(url)
+    values = parse_qs(parsed.query).get('expire')
+    if values and values[0].isdigit():
+        return float(values[0])
+    match = _PATH_EXPIRE.search(parsed.path)  # Manifest URLs carry it as a path segment
+    return float(match.group(1)) if match else None
+
+
+def video_id(webpage_url: str) -> str:
+    """YouTube video ID of a watch or short link; other URLs are their own key"""
+    parsed = urlparse(webpage_url)
+    if parsed.netloc.endswith('youtu.be'):
+        return parsed.path.lstrip('/') or webpage_url
+    values = parse_qs(parsed.query).get('v')
+    return values[0] if values else webpage_url
+
+
+class StreamResolver:
+    """Stream URLs by video ID, kept valid by re-resolving active videos before they expire"""
+
+    def __init__(self, extract_info: Callable[[str], Awaitable[Dict[str, Any]]],
+                 active: Callable[[], Iterable[Tuple[str, str]]], refresh_margin: float = 900.0,
+                 default_ttl: float = 3600.0, check_interval: float = 60.0):
+        self.logger = logging.getLogger('discord_bot')
+        self.extract_info = extract_info
+        self.active = active  # (video_id, webpage_url) of everything playing or queued
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self.check_interval = check_interval
+        self.streams: Dict[str, Tuple[str, float]] = {}  # video_id -> (url, expires_at)
+        self.metrics = {'hits': 0, 'extractions': 0, 'refreshes': 0, 'failures': 0}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # --- public API ---
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in self._inflight.values():
+            task.cancel()
+
+    def prefetch(self, vid: str, webpage_url: str):
+        """Start resolving a video that is likely to play soon, unless a fresh URL is cached"""
+        entry = self.streams.get(vid)
+        if entry is None or entry[1] - time.time() < self.refresh_margin:
+            self._refresh(vid, webpage_url)
+
+    async def resolve(self, vid: str, webpage_url: str) -> str:
+        """Valid stream URL for the video; only extracts when nothing usable is cached"""
+        entry = self.streams.get(vid)
+        now = time.time()
+        if entry is not None and entry[1] > now:
+            self.metrics['hits'] += 1
+            if entry[1] - now < self.refresh_margin:
+                self._refresh(vid, webpage_url)  # Still plays now; refresh for later seeks
+            return entry[0]
+        # Shielded: one caller giving up must not cancel the extraction other callers share
+        return await asyncio.shield(self._refresh(vid, webpage_url))
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.metrics, 'cached': len(self.streams)}
+
+    # --- internals ---
+
+    def _refresh(self, vid: str, webpage_url: str) -> asyncio.Task:
+        task = self._inflight.get(vid)
+        if task is None:
+            task = asyncio.create_task(self._extract(vid, webpage_url))
+            self._inflight[vid] = task
+            task.add_done_callback(lambda done: self._finished(vid, done))
+        return task
+
+    def _finished(self, vid: str, task: asyncio.Task):
+        self._inflight.pop(vid, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Background refreshes have no awaiter; callers that awaited saw the error already
+            self.logger.warning(f"Stream resolution failed for {vid}: {str(task.exception())}")
+
+    async def _extract(self, vid: str, webpage_url: str) -> str:
+        self.metrics['extractions'] += 1
+        try:
+            info = await self.extract_info(webpage_url)
+        except Exception:
+            self.metrics['failures'] += 1
+            raise
+        url = info['url']
+        self.streams[vid] = (url, parse_expiry(url) or time.time() + self.default_ttl)
+        return url
+
+    async def _refresh_active(self):
+        now = time.time()
+        active = dict(self.active())
+        # Forget expired streams nothing is going to play
+        for vid in [vid for vid, (_, expires_at) in self.streams.items() if expires_at <= now and vid not in active]:
+            del self.streams[vid]
+        for vid, webpage_url in active.items():
+            entry = self.streams.get(vid)
+            if entry is None or entry[1] - now < self.refresh_margin:
+                self.metrics['refreshes'] += 1
+                try:
+                    await asyncio.shield(self._refresh(vid, webpage_url))
+                except Exception as e:
+                    self.logger.error(f"Error refreshing stream for {vid}: {str(e)}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self._refresh_active()
+            except Exception as e:
+                self.logger.error(f"Error in stream refresh loop: {str(e)}")
@@ -0,0 +1,71 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('discord')
+
+from cogs.achievements import Achievements  # noqa: E402
+from utils.database import Database  # noqa: E402
+from utils.migrations import migrate  # noqa: E402
+
+
+def with_cog(tmp_path, monkeypatch, body):
+    monkeypatch.chdir(tmp_path)  # The cog writes its badges under ./static
+
+    async def run():
+        db = Database(str(tmp_path / 'bot.db'))
+        try:
+            await migrate(db)
+            return await body(db, Achievements(SimpleNamespace(db=db)))
+        finally:
+            db.close()
+    return asyncio.run(run())
+
+
+def test_json_awards_and_completed_progress_are_imported_once(tmp_path, monkeypatch):
+    path = tmp_path / 'achievements.json'
+    path.write_text(json.dumps({'1': ['first_question', 'ai_explorer'], '2': ['first_question']}))
+
+    async def body(db, cog):
+        await db.executemany(
+            'INSERT INTO achievement_progress (user_id, achievement_id, current_count, completed) VALUES (?, ?, ?, ?)',
+            [('3', 'quiz_master', 10, 1), ('3', 'streak', 2, 0)]
+        )
+        await cog.migrate_achievements_json(str(path))
+        await cog.migrate_achievements_json(str(path))  # The file is gone, so this is a no-op
+        return await db.fetchall('SELECT user_id, achievement_id FROM user_achievements ORDER BY user_id, achievement_id')
+
+    rows = with_cog(tmp_path, monkeypatch, body)
+    assert rows == [('1', 'ai_explorer'), ('1', 'first_question'), ('2', 'first_question'), ('3', 'quiz_master')]
+    assert not path.exists() and (tmp_path / 'achievements.json.migrated').exists()
+
+
+def test_existing_awards_are_kept_and_the_cache_sees_imports(tmp_path, monkeypatch):
+    path = tmp_path / 'achievements.json'
+    path.write_text(json.dumps({'1': ['first_question']}))
+
+    async def body(db, cog):
+        await db.execute(
+            "INSERT INTO user_achievements (user_id, achievement_id, awarded_at) VALUES ('1', 'first_question', '2024-01-01')"
+        )
+        await cog.migrate_achievements_json(str(path))
+        awarded = await db.fetchall('SELECT awarded_at FROM user_achievements')
+        return awarded, await cog.get_user_achievements('1')
+
+    awarded, unlocked = with_cog(tmp_path, monkeypatch, body)
+    assert awarded == [('2024-01-01',)]
+    assert unlocked == {'first_question'}
+
+
+def test_unreadable_file_is_left_in_place(tmp_path, monkeypatch):
+    path = tmp_path / 'achievements.json'
+    path.write_text('{not json')
+
+    async def body(db, cog):
+        await cog.migrate_achievements_json(str(path))
+        return await db.fetchall('SELECT * FROM user_achievements')
+
+    assert with_cog(tmp_path, monkeypatch, body) == []
+    assert path.exists()
@@ -0,0 +1,70 @@
+import pytest
+
+from utils import circuit_breaker
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def trip(breaker, calls=5):
+    for _ in range(calls):
+        assert breaker.allow()
+        breaker.record(False, 0.1)
+
+
+def test_stays_closed_below_min_calls():
+    breaker = CircuitBreaker('test', min_calls=5)
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_error_rate_and_short_circuits(clock):
+    breaker = CircuitBreaker('test', min_calls=5, cooldown=30)
+    trip(breaker)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()['short_circuited'] == 1
+
+
+def test_opens_on_p95_latency_over_slo(clock):
+    breaker = CircuitBreaker('test', min_calls=5, latency_slo=2.0)
+    for _ in range(5):
+        breaker.record(True, 3.0)
+    assert breaker.state == OPEN
+
+
+def test_half_open_allows_limited_probes_after_cooldown(clock):
+    breaker = CircuitBreaker('test', min_calls=5, cooldown=30, max_probes=1)
+    trip(breaker)
+    clock[0] += 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes(clock):
+    breaker = CircuitBreaker('test', min_calls=5, cooldown=30)
+    trip(breaker)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record(True, 0.5)
+    assert breaker.state == CLOSED
+    assert breaker.stats()['error_rate'] == 0.0
+
+
+@pytest.mark.parametrize('succeeded, latency', [(False, 0.5), (True, 20.0)])
+def test_failed_or_slow_probe_reopens(clock, succeeded, latency):
+    breaker = CircuitBreaker('test', min_calls=5, cooldown=30, latency_slo=8.0)
+    trip(breaker)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record(succeeded, latency)
+    assert breaker.state == OPEN
+    assert breaker.stats()['trips'] == 2
+    assert not breaker.allow()
@@ -0,0 +1,104 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from utils.database import Database, get_database, split_script
+
+
+def with_db(path, body):
+    async def run():
+        db = Database(path)
+        try:
+            await db.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)')
+            return await body(db)
+        finally:
+            db.close()
+    return asyncio.run(run())
+
+
+def test_split_script_drops_empty_statements():
+    assert split_script('CREATE TABLE a (x);\n\n  CREATE INDEX i ON a(x);  ') == [
+        'CREATE TABLE a (x)', 'CREATE INDEX i ON a(x)'
+    ]
+
+
+def test_writes_report_rowcount_and_lastrowid_and_readers_see_them(tmp_path):
+    async def body(db):
+        first = await db.execute('INSERT INTO items (name) VALUES (?)', ('a',))
+        many = await db.executemany('INSERT INTO items (name) VALUES (?)', [('b',), ('c',)])
+        return first, many, await db.fetchall('SELECT name FROM items ORDER BY id'), \
+            await db.fetchone('SELECT COUNT(*) FROM items')
+
+    first, many, rows, count = with_db(str(tmp_path / 'bot.db'), body)
+    assert first.lastrowid == 1 and first.rowcount == 1
+    assert many.rowcount == 2
+    assert rows == [('a',), ('b',), ('c',)] and count == (3,)
+
+
+def test_failed_transaction_rolls_back(tmp_path):
+    def insert_then_fail(conn):
+        conn.execute("INSERT INTO items (name) VALUES ('kept?')")
+        conn.execute("INSERT INTO items (name) VALUES ('kept?')")  # UNIQUE violation
+
+    async def body(db):
+        with pytest.raises(sqlite3.IntegrityError):
+            await db.transaction(insert_then_fail)
+        return await db.fetchall('SELECT name FROM items')
+
+    assert with_db(str(tmp_path / 'bot.db'), body) == []
+
+
+def test_concurrent_writers_are_serialized(tmp_path):
+    async def body(db):
+        await asyncio.gather(*(db.execute('INSERT INTO items (name) VALUES (?)', (str(i),)) for i in range(200)))
+        return await db.fetchone('SELECT COUNT(*) FROM items')
+
+    assert with_db(str(tmp_path / 'bot.db'), body) == (200,)
+
+
+def test_reader_connections_are_read_only(tmp_path):
+    async def body(db):
+        with pytest.raises(sqlite3.OperationalError):
+            await db.fetchall("INSERT INTO items (name) VALUES ('x')")
+
+    with_db(str(tmp_path / 'bot.db'), body)
+
+
+def test_stats_track_queries(tmp_path):
+    async def body(db):
+        for _ in range(3):
+            await db.fetchall('SELECT * FROM items')
+        return db.stats()
+
+    stats = with_db(str(tmp_path / 'bot.db'), body)
+    slowest = {entry['sql']: entry for entry in stats['slowest']}
+    assert slowest['SELECT * FROM items']['count'] == 3
+    assert stats['write_queue'] == 0
+
+
+def test_close_finishes_queued_writes(tmp_path):
+    path = str(tmp_path / 'bot.db')
+
+    async def run():
+        db = Database(path)
+        await db.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+        futures = [db.submit(lambda conn, i=i: conn.execute('INSERT INTO items (name) VALUES (?)', (str(i),)))
+                   for i in range(50)]
+        db.close()
+        with pytest.raises(RuntimeError):
+            db.submit(lambda conn: None)
+        return all(future.done() for future in futures)
+
+    assert asyncio.run(run())
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM items').fetchone() == (50,)
+    finally:
+        conn.close()
+
+
+def test_get_database_prefers_the_bots_instance():
+    shared = object()
+    assert get_database(SimpleNamespace(db=shared)) is shared
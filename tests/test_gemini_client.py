@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('google.generativeai')
+
+from utils.gemini_client import GeminiClient, LoopLagMonitor
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for a GenerativeModel; records which thread each call ran on"""
+
+    def __init__(self, delay=0.0, chunks=('a', 'b', 'c'), error=None):
+        self.delay = delay
+        self.chunks = chunks
+        self.error = error
+        self.threads = []
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        self.threads.append(threading.current_thread().name)
+        if stream:
+            return self._stream()
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return Response(f"answer: {contents}")
+
+    def _stream(self):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield Response(chunk)
+        if self.error:
+            raise self.error
+
+
+def make_client(model, max_workers=2):
+    client = GeminiClient(max_workers=max_workers, api_key='test')
+    client._models['fake'] = model
+    return client
+
+
+def test_generate_runs_on_the_worker_pool():
+    model = FakeModel()
+
+    async def run():
+        client = make_client(model)
+        try:
+            return await client.generate('hi', model='fake'), client.stats()
+        finally:
+            await client.close()
+
+    text, stats = asyncio.run(run())
+    assert text == 'answer: hi'
+    assert model.threads[0].startswith('gemini')
+    assert stats['requests'] == 1 and stats['in_flight'] == 0
+
+
+def test_timeout_keeps_the_slot_until_the_worker_finishes():
+    model = FakeModel(delay=0.2)
+
+    async def run():
+        client = make_client(model, max_workers=1)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await client.generate('slow', model='fake', timeout=0.05)
+            # The only worker is still busy, so the next call has to wait for it
+            start = time.perf_counter()
+            await client.generate('next', model='fake', timeout=1)
+            return time.perf_counter() - start, client.stats()
+        finally:
+            await client.close()
+
+    waited, stats = asyncio.run(run())
+    assert waited >= 0.3
+    assert stats['timeouts'] == 1
+
+
+def test_stream_yields_chunks_in_order():
+    model = FakeModel(delay=0.01)
+
+    async def run():
+        client = make_client(model)
+        try:
+            return [chunk async for chunk in client.stream('hi', model='fake')]
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == ['a', 'b', 'c']
+
+
+def test_stream_raises_worker_errors_after_earlier_chunks():
+    model = FakeModel(chunks=('a',), error=RuntimeError('quota'))
+
+    async def run():
+        client = make_client(model)
+        received = []
+        try:
+            with pytest.raises(RuntimeError):
+                async for chunk in client.stream('hi', model='fake'):
+                    received.append(chunk)
+            return received, client.stats()
+        finally:
+            await client.close()
+
+    received, stats = asyncio.run(run())
+    assert received == ['a']
+    assert stats['failures'] == 1
+
+
+def test_lag_monitor_only_samples_while_active():
+    async def run():
+        monitor = LoopLagMonitor(interval=0.01)
+        active = [False]
+        monitor.start(lambda: active[0])
+        await asyncio.sleep(0.05)
+        idle = monitor.stats()['samples']
+        active[0] = True
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return idle, monitor.stats()
+
+    idle, stats = asyncio.run(run())
+    assert idle == 0
+    assert stats['samples'] > 0
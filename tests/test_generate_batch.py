@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('google.generativeai')
+pytest.importorskip('aiohttp')
+
+from question_generator import QuestionGenerator
+from question_parser import QUESTION_LIST_SCHEMA
+from utils.circuit_breaker import OPEN
+
+
+def question(text, answer='A'):
+    return {
+        'question': text,
+        'options': ['A) one', 'B) two', 'C) three', 'D) four'],
+        'correct_answer': answer,
+        'explanation': 'Because.'
+    }
+
+
+class FakeGateway:
+    def __init__(self, response=None, error=None, delay=0.0):
+        self.response = response
+        self.error = error
+        self.delay = delay
+        self.calls = []
+
+    async def generate(self, model_key, prompt, **kwargs):
+        self.calls.append((model_key, prompt, kwargs))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.response
+
+
+def test_batch_keeps_every_item_that_validates():
+    items = [question('What is 1 + 1?'), {'question': 'No options'}, question('What is 2 + 2?', 'B')]
+    llm = FakeGateway(json.dumps(items))
+    generator = QuestionGenerator(llm)
+
+    questions = asyncio.run(generator.generate_batch('mathematics', 'algebra', 11, count=3))
+
+    assert [q['question'] for q in questions] == ['What is 1 + 1?', 'What is 2 + 2?']
+    assert generator.stats()['api_calls'] == 1 and generator.stats()['questions'] == 2
+
+
+def test_batch_asks_for_count_questions_on_the_prefetch_lane():
+    llm = FakeGateway('[]')
+    asyncio.run(QuestionGenerator(llm).generate_batch('physics', None, 12, count=4))
+
+    model_key, prompt, kwargs = llm.calls[0]
+    assert model_key == 'questions'
+    assert 'Generate 4 different multiple-choice questions for class 12 physics' in prompt
+    assert kwargs['lane'] == 'prefetch' and kwargs['coalesce'] is False
+    assert kwargs['generation_config']['response_schema'] == QUESTION_LIST_SCHEMA
+
+
+def test_batch_returns_nothing_when_the_call_fails():
+    generator = QuestionGenerator(FakeGateway(error=RuntimeError('quota')))
+    assert asyncio.run(generator.generate_batch('biology', None, 11)) == []
+
+
+def test_batch_failures_trip_the_breaker():
+    generator = QuestionGenerator(FakeGateway(error=asyncio.TimeoutError()))
+
+    async def run():
+        for _ in range(generator.breaker.min_calls):
+            await generator.generate_batch('chemistry', None, 11)
+        calls = len(generator.llm.calls)
+        # Once open, refills stop calling upstream
+        await generator.generate_batch('chemistry', None, 11)
+        return calls, len(generator.llm.calls)
+
+    before, after = asyncio.run(run())
+    assert generator.breaker.state == OPEN
+    assert before == after == generator.breaker.min_calls
+
+
+def test_batch_successes_are_recorded():
+    generator = QuestionGenerator(FakeGateway(json.dumps([question('What is 3 + 3?')])))
+    asyncio.run(generator.generate_batch('mathematics', None, 11, count=1))
+    assert list(generator.breaker.samples)[0][0] is True
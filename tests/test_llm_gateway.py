@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip('google.generativeai')
+pytest.importorskip('aiohttp')
+
+from utils.llm_gateway import LLMGateway
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = []
+
+    def generate_content(self, contents, **kwargs):
+        self.calls.append(contents)
+        time.sleep(self.delay)
+        return Response(f"answer: {contents}")
+
+
+def make_gateway(model, rate_per_minute=600, burst=10, concurrency=2):
+    gateway = LLMGateway(
+        registry={'fake': ('gemini', 'fake')},
+        limits={'gemini': {'concurrency': concurrency, 'lanes': {'default': (rate_per_minute, burst)}}}
+    )
+    gateway.gemini._models['fake'] = model
+    return gateway
+
+
+def test_generate_returns_text_and_records_latency():
+    async def run():
+        gateway = make_gateway(FakeModel(0.01))
+        try:
+            return await gateway.generate('fake', 'hi'), gateway.stats()['gemini']
+        finally:
+            await gateway.close()
+
+    text, stats = asyncio.run(run())
+    assert text == 'answer: hi'
+    assert stats['requests'] == 1 and stats['in_flight'] == 0 and stats['p50_latency'] > 0
+
+
+def test_identical_prompts_share_one_call():
+    model = FakeModel(0.05)
+
+    async def run():
+        gateway = make_gateway(model)
+        try:
+            return await asyncio.gather(*(gateway.generate('fake', 'same') for _ in range(4)))
+        finally:
+            await gateway.close()
+
+    assert asyncio.run(run()) == ['answer: same'] * 4
+    assert model.calls == ['same']
+
+
+def test_timeout_covers_queueing_and_the_call_together():
+    # Each stage alone fits in the timeout: ~0.3s for a token, ~0.3s more for the slot and
+    # ~0.3s for the call. Only the sum is over budget.
+    model = FakeModel(0.3)
+
+    async def run():
+        gateway = make_gateway(model, rate_per_minute=200, burst=1, concurrency=1)
+        try:
+            first = asyncio.create_task(gateway.generate('fake', 'first', timeout=5))
+            await asyncio.sleep(0)
+            start = time.perf_counter()
+            with pytest.raises(asyncio.TimeoutError):
+                await gateway.generate('fake', 'second', timeout=0.5)
+            elapsed = time.perf_counter() - start
+            await first
+            return elapsed, gateway.stats()['gemini']
+        finally:
+            await gateway.close()
+
+    elapsed, stats = asyncio.run(run())
+    assert elapsed < 0.7
+    assert stats['queue_depth'] == 0 and stats['in_flight'] == 0
+
+
+def test_slot_is_released_after_a_timed_out_call():
+    model = FakeModel(0.2)
+
+    async def run():
+        gateway = make_gateway(model, concurrency=1)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await gateway.generate('fake', 'slow', timeout=0.05)
+            model.delay = 0.0
+            return await gateway.generate('fake', 'next', timeout=1), gateway.stats()['gemini']
+        finally:
+            await gateway.close()
+
+    text, stats = asyncio.run(run())
+    assert text == 'answer: next'
+    assert stats['errors'] == 1 and stats['in_flight'] == 0
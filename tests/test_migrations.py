@@ -0,0 +1,54 @@
+import asyncio
+import sqlite3
+
+from utils.database import Database
+from utils.migrations import LATEST_VERSION, MIGRATIONS, _apply, _explain_all, migrate
+
+
+def tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")}
+
+
+def test_migrate_is_idempotent(tmp_path):
+    path = str(tmp_path / 'bot.db')
+
+    async def run():
+        db = Database(path)
+        try:
+            first = await migrate(db)
+            again = await migrate(db)
+        finally:
+            db.close()
+        # A fresh process sees the stored version and applies nothing
+        db = Database(path)
+        try:
+            return first, again, await migrate(db)
+        finally:
+            db.close()
+
+    assert asyncio.run(run()) == (LATEST_VERSION,) * 3
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == LATEST_VERSION
+        assert {'user_xp', 'guild_xp', 'music_search_cache', 'question_answer_keys'} <= tables(conn)
+    finally:
+        conn.close()
+
+
+def test_apply_runs_only_pending_migrations():
+    conn = sqlite3.connect(':memory:')
+    assert _apply(conn) == (0, [version for version, _, _ in MIGRATIONS])
+    assert _apply(conn) == (LATEST_VERSION, [])
+
+
+def test_scripts_tolerate_existing_objects():
+    # Pre-migration installs created these tables from the cogs, so every script must be rerunnable
+    conn = sqlite3.connect(':memory:')
+    _apply(conn)
+    conn.execute('PRAGMA user_version = 0')
+    assert _apply(conn)[1][-1] == LATEST_VERSION
+
+
+def test_query_plans_use_their_indexes():
+    failures = [(name, plan) for name, ok, plan in _explain_all() if not ok]
+    assert failures == []
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('yt_dlp')
+
+import music_extraction  # noqa: E402
+from music_extraction import ProcessExtractor, ThreadExtractor, create_extractor, slim_info  # noqa: E402
+
+
+def sleep_extract(url):
+    """Worker-side stand-in for _worker_extract: the URL is how long the job takes"""
+    time.sleep(float(url))
+    return {'title': url}
+
+
+class FakeYDL:
+    built = 0
+
+    def __init__(self, release=None):
+        FakeYDL.built += 1
+        self.release = release
+        self.closed = False
+
+    def extract_info(self, url, download=False):
+        if self.release is not None:
+            self.release.wait(5)
+        return {'title': url, 'formats': [{}] * 3, 'thumbnails': [{'url': 'small'}, {'url': 'large'}]}
+
+    def close(self):
+        self.closed = True
+
+
+def test_slim_info_drops_heavy_keys_and_keeps_a_thumbnail():
+    info = {
+        'title': 'mix', 'formats': [{}], 'http_headers': {},
+        'entries': [{'title': 'a', 'thumbnails': [{'url': 'small'}, {'url': 'large'}]}, None,
+                    {'title': 'b', 'thumbnail': 'own', 'thumbnails': [{'url': 'other'}]}]
+    }
+    assert slim_info(info) == {'title': 'mix', 'entries': [
+        {'title': 'a', 'thumbnail': 'large'}, {'title': 'b', 'thumbnail': 'own'}
+    ]}
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        create_extractor('fiber', {})
+
+
+def test_thread_backend_reuses_its_instances(monkeypatch):
+    monkeypatch.setattr(FakeYDL, 'built', 0)
+    monkeypatch.setattr(music_extraction, '_build_ydl', lambda opts: FakeYDL())
+
+    async def run():
+        extractor = ThreadExtractor({}, workers=2)
+        await extractor.warm()
+        results = await asyncio.gather(*(extractor.extract_info(str(i)) for i in range(6)))
+        extractor.close()
+        return results, extractor.stats()
+
+    results, stats = asyncio.run(run())
+    assert FakeYDL.built == 2
+    assert results[0] == {'title': '0', 'thumbnail': 'large'}
+    assert stats['jobs'] == 6 and stats['mode'] == 'thread'
+
+
+def test_thread_backend_returns_a_timed_out_instance_when_its_thread_finishes(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(music_extraction, '_build_ydl', lambda opts: FakeYDL(release))
+
+    async def run():
+        extractor = ThreadExtractor({}, workers=1)
+        await extractor.warm()
+        with pytest.raises(asyncio.TimeoutError):
+            await extractor.extract_info('stuck', timeout=0.05)
+        idle_while_stuck = extractor._idle.qsize()
+        release.set()
+        info = await extractor.extract_info('next', timeout=5)
+        return idle_while_stuck, info['title'], extractor.stats()['timeouts']
+
+    assert asyncio.run(run()) == (0, 'next', 1)
+
+
+@pytest.fixture
+def process_extractor(monkeypatch):
+    monkeypatch.setattr(music_extraction, '_worker_extract', sleep_extract)
+    extractor = ProcessExtractor({}, workers=1, timeout=10)
+    yield extractor
+    extractor.close()
+
+
+def test_process_backend_recycles_the_pool_after_a_hung_job(process_extractor):
+    async def run():
+        await process_extractor.warm()
+        hung_pool = process_extractor._executor
+        with pytest.raises(asyncio.TimeoutError):
+            await process_extractor.extract_info('30', timeout=0.5)
+        replaced = process_extractor._executor is None
+        info = await process_extractor.extract_info('0')
+        return hung_pool is not process_extractor._executor, replaced, info, process_extractor.stats()
+
+    new_pool, replaced, info, stats = asyncio.run(run())
+    assert new_pool and replaced and info == {'title': '0'}
+    assert stats['timeouts'] == 1 and stats['recycles'] == 1 and stats['jobs'] == 1
+
+
+def test_process_backend_holds_a_cancelled_running_jobs_slot_until_it_finishes(process_extractor):
+    async def run():
+        await process_extractor.warm()
+        job = asyncio.create_task(process_extractor.extract_info('0.5'))
+        await asyncio.sleep(0.2)  # Running in the worker by now
+        job.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await job
+        held = process_extractor._slots.locked()
+        info = await process_extractor.extract_info('0')  # Waits for the slot, then runs
+        return held, info, process_extractor.stats()['recycles']
+
+    assert asyncio.run(run()) == (True, {'title': '0'}, 0)
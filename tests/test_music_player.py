@@ -0,0 +1,168 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('discord')
+
+from music_player import GuildPlayer  # noqa: E402
+
+
+class FakeVoiceClient:
+    """Plays one source at a time; stop() and finish() end it through the `after` callback"""
+
+    def __init__(self):
+        self.source = None
+        self._after = None
+
+    def is_connected(self):
+        return True
+
+    def is_playing(self):
+        return self._after is not None
+
+    def is_paused(self):
+        return False
+
+    def play(self, source, after):
+        self.source = source
+        self._after = after
+
+    def stop(self):
+        after, self._after = self._after, None
+        if after is not None:
+            after(None)
+
+    finish = stop
+
+
+class Harness:
+    def __init__(self, is_stale=None):
+        self.guild = SimpleNamespace(id=1, voice_client=FakeVoiceClient())
+        self.resolved = []
+        self.started = []
+        self.player = GuildPlayer(self.guild, self.resolve, self.create_source,
+                                  self.on_start, self.on_end, is_stale)
+
+    async def resolve(self, track):
+        self.resolved.append(track['title'])
+        track['url'] = f"stream:{track['title']}:{len(self.resolved)}"
+
+    def create_source(self, track):
+        return SimpleNamespace(url=track['url'], cleanup=lambda: None)
+
+    async def on_start(self, track):
+        self.started.append(track['title'])
+
+    async def on_end(self, track, error):
+        pass
+
+    async def finish(self):
+        """End the playing track and let the player start the next one"""
+        self.guild.voice_client.finish()
+        await settle()
+
+
+async def settle():
+    await asyncio.sleep(0.01)
+
+
+def with_player(body, **kwargs):
+    async def run():
+        harness = Harness(**kwargs)
+        try:
+            return await body(harness, harness.player)
+        finally:
+            await harness.player.close()
+    return asyncio.run(run())
+
+
+async def enqueue(player, *titles):
+    for title in titles:
+        await player.enqueue({'title': title})
+    await settle()
+
+
+def test_tracks_play_in_order_with_the_next_one_prefetched():
+    async def body(harness, player):
+        await enqueue(player, 'a', 'b')
+        prefetched = list(harness.resolved)
+        await harness.finish()
+        await harness.finish()
+        return prefetched, harness.started, player.current, player.stats()
+
+    prefetched, started, current, stats = with_player(body)
+    assert prefetched == ['a', 'b']  # 'b' resolved while 'a' was playing
+    assert started == ['a', 'b'] and current is None
+    assert stats['played'] == 2 and stats['prefetch_hits'] == 2
+
+
+def test_track_loop_reuses_the_stream_url_until_it_is_stale():
+    stale = {'now': False}
+
+    async def body(harness, player):
+        player.set_loop('track')
+        await enqueue(player, 'a', 'b')
+        first_url = harness.guild.voice_client.source.url
+        await harness.finish()
+        reused = harness.guild.voice_client.source.url
+        stale['now'] = True
+        await harness.finish()
+        refreshed = harness.guild.voice_client.source.url
+        player.skip()  # Skipping a looping track moves on
+        await settle()
+        return first_url, reused, refreshed, harness.started
+
+    first_url, reused, refreshed, started = with_player(body, is_stale=lambda track: stale['now'])
+    assert reused == first_url and refreshed != first_url
+    assert started == ['a', 'a', 'a', 'b']
+
+
+def test_queue_loop_keeps_skipped_tracks():
+    async def body(harness, player):
+        player.set_loop('queue')
+        await enqueue(player, 'a', 'b')
+        player.skip()
+        await settle()
+        await harness.finish()
+        return harness.started, [track['title'] for track in player.queue.tracks()]
+
+    started, queued = with_player(body)
+    assert started == ['a', 'b', 'a']
+    assert queued == ['b']
+
+
+def test_stopped_tracks_do_not_loop_back():
+    async def body(harness, player):
+        player.set_loop('track')
+        await enqueue(player, 'a', 'b')
+        player.stop()
+        await settle()
+        return player.current, player.queue.tracks(), harness.started
+
+    assert with_player(body) == (None, [], ['a'])
+
+
+def test_skip_and_playback_follow_a_reconnected_voice_client():
+    async def body(harness, player):
+        await enqueue(player, 'a', 'b')
+        old = harness.guild.voice_client
+        harness.guild.voice_client = FakeVoiceClient()  # Reconnect while 'a' plays
+        old.finish()  # The dropped connection ends the track
+        await settle()
+        on_new = harness.guild.voice_client.source.url
+        skipped = player.skip()
+        await settle()
+        return on_new, skipped, player.current
+
+    on_new, skipped, current = with_player(body)
+    assert on_new.startswith('stream:b')
+    assert skipped and current is None
+
+
+def test_unknown_loop_mode_is_rejected():
+    async def body(harness, player):
+        with pytest.raises(ValueError):
+            player.set_loop('forever')
+
+    with_player(body)
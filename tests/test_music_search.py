@@ -0,0 +1,14 @@
+import pytest
+
+from music_search import normalize_query
+
+
+@pytest.mark.parametrize('query', [
+    'Perfect - Ed Sheeran', '  perfect   ed sheeran ', 'PERFECT, ED SHEERAN!!', 'Ｐｅｒｆｅｃｔ ed sheeran',
+])
+def test_equivalent_queries_share_a_key(query):
+    assert normalize_query(query) == 'perfect ed sheeran'
+
+
+def test_different_queries_differ():
+    assert normalize_query('Perfect') != normalize_query('Perfect Symphony')
@@ -0,0 +1,90 @@
+import asyncio
+
+from question_attempts import AnswerKeyStore, AttemptWriter
+from utils.database import Database
+from utils.migrations import migrate
+
+
+def with_db(path, body):
+    async def run():
+        db = Database(path)
+        try:
+            await migrate(db)
+            return await body(db)
+        finally:
+            db.close()
+    return asyncio.run(run())
+
+
+def test_attempts_are_batched_into_rows_and_progress(tmp_path):
+    async def body(db):
+        writer = AttemptWriter(db, flush_interval=60)
+        await writer.start()
+        writer.record('u1', 'physics', 'optics', 11, 'A', True)
+        writer.record('u1', 'physics', 'optics', 11, 'B', False)
+        writer.record('u2', 'physics', None, 12, 'C', True)
+        before = await db.fetchone('SELECT COUNT(*) FROM question_attempts')
+        await writer.stop()  # Writes what is still buffered
+        attempts = await db.fetchone('SELECT COUNT(*) FROM question_attempts')
+        progress = await db.fetchall('''
+            SELECT user_id, topic, correct_answers, total_attempts FROM study_progress ORDER BY user_id
+        ''')
+        return before[0], attempts[0], progress, writer.stats()
+
+    before, attempts, progress, stats = with_db(str(tmp_path / 'bot.db'), body)
+    assert before == 0 and attempts == 3
+    assert progress == [('u1', 'optics', 1, 2), ('u2', 'General', 1, 1)]
+    assert stats['batches'] == 1 and stats['buffered'] == 0
+
+
+def test_progress_accumulates_across_batches(tmp_path):
+    async def body(db):
+        writer = AttemptWriter(db)
+        for correct in (True, True, False):
+            writer.record('u1', 'maths', 'algebra', 11, 'A', correct)
+            await writer.flush()
+        return await db.fetchone('SELECT correct_answers, total_attempts FROM study_progress')
+
+    assert with_db(str(tmp_path / 'bot.db'), body) == (2, 3)
+
+
+def test_a_full_buffer_wakes_the_flush_loop(tmp_path):
+    async def body(db):
+        writer = AttemptWriter(db, flush_interval=60, max_batch=2)
+        await writer.start()
+        writer.record('u1', 'maths', None, 11, 'A', True)
+        writer.record('u1', 'maths', None, 11, 'B', False)
+        await asyncio.sleep(0.05)
+        flushed = writer.stats()['flushed']
+        await writer.stop()
+        return flushed
+
+    assert with_db(str(tmp_path / 'bot.db'), body) == 2
+
+
+def test_failed_flush_keeps_the_batch(tmp_path):
+    async def body(db):
+        writer = AttemptWriter(db)
+        writer.record('u1', 'maths', None, 11, 'A', True)
+        await db.execute('DROP TABLE question_attempts')
+        await writer.flush()
+        return writer.stats()
+
+    stats = with_db(str(tmp_path / 'bot.db'), body)
+    assert stats['flush_failures'] == 1 and stats['buffered'] == 1
+
+
+def test_each_question_can_be_answered_once_by_its_owner(tmp_path):
+    async def body(db):
+        keys = AnswerKeyStore(db)
+        question_id = await keys.create('u1', 11, 'physics', 'optics', 'B')
+        stranger = await keys.claim(question_id, 'u2', 'B')
+        clicks = await asyncio.gather(*(keys.claim(question_id, 'u1', choice) for choice in 'ABCD'))
+        row = await db.fetchone('SELECT answered_choice FROM question_answer_keys WHERE id = ?', (question_id,))
+        return stranger, clicks, row[0]
+
+    stranger, clicks, answered = with_db(str(tmp_path / 'bot.db'), body)
+    assert stranger is None
+    winners = [click for click in clicks if click is not None]
+    assert winners == [(11, 'physics', 'optics', 'B')]
+    assert answered == 'ABCD'[clicks.index(winners[0])]
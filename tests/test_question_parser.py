@@ -0,0 +1,73 @@
+import pytest
+
+from question_parser import QuestionParser
+
+VALID = ('{"question": "2 + 2?", "options": ["A) 3", "B) 4", "C) 5", "D) 6"], '
+         '"correct_answer": "B", "explanation": "Basic addition"}')
+
+
+@pytest.fixture
+def parser():
+    return QuestionParser()
+
+
+def test_valid_json_is_parsed_without_repair(parser):
+    question = parser.parse_one(VALID)
+    assert question['correct_answer'] == 'B'
+    assert question['options'][1] == 'B) 4'
+    assert parser.metrics['repaired'] == 0
+
+
+@pytest.mark.parametrize('text', [
+    f"```json\n{VALID}\n```",
+    f"Here is your question:\n{VALID}\nGood luck!",
+    VALID.replace('"Basic addition"}', '"Basic addition",}'),
+    VALID.replace('"', '“', 1).replace('question"', 'question”', 1),
+])
+def test_common_defects_are_repaired(parser, text):
+    question = parser.parse_one(text)
+    assert question is not None
+    assert question['correct_answer'] == 'B'
+    assert parser.metrics['repaired'] == 1
+
+
+@pytest.mark.parametrize('answer, expected', [
+    ('B', 'B'), ('b)', 'B'), ('Option C', 'C'), ('2', 'B'), ('4', 'D'), ('D) 6', 'D'),
+])
+def test_answer_forms_map_to_a_letter(parser, answer, expected):
+    data = {'question': 'q', 'options': ['A) 3', 'B) 4', 'C) 5', 'D) 6'], 'correct_answer': answer}
+    assert parser.normalize(data)['correct_answer'] == expected
+
+
+def test_answer_given_as_option_text(parser):
+    data = {'question': 'q', 'options': ['Paris', 'Rome', 'Oslo', 'Bern'], 'correct_answer': 'oslo'}
+    assert parser.normalize(data)['correct_answer'] == 'C'
+
+
+def test_options_are_relabelled_by_position(parser):
+    data = {'question': 'q', 'options': ['B) x', 'C) y', 'D) z', 'E) w'], 'correct_answer': 'E'}
+    question = parser.normalize(data)
+    assert question['options'] == ['A) x', 'B) y', 'C) z', 'D) w']
+    assert question['correct_answer'] == 'D'
+
+
+@pytest.mark.parametrize('data', [
+    {'question': 'q', 'options': ['a', 'b', 'c'], 'correct_answer': 'A'},
+    {'question': '', 'options': ['a', 'b', 'c', 'd'], 'correct_answer': 'A'},
+    {'question': 'q', 'options': ['a', 'b', 'c', 'd'], 'correct_answer': 'Z'},
+    ['not', 'a', 'dict'],
+])
+def test_invalid_questions_are_rejected(parser, data):
+    assert parser.normalize(data) is None
+
+
+def test_unparseable_text_counts_a_failure(parser):
+    assert parser.parse_one('no json here') is None
+    assert parser.metrics['parse_failures'] == 1
+
+
+def test_parse_many_keeps_valid_items(parser):
+    bad = '{"question": "q", "options": ["a"], "correct_answer": "A"}'
+    questions = parser.parse_many(f"```json\n[{VALID}, {bad}, {VALID},]\n```")
+    assert len(questions) == 2
+    assert parser.metrics['rejected'] == 1
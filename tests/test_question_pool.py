@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+from question_pool import DemandTracker, QuestionPool
+from utils.database import Database
+from utils.migrations import migrate
+
+KEY = (11, 'physics', 'optics')
+
+
+class FakeGenerator:
+    """Returns `extra` more questions than asked for, like a model ignoring the count"""
+
+    def __init__(self, extra=0):
+        self.extra = extra
+        self.calls = []
+
+    async def generate_batch(self, subject, topic, class_level, count):
+        self.calls.append((subject, topic, class_level, count))
+        return [{'question': f'{subject} {len(self.calls)}.{i}'} for i in range(count + self.extra)]
+
+
+def with_pool(path, body, generator=None, **kwargs):
+    async def run():
+        db = Database(path)
+        try:
+            await migrate(db)
+            return await body(db, QuestionPool(generator or FakeGenerator(), db, **kwargs))
+        finally:
+            db.close()
+    return asyncio.run(run())
+
+
+def make_hot(pool, key=KEY, hits=10):
+    pool.demand[key] = DemandTracker(count=hits)
+
+
+def test_demand_decays_with_its_half_life():
+    tracker = DemandTracker(half_life=60, count=8, updated=time.time() - 60)
+    assert abs(tracker.rate_per_minute() - 4 * 60 / tracker.tau) < 0.01
+
+
+def test_cold_keys_are_not_prefetched_and_hot_keys_are_capped():
+    pool = QuestionPool(FakeGenerator(), db=None, max_size=6)
+    assert pool.target_size(KEY) == 0
+    pool.demand[KEY] = DemandTracker(count=0.01)
+    assert pool.target_size(KEY) == 0
+    make_hot(pool, hits=1000)
+    assert pool.target_size(KEY) == 6
+
+
+def test_refill_never_overfills_the_buffer(tmp_path):
+    async def body(db, pool):
+        make_hot(pool)
+        await pool._refill_key(KEY, 2)  # Generator returns 4 for a request of 2
+        after_first = len(pool.buffers[KEY])
+        await pool._refill_key(KEY, 5)  # Only 1 slot left below max_size
+        rows = await db.fetchone('SELECT COUNT(*) FROM question_pool')
+        return after_first, len(pool.buffers[KEY]), rows[0], pool.stats()['generated']
+
+    result = with_pool(str(tmp_path / 'bot.db'), body, FakeGenerator(extra=2), max_size=3)
+    assert result == (2, 3, 3, 3)
+
+
+def test_pop_serves_buffered_questions_and_deletes_them(tmp_path):
+    async def body(db, pool):
+        make_hot(pool)
+        await pool._refill_key(KEY, 3)
+        first = pool.pop(11, 'Physics', 'Optics')
+        skipped = pool.pop(11, 'physics', 'optics', exclude=lambda q: q['question'].endswith('.1'))
+        await asyncio.gather(*pool._deletes)
+        remaining = await db.fetchall('SELECT payload FROM question_pool')
+        miss = pool.pop(12, 'physics', 'optics')
+        return first, skipped, [q for _, q in pool.buffers[KEY]], len(remaining), miss, pool.stats()
+
+    first, skipped, buffered, remaining, miss, stats = with_pool(str(tmp_path / 'bot.db'), body)
+    assert first == {'question': 'physics 1.0'}
+    assert skipped == {'question': 'physics 1.2'}  # The excluded question stays for others
+    assert buffered == [{'question': 'physics 1.1'}] and remaining == 1
+    assert miss is None and stats['hits'] == 2 and stats['misses'] == 1
+
+
+def test_buffers_and_demand_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'bot.db')
+
+    async def fill(db, pool):
+        make_hot(pool)
+        await pool._refill_key(KEY, 2)
+        await pool.stop()
+
+    async def restore(db, pool):
+        await pool.start()
+        await pool.stop()
+        return [q for _, q in pool.buffers[KEY]], round(pool.demand[KEY].count)
+
+    with_pool(path, fill)
+    assert with_pool(path, restore) == ([{'question': 'physics 1.0'}, {'question': 'physics 1.1'}], 10)
+
+
+def test_cold_keys_are_pruned_with_their_questions(tmp_path):
+    async def body(db, pool):
+        make_hot(pool)
+        await pool._refill_key(KEY, 2)
+        pool.demand[KEY] = DemandTracker(count=0.0001)
+        await pool._prune_cold()
+        return pool.buffers, await db.fetchall('SELECT id FROM question_pool')
+
+    assert with_pool(str(tmp_path / 'bot.db'), body) == ({}, [])
+
+
+def test_refill_loop_fills_requested_keys(tmp_path):
+    async def body(db, pool):
+        for _ in range(5):
+            pool.pop(11, 'physics', 'optics')
+        make_hot(pool, hits=40)
+        await pool.start()
+        await asyncio.sleep(0.1)
+        await pool.stop()
+        return len(pool.buffers[KEY]), pool.target_size(KEY)
+
+    buffered, target = with_pool(str(tmp_path / 'bot.db'), body, refill_interval=0.01, batch_size=2)
+    assert 0 < buffered <= target
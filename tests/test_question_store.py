@@ -0,0 +1,94 @@
+import random
+from collections import Counter
+
+import pytest
+
+from question_store import (PACKED_BANK_DIR, AliasTable, PackedQuestionStore, QuestionStore, load_packed_bank,
+                            normalize_subject, write_packed_bank)
+
+
+def test_alias_table_matches_weights():
+    weights = [1, 2, 3, 4]
+    table = AliasTable(weights)
+    rng = random.Random(7)
+    draws = 100_000
+    counts = Counter(table.sample(rng) for _ in range(draws))
+    for i, weight in enumerate(weights):
+        assert counts[i] / draws == pytest.approx(weight / sum(weights), abs=0.01)
+
+
+def test_alias_table_never_picks_zero_weight():
+    table = AliasTable([0, 5, 0, 1])
+    rng = random.Random(3)
+    assert {table.sample(rng) for _ in range(10_000)} == {1, 3}
+
+
+@pytest.mark.parametrize('weights', [[], [0, 0, 0], [1, -1, 2]])
+def test_alias_table_rejects_unusable_weights(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
+
+
+def test_all_zero_weights_fall_back_to_uniform_sampling():
+    store = QuestionStore(random.Random(3))
+    for i in range(3):
+        store.add({'question': f'q{i}', 'weight': 0}, 'physics', 'motion')
+    picks = {store.random_question('physics', 'motion', 11)['question'] for _ in range(50)}
+    assert picks == {'q0', 'q1', 'q2'}
+
+
+def make_store():
+    store = QuestionStore(random.Random(1))
+    store.add_bank({
+        'Physics': {
+            'Laws of Motion': [{'question': f'motion {i}'} for i in range(20)],
+            'Optics': [{'question': 'light'}],
+        },
+        'Computer-Science': [{'question': 'bits'}],
+    }, class_levels=(11,))
+    return store
+
+
+def test_lookup_by_fuzzy_topic_and_subject_alias():
+    store = make_store()
+    assert normalize_subject('Computer-Science') == 'computer_science'
+    assert store.resolve_topic(11, 'physics', 'laws of motoin') == 'laws of motion'
+    assert store.random_question('computer science', class_level=11)['question'] == 'bits'
+    assert store.random_question('physics', 'optics', 11)['question'] == 'light'
+    assert store.random_question('chemistry') is None
+
+
+def test_exclude_skips_seen_questions():
+    store = make_store()
+    seen = {f'motion {i}' for i in range(19)}
+    question = store.random_question('physics', 'motion', 11, exclude=lambda q: q['question'] in seen)
+    assert question is not None
+
+
+def test_duplicate_questions_are_merged():
+    store = QuestionStore()
+    store.add({'question': 'same'}, 'math', 'algebra', (11,))
+    store.add({'question': 'same'}, 'math', 'algebra', (12,))
+    assert store.stats()['questions'] == 1
+    assert store.placement[0][2] == (11, 12)
+
+
+def test_packed_bank_round_trip(tmp_path):
+    counts = write_packed_bank(make_store(), str(tmp_path))
+    assert counts == {'computer_science': 1, 'physics': 21}
+
+    packed = PackedQuestionStore(str(tmp_path))
+    try:
+        assert packed.random_question('physics', 'optics', 11) == {'question': 'light'}
+        assert packed.random_question('physics', 'optics', 12) is None
+    finally:
+        packed.close()
+
+    loaded = load_packed_bank(str(tmp_path))
+    assert loaded.stats() == make_store().stats()
+
+
+def test_shipped_bank_loads():
+    store = load_packed_bank(PACKED_BANK_DIR)
+    assert store.stats()['questions'] > 0
+    assert all(len(store.question_at(i)['options']) == 4 for i in range(len(store.questions)))
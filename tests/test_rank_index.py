@@ -0,0 +1,111 @@
+import asyncio
+import random
+from bisect import bisect_right
+
+import pytest
+
+from rank_index import GuildLeaderboards, RankIndex
+from utils.database import Database
+from utils.migrations import migrate
+from xp_accumulator import XPAccumulator
+
+
+def expected_rank(scores, user_id):
+    ordered = sorted(scores.values())
+    return len(ordered) - bisect_right(ordered, scores[user_id]) + 1
+
+
+def test_ranks_and_ties():
+    index = RankIndex({'a': 50, 'b': 100, 'c': 50, 'd': 0})
+    assert [index.rank(u) for u in 'abcd'] == [2, 1, 2, 4]
+    assert index.top(3) == [('b', 100), ('a', 50), ('c', 50)]
+    assert index.rank('missing') is None
+
+
+def test_updates_move_users():
+    index = RankIndex({'a': 10, 'b': 20})
+    index.add('a', 15)
+    index.set('c', 5)
+    assert index.top() == [('a', 25), ('b', 20), ('c', 5)]
+    index.set('a', -3)
+    assert index.scores['a'] == 0
+    assert index.rank('a') == 3
+
+
+def test_tree_size_is_bounded_by_buckets_not_xp():
+    index = RankIndex({'a': 5, 'b': 10 ** 12}, max_buckets=1024)
+    assert index.size <= 1024
+    assert index.rank('a') == 2
+    index.set('c', 10 ** 15)  # Outgrows the tree: the bucket width doubles
+    assert index.size <= 1024
+    assert [user for user, _ in index.top()] == ['c', 'b', 'a']
+
+
+@pytest.mark.parametrize('max_buckets', [4, 64, 1 << 16])
+def test_matches_a_full_sort_under_random_updates(max_buckets):
+    rng = random.Random(max_buckets)
+    index = RankIndex({str(i): rng.randrange(1000) for i in range(200)}, max_buckets=max_buckets)
+    for _ in range(2000):
+        user_id = str(rng.randrange(250))
+        if rng.random() < 0.7:
+            index.add(user_id, rng.randrange(50))
+        else:
+            index.set(user_id, rng.choice([0, 7, rng.randrange(10 ** 9)]))
+    for user_id in index.scores:
+        assert index.rank(user_id) == expected_rank(index.scores, user_id)
+    ranked = sorted(index.scores.items(), key=lambda item: (-item[1], item[0]))
+    assert index.top(25) == ranked[:25]
+
+
+def level_for(xp):
+    return int((xp / 100) ** 0.5) + 1
+
+
+def with_boards(path, setup, body):
+    async def run():
+        db = Database(path)
+        try:
+            await migrate(db)
+            await db.transaction(setup)
+            xp = XPAccumulator(db, level_for)
+            return await body(db, xp, GuildLeaderboards(db, xp))
+        finally:
+            db.close()
+    return asyncio.run(run())
+
+
+def test_boards_follow_gains_before_and_after_loading(tmp_path):
+    def setup(conn):
+        conn.execute("INSERT INTO guild_xp (guild_id, user_id, xp) VALUES ('g', 'a', 40), ('g', 'b', 30)")
+        conn.execute("INSERT INTO user_xp (user_id, xp) VALUES ('a', 40), ('b', 30)")
+
+    async def body(db, xp, boards):
+        await xp.add('b', 5, 'g')  # Pending when the board loads
+        board = await boards.get('g')
+        await xp.add('b', 10, 'g')  # Applied to the loaded board
+        return board.top()
+
+    assert with_boards(str(tmp_path / 'bot.db'), setup, body) == [('b', 45), ('a', 40)]
+
+
+def test_xp_from_before_guild_tracking_goes_to_the_first_guild_only(tmp_path):
+    def setup(conn):
+        conn.execute("INSERT INTO user_xp (user_id, xp) VALUES ('old', 300), ('known', 50)")
+        conn.execute("INSERT INTO guild_xp (guild_id, user_id, xp) VALUES ('g1', 'known', 50)")
+
+    async def body(db, xp, boards):
+        first = await boards.get('g1')  # Loaded before the legacy XP is credited
+        await xp.add('old', 10, 'g1')
+        await xp.add('old', 10, 'g2')
+        await xp.add('known', 10, 'g2')
+        await xp.add('new', 10, 'g2')
+        await xp.flush()
+        rows = await db.fetchall('SELECT guild_id, user_id, xp FROM guild_xp ORDER BY 1, 2')
+        total = await db.fetchone("SELECT xp FROM user_xp WHERE user_id = 'old'")
+        return first.top(), rows, total[0]
+
+    top, rows, total = with_boards(str(tmp_path / 'bot.db'), setup, body)
+    assert top == [('old', 310), ('known', 50)]
+    assert rows == [('g1', 'known', 50), ('g1', 'old', 310), ('g2', 'known', 10), ('g2', 'new', 10),
+                    ('g2', 'old', 10)]
+    assert total == 320
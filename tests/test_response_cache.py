@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from utils.database import Database
+from utils.migrations import migrate
+from utils.response_cache import ResponseCache, normalize_prompt
+
+
+def with_cache(path, body, **kwargs):
+    async def run():
+        db = Database(path)
+        try:
+            await migrate(db)
+            cache = ResponseCache(db, **kwargs)
+            try:
+                return await body(db, cache)
+            finally:
+                await cache.stop()
+        finally:
+            db.close()
+    return asyncio.run(run())
+
+
+def test_normalize_prompt_ignores_case_spacing_and_trailing_punctuation():
+    assert normalize_prompt('  What IS\n gravity ?? ') == normalize_prompt('what is gravity')
+
+
+def test_hits_come_from_memory_then_disk(tmp_path):
+    async def body(db, cache):
+        await cache.set('ask', 'model', 'What is gravity?', 'A force.')
+        from_memory = await cache.get('ask', 'model', 'what is gravity')
+        cache._memory.clear()
+        from_disk = await cache.get('ask', 'model', 'What is gravity?')
+        other_model = await cache.get('ask', 'other', 'What is gravity?')
+        return from_memory, from_disk, other_model, cache.stats()
+
+    from_memory, from_disk, other_model, stats = with_cache(str(tmp_path / 'bot.db'), body)
+    assert from_memory == from_disk == 'A force.'
+    assert other_model is None
+    assert (stats['memory_hits'], stats['disk_hits'], stats['misses']) == (1, 1, 1)
+
+
+def test_memory_is_bounded_lru(tmp_path):
+    async def body(db, cache):
+        for prompt in 'abc':
+            await cache.set('ask', 'model', prompt, prompt.upper())
+        await cache.get('ask', 'model', 'a')  # Touch 'a' so 'b' is the oldest
+        await cache.set('ask', 'model', 'd', 'D')
+        return [entry[1] for entry in cache._memory.values()]
+
+    assert with_cache(str(tmp_path / 'bot.db'), body, max_entries=3) == ['C', 'A', 'D']
+
+
+def test_expired_entries_miss_and_are_purged(tmp_path):
+    async def body(db, cache):
+        await cache.set('ask', 'model', 'old', 'stale', ttl=0.01)
+        await cache.set('ask', 'model', 'new', 'fresh')
+        await asyncio.sleep(0.02)
+        missed = await cache.get('ask', 'model', 'old')
+        purged = await cache.purge_expired()
+        return missed, purged, await db.fetchall('SELECT response FROM response_cache')
+
+    assert with_cache(str(tmp_path / 'bot.db'), body) == (None, 1, [('fresh',)])
+
+
+def test_invalidate_one_entry_a_command_or_everything(tmp_path):
+    async def body(db, cache):
+        for command, prompt in [('ask', 'a'), ('ask', 'b'), ('solve', 'c'), ('explain', 'd')]:
+            await cache.set(command, 'model', prompt, prompt)
+        one = await cache.invalidate('ask', 'model', 'a')
+        command = await cache.invalidate('ask')
+        rest = await cache.invalidate()
+        return one, command, rest, len(cache._memory)
+
+    assert with_cache(str(tmp_path / 'bot.db'), body) == (1, 1, 2, 0)
+
+
+def test_start_purges_in_the_background(tmp_path):
+    async def body(db, cache):
+        await db.execute('''
+            INSERT INTO response_cache (cache_key, command, model, prompt, response, created_at, expires_at)
+            VALUES ('k', 'ask', 'model', 'p', 'r', ?, ?)
+        ''', (time.time() - 10, time.time() - 5))
+        await cache.start()
+        await asyncio.sleep(0.05)
+        return await db.fetchall('SELECT cache_key FROM response_cache')
+
+    assert with_cache(str(tmp_path / 'bot.db'), body) == []
@@ -0,0 +1,66 @@
+import asyncio
+import random
+
+from seen_questions import BloomFilter, SeenQuestionTracker, question_fingerprint
+from utils.database import Database
+from utils.migrations import migrate
+
+
+def q(i):
+    return {'question': f'Question number {i}?'}
+
+
+def with_tracker(path, body, **kwargs):
+    async def run():
+        db = Database(path)
+        try:
+            await migrate(db)
+            return await body(db, SeenQuestionTracker(db, **kwargs))
+        finally:
+            db.close()
+    return asyncio.run(run())
+
+
+def test_fingerprint_ignores_case_and_spacing():
+    assert question_fingerprint({'question': 'What  is X?'}) == question_fingerprint({'question': 'what is x?'})
+
+
+def test_filter_sized_for_capacity_stays_near_its_error_rate():
+    bloom = BloomFilter.for_capacity(1000, 0.01)
+    assert abs(bloom.capacity(0.01) - 1000) <= 10  # Rounded to whole bytes and hashes
+    for i in range(1000):
+        bloom.add(question_fingerprint(q(i)))
+    assert all(question_fingerprint(q(i)) in bloom for i in range(1000))
+    rng = random.Random(7)
+    probes = [question_fingerprint(q(f'other {rng.random()}')) for _ in range(5000)]
+    assert sum(p in bloom for p in probes) / len(probes) < 0.02
+
+
+def test_marks_persist_across_trackers(tmp_path):
+    path = str(tmp_path / 'bot.db')
+
+    async def mark(db, tracker):
+        await tracker.mark_seen('u1', 'Physics', q(1))
+        return tracker.has_seen('u1', 'physics', q(1))
+
+    async def reload(db, tracker):
+        await tracker.load('u1', 'physics')
+        await tracker.load('u2', 'physics')
+        return tracker.has_seen('u1', 'physics', q(1)), tracker.has_seen('u2', 'physics', q(1))
+
+    assert with_tracker(path, mark) is True
+    assert with_tracker(path, reload) == (True, False)
+
+
+def test_full_filters_rotate_and_keep_the_previous_generation(tmp_path):
+    async def body(db, tracker):
+        for i in range(30):
+            await tracker.mark_seen('u1', 'maths', q(i))
+        row = await db.fetchone('SELECT count, previous IS NOT NULL FROM seen_questions')
+        return tracker, row
+
+    tracker, (count, has_previous) = with_tracker(str(tmp_path / 'bot.db'), body, capacity=20)
+    assert tracker.metrics['rotations'] == 1 and has_previous
+    assert count < 30
+    # Questions from the rotated-out generation are still recognised
+    assert tracker.has_seen('u1', 'maths', q(0)) and tracker.has_seen('u1', 'maths', q(29))
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    async def run():
+        flight = SingleFlight()
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'answer'
+
+        results = await asyncio.gather(*(flight.do('key', factory) for _ in range(5)))
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(run())
+    assert results == ['answer'] * 5
+    assert len(calls) == 1
+    assert stats['leaders'] == 1 and stats['followers'] == 4 and stats['in_flight'] == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def run():
+        flight = SingleFlight()
+        attempts = []
+
+        async def failing():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError('upstream down')
+
+        results = await asyncio.gather(*(flight.do('key', failing) for _ in range(3)), return_exceptions=True)
+        await asyncio.gather(flight.do('key', failing), return_exceptions=True)
+        return results, attempts
+
+    results, attempts = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(attempts) == 2
+
+
+def test_cancelling_one_waiter_keeps_the_call_for_the_others():
+    async def run():
+        flight = SingleFlight()
+        started = []
+
+        async def factory():
+            started.append(1)
+            await asyncio.sleep(0.05)
+            return 'done'
+
+        first = asyncio.create_task(flight.do('key', factory))
+        second = asyncio.create_task(flight.do('key', factory))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return result, started
+
+    result, started = asyncio.run(run())
+    assert result == 'done'
+    assert len(started) == 1
+
+
+def test_last_waiter_cancelling_stops_the_upstream_call():
+    async def run():
+        flight = SingleFlight()
+        finished = []
+
+        async def factory():
+            await asyncio.sleep(0.05)
+            finished.append(1)
+
+        task = asyncio.create_task(flight.do('key', factory))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.08)
+        return finished, flight.stats()
+
+    finished, stats = asyncio.run(run())
+    assert finished == []
+    assert stats['in_flight'] == 0
+
+
+def test_stream_replays_chunks_to_late_joiners():
+    async def run():
+        flight = SingleFlight()
+        pumps = []
+
+        async def chunks():
+            pumps.append(1)
+            for chunk in ('a', 'b', 'c'):
+                await asyncio.sleep(0.01)
+                yield chunk
+
+        async def collect(delay):
+            await asyncio.sleep(delay)
+            return [chunk async for chunk in flight.stream('key', chunks)]
+
+        return await asyncio.gather(collect(0), collect(0.015)), pumps
+
+    (early, late), pumps = asyncio.run(run())
+    assert early == late == ['a', 'b', 'c']
+    assert len(pumps) == 1
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+
+from stream_resolver import StreamResolver, parse_expiry, video_id
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://rr1.googlevideo.com/videoplayback?expire=1760000000&ei=x', 1760000000.0),
+    ('https://manifest.googlevideo.com/api/manifest/hls_playlist/expire/1760000001/ei/x', 1760000001.0),
+    ('https://example.com/audio.mp3', None),
+    ('https://rr1.googlevideo.com/videoplayback?expire=soon', None),
+])
+def test_parse_expiry(url, expected):
+    assert parse_expiry(url) == expected
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42', 'dQw4w9WgXcQ'),
+    ('https://youtu.be/dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+    ('https://soundcloud.com/artist/track', 'https://soundcloud.com/artist/track'),
+])
+def test_video_id(url, expected):
+    assert video_id(url) == expected
+
+
+def fake_extractor(calls, delay=0.05):
+    async def extract_info(url):
+        calls.append(url)
+        await asyncio.sleep(delay)
+        return {'url': f'https://g/videoplayback?expire={int(time.time()) + 20000}'}
+    return extract_info
+
+
+def test_resolve_coalesces_and_caches():
+    async def run():
+        calls = []
+        resolver = StreamResolver(fake_extractor(calls), lambda: [])
+        urls = await asyncio.gather(*(resolver.resolve('v', 'https://youtu.be/v') for _ in range(3)))
+        await resolver.resolve('v', 'https://youtu.be/v')
+        return urls, calls, resolver.stats()
+
+    urls, calls, stats = asyncio.run(run())
+    assert len(set(urls)) == 1
+    assert len(calls) == 1
+    assert stats['hits'] == 1
+
+
+def test_cancelled_caller_does_not_cancel_shared_extraction():
+    async def run():
+        resolver = StreamResolver(fake_extractor([]), lambda: [])
+        first = asyncio.create_task(resolver.resolve('v', 'https://youtu.be/v'))
+        second = asyncio.create_task(resolver.resolve('v', 'https://youtu.be/v'))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()).startswith('https://g/videoplayback')
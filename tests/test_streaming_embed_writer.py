@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+discord = pytest.importorskip('discord')
+pytest.importorskip('google.generativeai')
+pytest.importorskip('aiohttp')
+
+from cogs.ai_chat_enhanced import STREAM_ABORTED_NOTE, AIChatEnhanced, StreamingEmbedWriter
+
+
+class FakeMessage:
+    def __init__(self, embed):
+        self.descriptions = [embed.description]
+
+    async def edit(self, embed):
+        self.descriptions.append(embed.description)
+
+
+class FakeContext:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, embed):
+        message = FakeMessage(embed)
+        self.messages.append(message)
+        return message
+
+
+def make_embed(page):
+    return discord.Embed(title=f"page {page}")
+
+
+def test_first_chunk_is_sent_at_once_and_finish_drops_the_cursor():
+    async def run():
+        ctx = FakeContext()
+        writer = StreamingEmbedWriter(ctx, make_embed, interval=60)
+        await writer.feed('Hello')
+        await writer.feed(' world')  # Inside the edit interval, so not rendered yet
+        return ctx, await writer.finish()
+
+    ctx, text = asyncio.run(run())
+    assert text == 'Hello world'
+    assert ctx.messages[0].descriptions == ['Hello ▌', 'Hello world']
+
+
+def test_long_answers_roll_over_into_new_embeds():
+    async def run():
+        ctx = FakeContext()
+        writer = StreamingEmbedWriter(ctx, make_embed, limit=20, interval=0)
+        for word in ['alpha ', 'beta ', 'gamma ', 'delta ', 'epsilon ', 'zeta']:
+            await writer.feed(word)
+        await writer.finish()
+        return ctx
+
+    ctx = asyncio.run(run())
+    finals = [message.descriptions[-1] for message in ctx.messages]
+    assert len(finals) == 2
+    assert all(len(page) <= 20 and not page.endswith('▌') for page in finals)
+    assert ' '.join(finals).split() == ['alpha', 'beta', 'gamma', 'delta', 'epsilon', 'zeta']
+
+
+def test_abort_marks_a_partial_answer_without_the_cursor():
+    async def run():
+        ctx = FakeContext()
+        writer = StreamingEmbedWriter(ctx, make_embed, interval=60)
+        await writer.feed('Partial')
+        await writer.abort()
+        return ctx, writer.text
+
+    ctx, text = asyncio.run(run())
+    assert ctx.messages[0].descriptions[-1] == 'Partial' + STREAM_ABORTED_NOTE
+    assert text == 'Partial'
+
+
+def test_abort_before_any_output_sends_nothing():
+    async def run():
+        ctx = FakeContext()
+        await StreamingEmbedWriter(ctx, make_embed).abort()
+        return ctx
+
+    assert asyncio.run(run()).messages == []
+
+
+def test_stream_error_closes_the_embed_and_reaches_the_command():
+    class FailingGateway:
+        def resolve(self, model_key):
+            return 'gemini', 'model'
+
+        async def stream(self, model_key, contents, lane):
+            yield 'Half an answer'
+            raise RuntimeError('stream dropped')
+
+    bot = SimpleNamespace(llm=FailingGateway(), response_cache=object())
+
+    async def run():
+        ctx = FakeContext()
+        cog = AIChatEnhanced(bot)
+        with pytest.raises(RuntimeError):
+            await cog._stream_response(ctx, 'chat', 'question', make_embed)
+        return ctx
+
+    ctx = asyncio.run(run())
+    assert ctx.messages[0].descriptions[-1] == 'Half an answer' + STREAM_ABORTED_NOTE
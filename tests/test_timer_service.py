@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+from utils.database import Database
+from utils.migrations import migrate
+from utils.timer_service import TimerService
+
+
+def with_db(path, body):
+    async def run():
+        db = Database(path)
+        try:
+            await migrate(db)
+            return await body(db)
+        finally:
+            db.close()
+    return asyncio.run(run())
+
+
+async def pending_rows(db):
+    return await db.fetchall('SELECT kind, payload, attempts FROM timers ORDER BY id')
+
+
+def test_timers_fire_in_order_and_are_deleted(tmp_path):
+    async def body(db):
+        timers = TimerService(db)
+        fired = []
+
+        async def handler(payload):
+            fired.append(payload['n'])
+
+        timers.register('job', handler)
+        await timers.start()
+        await timers.schedule('job', 0.06, {'n': 2})
+        await timers.schedule('job', 0.02, {'n': 1})
+        await asyncio.sleep(0.15)
+        await timers.stop()
+        return fired, await pending_rows(db), timers.stats()
+
+    fired, rows, stats = with_db(str(tmp_path / 'bot.db'), body)
+    assert fired == [1, 2]
+    assert rows == []
+    assert stats['fired'] == 2 and stats['pending'] == 0
+
+
+def test_pending_timers_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'bot.db')
+
+    async def schedule(db):
+        timers = TimerService(db)
+        await timers.start()
+        await timers.schedule('job', 0.01, {'n': 1})
+        await timers.stop()
+
+    async def restart(db):
+        timers = TimerService(db)
+        fired = []
+
+        async def handler(payload):
+            fired.append(payload['n'])
+
+        timers.register('job', handler)
+        await timers.start()  # Already overdue, so it fires straight away
+        await asyncio.sleep(0.05)
+        await timers.stop()
+        return fired
+
+    with_db(path, schedule)
+    assert with_db(path, restart) == [1]
+
+
+def test_cancelled_timers_never_fire(tmp_path):
+    async def body(db):
+        timers = TimerService(db)
+        fired = []
+
+        async def handler(payload):
+            fired.append(payload)
+
+        timers.register('job', handler)
+        await timers.start()
+        timer_id = await timers.schedule('job', 0.03, {})
+        await timers.cancel(timer_id)
+        await asyncio.sleep(0.06)
+        await timers.stop()
+        return fired, await pending_rows(db), timers
+
+    fired, rows, timers = with_db(str(tmp_path / 'bot.db'), body)
+    assert fired == [] and rows == []
+    assert timers.queued == set() and timers.cancelled == set()
+
+
+def test_failing_handlers_are_retried_with_backoff(tmp_path):
+    async def body(db):
+        timers = TimerService(db, retry_delay=0.02)
+        runs = []
+
+        async def flaky(payload):
+            runs.append(time.monotonic())
+            if len(runs) < 3:
+                raise RuntimeError('discord unavailable')
+
+        timers.register('job', flaky)
+        await timers.start()
+        await timers.schedule('job', 0, {})
+        await asyncio.sleep(0.2)
+        await timers.stop()
+        return runs, await pending_rows(db), timers.stats()
+
+    runs, rows, stats = with_db(str(tmp_path / 'bot.db'), body)
+    assert len(runs) == 3
+    assert runs[2] - runs[1] >= runs[1] - runs[0]  # The delay doubles
+    assert rows == []
+    assert stats['retried'] == 2 and stats['fired'] == 1 and stats['failed'] == 0
+
+
+def test_timers_are_dropped_after_max_retries(tmp_path):
+    async def body(db):
+        timers = TimerService(db, max_retries=2, retry_delay=0.01)
+        runs = []
+
+        async def broken(payload):
+            runs.append(1)
+            raise RuntimeError('always fails')
+
+        timers.register('job', broken)
+        await timers.start()
+        await timers.schedule('job', 0, {})
+        await asyncio.sleep(0.15)
+        await timers.stop()
+        return runs, await pending_rows(db), timers
+
+    runs, rows, timers = with_db(str(tmp_path / 'bot.db'), body)
+    assert len(runs) == 3
+    assert rows == [] and timers.attempts == {}
+    assert timers.stats()['failed'] == 1
+
+
+def test_retry_state_is_persisted(tmp_path):
+    async def body(db):
+        timers = TimerService(db, retry_delay=60)
+
+        async def broken(payload):
+            raise RuntimeError('down')
+
+        timers.register('job', broken)
+        await timers.start()
+        await timers.schedule('job', 0, {'n': 1})
+        await asyncio.sleep(0.05)
+        await timers.stop()
+        return await pending_rows(db)
+
+    assert with_db(str(tmp_path / 'bot.db'), body) == [('job', '{"n": 1}', 1)]
+
+
+def test_cancelling_during_a_failed_run_stops_the_retry(tmp_path):
+    async def body(db):
+        timers = TimerService(db, retry_delay=0.01)
+        runs = []
+        timer_ids = []
+
+        async def failing(payload):
+            runs.append(1)
+            await timers.cancel(timer_ids[0])
+            raise RuntimeError('down')
+
+        timers.register('job', failing)
+        await timers.start()
+        timer_ids.append(await timers.schedule('job', 0.01, {}))
+        await asyncio.sleep(0.1)
+        await timers.stop()
+        return runs, await pending_rows(db), timers
+
+    runs, rows, timers = with_db(str(tmp_path / 'bot.db'), body)
+    assert len(runs) == 1
+    assert rows == [] and timers.attempts == {} and timers.queued == set()
@@ -0,0 +1,100 @@
+import asyncio
+
+from utils.database import Database
+from utils.migrations import migrate
+from xp_accumulator import XPAccumulator
+
+
+def level_for(xp):
+    return int((xp / 100) ** 0.5) + 1
+
+
+def with_xp(path, body, **kwargs):
+    async def run():
+        db = Database(path)
+        try:
+            await migrate(db)
+            return await body(db, XPAccumulator(db, level_for, **kwargs))
+        finally:
+            db.close()
+    return asyncio.run(run())
+
+
+def test_levels_are_computed_in_memory_from_the_stored_total(tmp_path):
+    async def body(db, xp):
+        await db.execute("INSERT INTO user_xp (user_id, xp, level) VALUES ('u1', 95, 1)")
+        first = await xp.add('u1', 10)
+        second = await xp.add('u1', 10)
+        stored = await db.fetchone("SELECT xp FROM user_xp WHERE user_id = 'u1'")
+        return first, second, stored[0]
+
+    first, second, stored = with_xp(str(tmp_path / 'bot.db'), body)
+    assert first == (1, 2) and second == (2, 2)
+    assert stored == 95  # Nothing written until the next flush
+
+
+def test_flush_adds_deltas_guild_rows_and_ledger_events(tmp_path):
+    async def body(db, xp):
+        await xp.add('u1', 10, 'g1')
+        await xp.add('u1', 5, 'g1')
+        await xp.add('u2', 7)
+        await xp.flush()
+        await xp.add('u1', 1, 'g1')
+        await xp.flush()
+        users = await db.fetchall('SELECT user_id, xp FROM user_xp ORDER BY user_id')
+        guilds = await db.fetchall('SELECT guild_id, user_id, xp FROM guild_xp')
+        events = await db.fetchall('SELECT guild_id, user_id, amount FROM xp_events ORDER BY id')
+        return users, guilds, events, xp.stats()
+
+    users, guilds, events, stats = with_xp(str(tmp_path / 'bot.db'), body)
+    assert users == [('u1', 16), ('u2', 7)]
+    assert guilds == [('g1', 'u1', 16)]
+    assert events == [('g1', 'u1', 10), ('g1', 'u1', 5), ('', 'u2', 7), ('g1', 'u1', 1)]
+    assert stats['batches'] == 2 and stats['flushed'] == 3 and stats['pending'] == 0
+
+
+def test_a_full_batch_wakes_the_flush_loop_and_stop_flushes_the_rest(tmp_path):
+    async def body(db, xp):
+        await xp.start()
+        for user in ('a', 'b'):
+            await xp.add(user, 1)
+        await asyncio.sleep(0.05)
+        woken = await db.fetchone('SELECT COUNT(*) FROM user_xp')
+        await xp.add('c', 1)
+        await xp.stop()
+        stopped = await db.fetchone('SELECT COUNT(*) FROM user_xp')
+        return woken[0], stopped[0]
+
+    assert with_xp(str(tmp_path / 'bot.db'), body, flush_interval=60, max_pending=2) == (2, 3)
+
+
+def test_failed_flush_keeps_the_deltas_for_the_next_one(tmp_path):
+    async def body(db, xp):
+        await xp.add('u1', 10, 'g1')
+        await db.execute('ALTER TABLE xp_events RENAME TO xp_events_moved')
+        await xp.flush()
+        failed = xp.stats()
+        await xp.add('u1', 5, 'g1')
+        await db.execute('ALTER TABLE xp_events_moved RENAME TO xp_events')
+        await xp.flush()
+        users = await db.fetchall('SELECT user_id, xp FROM user_xp')
+        guilds = await db.fetchall('SELECT xp FROM guild_xp')
+        events = await db.fetchone('SELECT COUNT(*) FROM xp_events')
+        return failed, users, guilds, events[0]
+
+    failed, users, guilds, events = with_xp(str(tmp_path / 'bot.db'), body)
+    assert failed['flush_failures'] == 1 and failed['pending'] == 1
+    assert users == [('u1', 15)] and guilds == [(15,)] and events == 2
+
+
+def test_eviction_keeps_users_with_pending_xp(tmp_path):
+    async def body(db, xp):
+        for user in ('a', 'b', 'c'):
+            await xp.add(user, 1)
+        await xp.flush()
+        await xp.add('d', 1)
+        xp._evict()
+        return set(xp.totals)
+
+    cached = with_xp(str(tmp_path / 'bot.db'), body, max_cached=2)
+    assert 'd' in cached and len(cached) == 2
@@ -0,0 +1,49 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from utils.database import Database
+from xp_ledger import XPLedger, current_bucket
+
+NOW = datetime(2026, 3, 12, 15, 0, tzinfo=timezone.utc).timestamp()  # A Thursday
+
+
+@pytest.mark.parametrize('period, bucket', [('day', '2026-03-12'), ('week', '2026-03-09'), ('month', '2026-03')])
+def test_current_bucket(period, bucket):
+    assert current_bucket(period, NOW) == bucket
+
+
+def test_unknown_period():
+    with pytest.raises(ValueError):
+        current_bucket('year', NOW)
+
+
+def test_rollup_top_rank_and_compaction(tmp_path):
+    async def run():
+        db = Database(str(tmp_path / 'xp.db'))
+        ledger = XPLedger(db)
+        try:
+            await ledger.setup_database()
+            now = time.time()
+            events = [('g', 'a', 10, now), ('g', 'b', 30, now), ('g', 'a', 5, now), ('other', 'a', 100, now),
+                      ('g', 'a', 1000, now - 40 * 86400)]
+            await db.executemany(
+                'INSERT INTO xp_events (guild_id, user_id, amount, created_at) VALUES (?, ?, ?, ?)', events
+            )
+            rolled = await ledger.rollup()
+            again = await ledger.rollup()
+            top = await ledger.top('g', 'day')
+            rank = await ledger.rank('g', 'day', 'a')
+            await ledger.compact(now)
+            remaining = await db.fetchone('SELECT COUNT(*) FROM xp_events')
+            return rolled, again, top, rank, remaining[0]
+        finally:
+            db.close()
+
+    rolled, again, top, rank, remaining = asyncio.run(run())
+    assert (rolled, again) == (5, 0)
+    assert top == [('b', 30), ('a', 15)]
+    assert rank == (2, 15)
+    assert remaining == 4  # Only the rolled-up event past retention is dropped
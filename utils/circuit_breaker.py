@@ -0,0 +1,92 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Dict
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Trip on a high error rate or a p95 latency above the SLO; probe for recovery after a cooldown"""
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 5, error_threshold: float = 0.5,
+                 latency_slo: float = 8.0, cooldown: float = 30.0, max_probes: int = 1):
+        self.logger = logging.getLogger('discord_bot')
+        self.name = name
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.latency_slo = latency_slo
+        self.cooldown = cooldown
+        self.max_probes = max_probes
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probes = 0
+        self.samples = deque(maxlen=window)  # (succeeded, latency)
+        self.metrics = {'trips': 0, 'short_circuited': 0, 'probes': 0}
+
+    def _error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for ok, _ in self.samples if not ok) / len(self.samples)
+
+    def _p95(self) -> float:
+        ordered = sorted(latency for _, latency in self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _trip(self, reason: str):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probes = 0
+        self.metrics['trips'] += 1
+        self.logger.warning(f"Circuit '{self.name}' opened: {reason}")
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; every allowed call must be followed by record()"""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self.probes = 0
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and self.probes < self.max_probes:
+            self.probes += 1
+            self.metrics['probes'] += 1
+            return True
+        self.metrics['short_circuited'] += 1
+        return False
+
+    @property
+    def closed(self) -> bool:
+        return self.state == CLOSED
+
+    def record(self, succeeded: bool, latency: float):
+        """Feed the outcome of an allowed call back into the breaker"""
+        if self.state == HALF_OPEN:
+            self.probes = max(0, self.probes - 1)
+            if succeeded and latency <= self.latency_slo:
+                self.state = CLOSED
+                self.samples.clear()
+                self.logger.info(f"Circuit '{self.name}' closed after successful probe")
+            else:
+                self._trip("probe failed" if not succeeded else f"probe took {latency:.1f}s")
+            return
+
+        self.samples.append((succeeded, latency))
+        if self.state != CLOSED or len(self.samples) < self.min_calls:
+            return
+        error_rate = self._error_rate()
+        if error_rate >= self.error_threshold:
+            self._trip(f"error rate {error_rate:.0%}")
+        elif self._p95() > self.latency_slo:
+            self._trip(f"p95 latency {self._p95():.1f}s over {self.latency_slo:.1f}s SLO")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            'state': self.state,
+            'error_rate': self._error_rate(),
+            'p95_latency': self._p95()
+        }
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+STATEMENT_CACHE_SIZE = 256  # Prepared statements kept per connection by sqlite3
+
+
+def split_script(script: str) -> List[str]:
+    """Split a script of simple statements (no ';' inside literals or triggers) into statements"""
+    return [statement.strip() for statement in script.split(';') if statement.strip()]
+
+
+class WriteResult:
+    """Outcome of a write statement"""
+
+    def __init__(self, rowcount: int, lastrowid: Optional[int]):
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
+
+
+class Database:
+    """Async access to one SQLite file: a single writer thread fed by a queue plus a reader pool
+
+    Every write runs in its own transaction on the writer thread, so writers never contend for
+    the lock; readers use separate WAL connections and never block the writer or each other.
+    """
+
+    def __init__(self, path: str = 'data/user_data.db', readers: int = 4, slow_query_ms: float = 100.0):
+        self.logger = logging.getLogger('discord_bot')
+        self.path = path
+        self.slow_query_ms = slow_query_ms
+        self.timings: Dict[str, List[float]] = {}  # sql -> [count, total_ms, max_ms]
+        self._timings_lock = threading.Lock()
+        self._local = threading.local()
+        self._reader_connections: List[sqlite3.Connection] = []
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='db-reader')
+        self._writes: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._closed = False
+        self.schema_version = 0  # Set by utils.migrations once the schema is current
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._writer_connection = self._connect()
+        self._writer = threading.Thread(target=self._write_loop, name='db-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+
+    # --- timing ---
+
+    def _timed(self, sql: str, run: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return run()
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            key = ' '.join(sql.split())[:120]
+            with self._timings_lock:
+                entry = self.timings.setdefault(key, [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+            if elapsed > self.slow_query_ms:
+                self.logger.warning(f"Slow query ({elapsed:.1f}ms): {key}")
+
+    # --- reader side ---
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute('PRAGMA query_only=ON')
+            self._local.conn = conn
+            self._reader_connections.append(conn)
+        return conn
+
+    def _read(self, sql: str, params: Sequence[Any], one: bool):
+        def run():
+            cursor = self._reader().execute(sql, params)
+            return cursor.fetchone() if one else cursor.fetchall()
+        return self._timed(sql, run)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._read, sql, tuple(params), True)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._read, sql, tuple(params), False)
+
+    # --- writer side ---
+
+    def _write_loop(self):
+        conn = self._writer_connection
+        while True:
+            job = self._writes.get()
+            if job is None:
+                break
+            func, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with conn:
+                    result = func(conn)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        try:
+            # Refresh planner statistics for tables whose size changed a lot this run
+            conn.execute('PRAGMA optimize')
+        except sqlite3.Error as e:
+            self.logger.warning(f"PRAGMA optimize failed: {str(e)}")
+        conn.close()
+
+    def submit(self, func: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Queue func(conn) to run in one transaction on the writer thread"""
+        if self._closed:
+            raise RuntimeError("Database is closed")
+        future: Future = Future()
+        self._writes.put((func, future))
+        return future
+
+    async def transaction(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run func(conn) atomically on the writer thread and return its result"""
+        return await asyncio.wrap_future(self.submit(func))
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> WriteResult:
+        def run(conn: sqlite3.Connection) -> WriteResult:
+            cursor = self._timed(sql, lambda: conn.execute(sql, tuple(params)))
+            return WriteResult(cursor.rowcount, cursor.lastrowid)
+        return await self.transaction(run)
+
+    async def executemany(self, sql: str, seq: Iterable[Sequence[Any]]) -> WriteResult:
+        rows = [tuple(row) for row in seq]
+
+        def run(conn: sqlite3.Connection) -> WriteResult:
+            cursor = self._timed(sql, lambda: conn.executemany(sql, rows))
+            return WriteResult(cursor.rowcount, cursor.lastrowid)
+        return await self.transaction(run)
+
+    async def executescript(self, script: str):
+        """Run several DDL statements (e.g. CREATE TABLE IF NOT EXISTS) in one transaction"""
+        statements = split_script(script)
+
+        def run(conn: sqlite3.Connection):
+            for statement in statements:
+                self._timed(statement, lambda: conn.execute(statement))
+        await self.transaction(run)
+
+    # --- lifecycle and stats ---
+
+    def stats(self) -> Dict[str, Any]:
+        with self._timings_lock:
+            slowest = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)[:5]
+            queries = sum(entry[0] for entry in self.timings.values())
+        return {
+            'write_queue': self._writes.qsize(),
+            'queries': queries,
+            'slowest': [
+                {'sql': sql, 'count': count, 'avg_ms': total / count, 'max_ms': worst}
+                for sql, (count, total, worst) in slowest
+            ]
+        }
+
+    def close(self):
+        """Finish queued writes, then close every connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self._writes.put(None)
+        self._writer.join()
+        self._readers.shutdown(wait=True)
+        for conn in self._reader_connections:
+            conn.close()
+
+
+_default_database: Optional[Database] = None
+
+
+def get_database(bot=None) -> Database:
+    """Return the bot's shared database, or a process-wide default one"""
+    global _default_database
+    if bot is not None and getattr(bot, 'db', None) is not None:
+        return bot.db
+    if _default_database is None:
+        _default_database = Database()
+    return _default_database
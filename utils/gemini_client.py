@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import google.generativeai as genai
+
+DEFAULT_MODEL = 'gemini-2.0-flash'
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up while AI requests are in flight"""
+
+    def __init__(self, interval: float = 0.1, max_samples: int = 1000):
+        self.interval = interval
+        self.max_samples = max_samples
+        self.samples: List[float] = []
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._active = lambda: True
+
+    def start(self, active_check=None):
+        """Start sampling; only samples taken while active_check() is true are kept"""
+        if active_check:
+            self._active = active_check
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            if not self._active():
+                continue
+            self.samples.append(lag)
+            if len(self.samples) > self.max_samples:
+                del self.samples[:len(self.samples) - self.max_samples]
+            self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> Dict[str, float]:
+        if not self.samples:
+            return {'samples': 0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        ordered = sorted(self.samples)
+        return {
+            'samples': len(ordered),
+            'p50_ms': ordered[len(ordered) // 2] * 1000,
+            'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            'max_ms': self.max_lag * 1000
+        }
+
+
+class GeminiClient:
+    """Run Gemini requests on a bounded worker pool so the event loop never blocks"""
+
+    def __init__(self, max_workers: int = 8, default_timeout: float = 30.0,
+                 default_model: str = DEFAULT_MODEL, api_key: Optional[str] = None):
+        self.logger = logging.getLogger('discord_bot')
+        genai.configure(api_key=api_key or os.getenv('GOOGLE_API_KEY'))
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.default_model = default_model
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gemini')
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._models: Dict[str, Any] = {}
+        self.lag_monitor = LoopLagMonitor()
+        self.in_flight = 0
+        self.waiting = 0
+        self.metrics = {
+            'requests': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'cancelled': 0,
+            'total_latency': 0.0
+        }
+
+    def get_model(self, name: Optional[str] = None):
+        """Return a cached GenerativeModel instance"""
+        name = name or self.default_model
+        if name not in self._models:
+            self._models[name] = genai.GenerativeModel(name)
+        return self._models[name]
+
+    def start_monitor(self):
+        """Start measuring loop responsiveness while requests are in flight"""
+        self.lag_monitor.start(lambda: self.in_flight > 0)
+
+    def _call(self, model, contents, kwargs) -> str:
+        response = model.generate_content(contents, **kwargs)
+        return response.text
+
+    async def generate(self, contents, *, model: Optional[str] = None,
+                       timeout: Optional[float] = None, **kwargs) -> str:
+        """Generate content off the event loop and return the response text"""
+        loop = asyncio.get_running_loop()
+        gemini_model = self.get_model(model)
+        timeout = timeout or self.default_timeout
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self._semaphore.release)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
+
+        # Keep the slot until the worker thread really finishes, even after a timeout
+        future = self.executor.submit(self._call, gemini_model, contents, kwargs)
+        future.add_done_callback(release)
+
+        self.in_flight += 1
+        self.metrics['requests'] += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            self.metrics['timeouts'] += 1
+            self.logger.warning(f"Gemini request timed out after {timeout}s")
+            raise
+        except asyncio.CancelledError:
+            self.metrics['cancelled'] += 1
+            raise
+        except Exception:
+            self.metrics['failures'] += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.metrics['total_latency'] += time.perf_counter() - start
+
+    def _stream_worker(self, model, contents, kwargs, loop, queue: asyncio.Queue, stop: threading.Event):
+        def push(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
+
+        try:
+            for chunk in model.generate_content(contents, stream=True, **kwargs):
+                if stop.is_set():
+                    break
+                text = getattr(chunk, 'text', '')
+                if text:
+                    push(text)
+            push(None)
+        except Exception as e:
+            push(e)
+
+    async def stream(self, contents, *, model: Optional[str] = None,
+                     timeout: Optional[float] = None, **kwargs) -> AsyncIterator[str]:
+        """Yield response text chunks as Gemini produces them"""
+        loop = asyncio.get_running_loop()
+        gemini_model = self.get_model(model)
+        timeout = timeout or self.default_timeout
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(self._semaphore.release)
+            except RuntimeError:
+                pass
+
+        future = self.executor.submit(self._stream_worker, gemini_model, contents, kwargs, loop, queue, stop)
+        future.add_done_callback(release)
+
+        self.in_flight += 1
+        self.metrics['requests'] += 1
+        start = time.perf_counter()
+        try:
+            while True:
+                # The timeout applies to the gap between chunks, not the whole answer
+                item = await asyncio.wait_for(queue.get(), timeout)
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        except asyncio.TimeoutError:
+            self.metrics['timeouts'] += 1
+            self.logger.warning(f"Gemini stream stalled for more than {timeout}s")
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            self.metrics['cancelled'] += 1
+            raise
+        except Exception:
+            self.metrics['failures'] += 1
+            raise
+        finally:
+            stop.set()
+            future.cancel()
+            self.in_flight -= 1
+            self.metrics['total_latency'] += time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request counters and event loop lag measured under load"""
+        completed = self.metrics['requests'] - self.in_flight
+        return {
+            **self.metrics,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'avg_latency': self.metrics['total_latency'] / completed if completed else 0.0,
+            'loop_lag': self.lag_monitor.stats()
+        }
+
+    async def close(self):
+        await self.lag_monitor.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_default_client: Optional[GeminiClient] = None
+
+
+def get_client(bot=None) -> GeminiClient:
+    """Return the bot's shared client, or a process-wide default one"""
+    global _default_client
+    if bot is not None and getattr(bot, 'gemini', None) is not None:
+        return bot.gemini
+    if _default_client is None:
+        _default_client = GeminiClient()
+    return _default_client
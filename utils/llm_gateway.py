@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from utils.gemini_client import GeminiClient
+from utils.singleflight import SingleFlight
+
+# Registry of logical model names used by cogs -> (provider, provider model id)
+MODEL_REGISTRY: Dict[str, Tuple[str, str]] = {
+    'chat': ('gemini', 'gemini-2.0-flash'),
+    'vision': ('gemini', 'gemini-2.0-flash'),
+    'legacy_chat': ('gemini', 'gemini-pro'),
+    'legacy_vision': ('gemini', 'gemini-pro-vision'),
+    'questions': ('gemini', 'gemini-2.0-flash'),  # Structured JSON output needs a 1.5+ model
+    'study': ('gemini', 'gemini-2.0-flash'),
+    'code': ('openai', 'gpt-4'),
+    'conversation': ('openrouter', 'google/gemini-2.0-flash-thinking-exp:free'),
+}
+
+# Per-provider concurrency and per-lane token buckets (requests per minute, burst size).
+# Each lane has its own bucket so a burst in one command family cannot starve another.
+PROVIDER_LIMITS: Dict[str, Dict[str, Any]] = {
+    'gemini': {
+        'concurrency': 8,
+        'lanes': {
+            'chat': (30, 10),
+            'questions': (30, 10),
+            'prefetch': (10, 3),  # Background question pool refills
+            'study': (15, 5),
+            'default': (10, 5)
+        }
+    },
+    'openai': {
+        'concurrency': 4,
+        'lanes': {'chat': (20, 5), 'default': (10, 5)}
+    },
+    'openrouter': {
+        'concurrency': 4,
+        'lanes': {'conversation': (20, 5), 'default': (10, 5)}
+    },
+}
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+
+class TokenBucket:
+    """Simple token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ProviderState:
+    """Concurrency limit, lane buckets and latency samples for one provider"""
+
+    def __init__(self, name: str, concurrency: int, lanes: Dict[str, Tuple[float, int]]):
+        self.name = name
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.buckets = {lane: TokenBucket(rate, burst) for lane, (rate, burst) in lanes.items()}
+        self.queued = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=500)
+
+    def bucket(self, lane: str) -> TokenBucket:
+        return self.buckets.get(lane) or self.buckets['default']
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        p50 = ordered[len(ordered) // 2] if ordered else 0.0
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        return {
+            'queue_depth': self.queued,
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'errors': self.errors,
+            'p50_latency': p50,
+            'p95_latency': p95
+        }
+
+
+class LLMGateway:
+    """Single entry point for every LLM call made by the bot"""
+
+    def __init__(self, registry: Optional[Dict[str, Tuple[str, str]]] = None,
+                 limits: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.logger = logging.getLogger('discord_bot')
+        self.registry = dict(registry or MODEL_REGISTRY)
+        limits = limits or PROVIDER_LIMITS
+        self.providers = {
+            name: ProviderState(name, cfg['concurrency'], cfg['lanes'])
+            for name, cfg in limits.items()
+        }
+        self.gemini = GeminiClient(max_workers=limits['gemini']['concurrency'])
+        self._openai = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.flights = SingleFlight()
+
+    def warm(self):
+        """Instantiate every registered Gemini model once so requests reuse them"""
+        for provider, model in self.registry.values():
+            if provider == 'gemini':
+                self.gemini.get_model(model)
+
+    async def start(self):
+        self.warm()
+        self.gemini.start_monitor()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+
+    async def close(self):
+        await self.gemini.close()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        if self._openai is not None:
+            await self._openai.close()
+
+    def resolve(self, model_key: str) -> Tuple[str, str]:
+        if model_key not in self.registry:
+            raise KeyError(f"Unknown model key: {model_key}")
+        return self.registry[model_key]
+
+    async def _acquire(self, state: ProviderState, lane: str, deadline: float):
+        """Wait for a lane token, then a provider slot, giving up once the deadline passes"""
+        state.queued += 1
+        try:
+            await asyncio.wait_for(state.bucket(lane).acquire(), self._remaining(deadline))
+            await asyncio.wait_for(state.semaphore.acquire(), self._remaining(deadline))
+        finally:
+            state.queued -= 1
+
+    @staticmethod
+    def _deadline(timeout: Optional[float]) -> float:
+        return asyncio.get_running_loop().time() + (timeout or 30.0)
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        """Seconds left before deadline; raises TimeoutError once it has passed"""
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError()
+        return remaining
+
+    @staticmethod
+    def _flight_key(model_key: str, contents: str, kwargs: Dict[str, Any]):
+        return (model_key, contents, tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+
+    async def generate(self, model_key: str, contents, *, lane: str = 'default',
+                       timeout: Optional[float] = None, coalesce: bool = True, **kwargs) -> str:
+        """Run a request for a registered model; identical overlapping text prompts share one call"""
+        if coalesce and isinstance(contents, str):
+            key = self._flight_key(model_key, contents, kwargs)
+            return await self.flights.do(
+                key, lambda: self._generate(model_key, contents, lane, timeout, **kwargs)
+            )
+        return await self._generate(model_key, contents, lane, timeout, **kwargs)
+
+    async def _generate(self, model_key: str, contents, lane: str,
+                        timeout: Optional[float], **kwargs) -> str:
+        provider, model = self.resolve(model_key)
+        state = self.providers[provider]
+        # One budget covers queueing for a token and a slot as well as the call itself
+        deadline = self._deadline(timeout)
+
+        await self._acquire(state, lane, deadline)
+
+        state.in_flight += 1
+        state.requests += 1
+        start = time.perf_counter()
+        try:
+            timeout = self._remaining(deadline)
+            if provider == 'gemini':
+                return await self.gemini.generate(contents, model=model, timeout=timeout, **kwargs)
+            if provider == 'openai':
+                return await self._openai_chat(model, contents, timeout, **kwargs)
+            if provider == 'openrouter':
+                return await self._openrouter_chat(model, contents, timeout, **kwargs)
+            raise ValueError(f"Unsupported provider: {provider}")
+        except Exception:
+            state.errors += 1
+            raise
+        finally:
+            state.in_flight -= 1
+            state.semaphore.release()
+            state.latencies.append(time.perf_counter() - start)
+
+    async def stream(self, model_key: str, contents, *, lane: str = 'default',
+                     timeout: Optional[float] = None, coalesce: bool = True, **kwargs) -> AsyncIterator[str]:
+        """Yield text chunks as they arrive; identical overlapping text prompts share one stream"""
+        if coalesce and isinstance(contents, str):
+            key = ('stream',) + self._flight_key(model_key, contents, kwargs)
+            chunks = self.flights.stream(
+                key, lambda: self._stream(model_key, contents, lane, timeout, **kwargs)
+            )
+        else:
+            chunks = self._stream(model_key, contents, lane, timeout, **kwargs)
+        async for chunk in chunks:
+            yield chunk
+
+    async def _stream(self, model_key: str, contents, lane: str,
+                      timeout: Optional[float], **kwargs) -> AsyncIterator[str]:
+        provider, model = self.resolve(model_key)
+        if provider != 'gemini':
+            yield await self._generate(model_key, contents, lane, timeout, **kwargs)
+            return
+
+        state = self.providers[provider]
+        deadline = self._deadline(timeout)
+        await self._acquire(state, lane, deadline)
+
+        state.in_flight += 1
+        state.requests += 1
+        start = time.perf_counter()
+        try:
+            # Whatever queueing left of the budget bounds the wait for each chunk
+            timeout = self._remaining(deadline)
+            async for chunk in self.gemini.stream(contents, model=model, timeout=timeout, **kwargs):
+                yield chunk
+        except Exception:
+            state.errors += 1
+            raise
+        finally:
+            state.in_flight -= 1
+            state.semaphore.release()
+            state.latencies.append(time.perf_counter() - start)
+
+    @staticmethod
+    def _as_messages(contents) -> List[Dict[str, str]]:
+        if isinstance(contents, str):
+            return [{"role": "user", "content": contents}]
+        return list(contents)
+
+    async def _openai_chat(self, model: str, contents, timeout: float, **kwargs) -> str:
+        if self._openai is None:
+            from openai import AsyncOpenAI
+            self._openai = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        response = await self._openai.chat.completions.create(
+            model=model,
+            messages=self._as_messages(contents),
+            timeout=timeout,
+            **kwargs
+        )
+        if not response.choices:
+            return ""
+        return response.choices[0].message.content or ""
+
+    async def _openrouter_chat(self, model: str, contents, timeout: float, **kwargs) -> str:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
+            "HTTP-Referer": "https://github.com/replicate/extensions",
+            "X-Title": "EduSphere Bot"
+        }
+        payload = {"model": model, "messages": self._as_messages(contents), **kwargs}
+        async with self._session.post(OPENROUTER_URL, headers=headers, json=payload, timeout=timeout) as response:
+            data = await response.json(content_type=None)
+            if response.status != 200:
+                raise RuntimeError(f"OpenRouter error {response.status}: {data}")
+            choices = data.get("choices") or []
+            if not choices:
+                return ""
+            return (choices[0].get("message", {}).get("content") or "").strip()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and latency per provider, plus event loop lag under load"""
+        result = {name: state.stats() for name, state in self.providers.items()}
+        result['loop_lag'] = self.gemini.lag_monitor.stats()
+        result['coalescing'] = self.flights.stats()
+        return result
+
+
+_default_gateway: Optional[LLMGateway] = None
+
+
+def get_gateway(bot=None) -> LLMGateway:
+    """Return the bot's shared gateway, or a process-wide default one"""
+    global _default_gateway
+    if bot is not None and getattr(bot, 'llm', None) is not None:
+        return bot.llm
+    if _default_gateway is None:
+        _default_gateway = LLMGateway()
+    return _default_gateway
@@ -0,0 +1,359 @@
+import asyncio
+import logging
+import sqlite3
+from typing import List, Tuple
+
+from utils.database import Database, split_script
+
+logger = logging.getLogger('discord_bot')
+
+# (version, description, script); applied in order, each in its own transaction, tracked by PRAGMA user_version.
+# Never edit a released migration: append a new one instead.
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (1, "Baseline tables for achievements, XP, flashcards and the learning assistant", '''
+        CREATE TABLE IF NOT EXISTS user_xp (
+            user_id TEXT PRIMARY KEY,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            last_xp_gain TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_user_xp_xp ON user_xp(xp DESC);
+
+        CREATE TABLE IF NOT EXISTS guild_xp (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            xp INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_guild_xp_rank ON guild_xp(guild_id, xp DESC);
+
+        CREATE TABLE IF NOT EXISTS achievement_progress (
+            user_id TEXT,
+            achievement_id TEXT,
+            current_count INTEGER DEFAULT 0,
+            completed BOOLEAN DEFAULT 0,
+            completion_date TIMESTAMP,
+            PRIMARY KEY (user_id, achievement_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS user_achievements (
+            user_id TEXT NOT NULL,
+            achievement_id TEXT NOT NULL,
+            awarded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, achievement_id)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS xp_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            amount INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS xp_rollups (
+            period TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            xp INTEGER NOT NULL,
+            PRIMARY KEY (period, bucket, guild_id, user_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_xp_rollups_rank ON xp_rollups(period, bucket, guild_id, xp DESC);
+
+        CREATE TABLE IF NOT EXISTS xp_rollup_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_event_id INTEGER NOT NULL
+        );
+
+        INSERT OR IGNORE INTO xp_rollup_state (id, last_event_id) VALUES (1, 0);
+
+        CREATE TABLE IF NOT EXISTS flashcards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            subject TEXT,
+            front TEXT NOT NULL,
+            back TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_reviewed TIMESTAMP,
+            review_count INTEGER DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS study_progress (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            correct_answers INTEGER DEFAULT 0,
+            total_attempts INTEGER DEFAULT 0,
+            last_study_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_study_progress_user_topic
+        ON study_progress(user_id, subject, topic);
+
+        CREATE TABLE IF NOT EXISTS question_attempts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            class_level INTEGER NOT NULL,
+            answer TEXT NOT NULL,
+            correct INTEGER NOT NULL,
+            answered_at REAL NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS study_schedule (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            daily_topics TEXT NOT NULL,
+            completed_topics TEXT DEFAULT '[]',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS study_tip_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            category_name TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(user_id, category_name)
+        );
+
+        CREATE TABLE IF NOT EXISTS study_tips (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category_id INTEGER NOT NULL,
+            user_id TEXT NOT NULL,
+            tip_content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(category_id) REFERENCES study_tip_categories(id)
+        )
+    '''),
+    (2, "Covering indexes for the cogs' per-user lookups", '''
+        CREATE INDEX IF NOT EXISTS idx_flashcards_user_subject_reviewed
+        ON flashcards(user_id, subject, last_reviewed, review_count);
+
+        CREATE INDEX IF NOT EXISTS idx_flashcards_user_reviewed ON flashcards(user_id, last_reviewed);
+
+        CREATE INDEX IF NOT EXISTS idx_study_schedule_user_end ON study_schedule(user_id, end_date);
+
+        CREATE INDEX IF NOT EXISTS idx_study_progress_user_attempts
+        ON study_progress(user_id, total_attempts, subject, topic, correct_answers);
+
+        CREATE INDEX IF NOT EXISTS idx_study_tips_category_created ON study_tips(category_id, created_at);
+
+        CREATE INDEX IF NOT EXISTS idx_study_tips_user_category ON study_tips(user_id, category_id);
+
+        ANALYZE
+    '''),
+    (3, "Music search result cache", '''
+        CREATE TABLE IF NOT EXISTS music_search_cache (
+            query TEXT PRIMARY KEY,
+            results TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    '''),
+    (4, "Server-side answer keys for question buttons", '''
+        CREATE TABLE IF NOT EXISTS question_answer_keys (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            class_level INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT,
+            correct_answer TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            answered_choice TEXT,
+            answered_at REAL
+        )
+    '''),
+    # Lets the XP accumulator tell whether a user has any guild_xp row yet; XP earned before
+    # per-guild tracking is credited to the first guild they earn XP in after that
+    (5, "Index guild_xp by user", '''
+        CREATE INDEX IF NOT EXISTS idx_guild_xp_user ON guild_xp(user_id)
+    '''),
+    # Bloom filters sized per filter (hashes) with the previous generation kept after a rotation
+    (6, "Seen-question filters per user and subject", '''
+        CREATE TABLE IF NOT EXISTS seen_questions (
+            user_id TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            bits BLOB NOT NULL,
+            count INTEGER NOT NULL,
+            updated REAL NOT NULL,
+            hashes INTEGER NOT NULL DEFAULT 5,
+            previous BLOB,
+            previous_hashes INTEGER,
+            PRIMARY KEY (user_id, subject)
+        )
+    '''),
+    (7, "Persistent timers with their failed attempt count", '''
+        CREATE TABLE IF NOT EXISTS timers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            due REAL NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_timers_due ON timers(due)
+    '''),
+    (8, "AI response cache", '''
+        CREATE TABLE IF NOT EXISTS response_cache (
+            cache_key TEXT PRIMARY KEY,
+            command TEXT NOT NULL,
+            model TEXT NOT NULL,
+            prompt TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_response_cache_command ON response_cache(command);
+
+        CREATE INDEX IF NOT EXISTS idx_response_cache_expires ON response_cache(expires_at)
+    '''),
+    (9, "Pre-generated question pools and their demand", '''
+        CREATE TABLE IF NOT EXISTS question_pool (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            class_level INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_question_pool_key ON question_pool(class_level, subject, topic, id);
+
+        CREATE TABLE IF NOT EXISTS question_pool_demand (
+            class_level INTEGER NOT NULL,
+            subject TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            count REAL NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (class_level, subject, topic)
+        )
+    '''),
+]
+
+# (name, query, index the plan must use). Checked against an empty copy of the schema so the result
+# depends only on the indexes, not on how much data a particular install has.
+QUERY_PLAN_CHECKS: List[Tuple[str, str, str]] = [
+    ("flashcard review by subject", '''
+        SELECT id, front, back FROM flashcards WHERE user_id = ? AND subject = ?
+        ORDER BY last_reviewed ASC NULLS FIRST LIMIT 5
+    ''', 'idx_flashcards_user_subject_reviewed'),
+    ("flashcard review", '''
+        SELECT id, front, back FROM flashcards WHERE user_id = ?
+        ORDER BY last_reviewed ASC NULLS FIRST LIMIT 5
+    ''', 'idx_flashcards_user_reviewed'),
+    ("flashcard stats", '''
+        SELECT COUNT(*), COUNT(DISTINCT subject), SUM(review_count), MAX(review_count)
+        FROM flashcards WHERE user_id = ?
+    ''', 'COVERING INDEX idx_flashcards_user_subject_reviewed'),
+    ("active study schedules", '''
+        SELECT subject, start_date, end_date, daily_topics, completed_topics FROM study_schedule
+        WHERE user_id = ? AND end_date >= date('now') ORDER BY start_date ASC
+    ''', 'idx_study_schedule_user_end'),
+    ("weakest topic", '''
+        SELECT topic, correct_answers, total_attempts FROM study_progress
+        WHERE user_id = ? AND subject = ?
+        ORDER BY (CAST(correct_answers AS FLOAT) / total_attempts) ASC LIMIT 1
+    ''', 'COVERING INDEX idx_study_progress_user_attempts'),
+    ("topic accuracy", '''
+        SELECT subject, topic, correct_answers, total_attempts FROM study_progress
+        WHERE user_id = ? AND total_attempts > 0 ORDER BY total_attempts DESC LIMIT 10
+    ''', 'COVERING INDEX idx_study_progress_user_attempts'),
+    ("tip categories with counts", '''
+        SELECT category_name, description, (SELECT COUNT(*) FROM study_tips WHERE category_id = c.id)
+        FROM study_tip_categories c WHERE user_id = ? ORDER BY category_name
+    ''', 'idx_study_tips_category_created'),
+    ("tips in category", '''
+        SELECT t.id, t.tip_content, t.created_at FROM study_tips t
+        JOIN study_tip_categories c ON t.category_id = c.id
+        WHERE t.user_id = ? AND c.category_name = ? ORDER BY t.created_at DESC
+    ''', 'idx_study_tips_user_category'),
+    ("achievement progress", '''
+        SELECT current_count, completed FROM achievement_progress WHERE user_id = ? AND achievement_id = ?
+    ''', 'sqlite_autoindex_achievement_progress_1'),
+    ("global leaderboard", '''
+        SELECT user_id, xp, level FROM user_xp ORDER BY xp DESC LIMIT 10
+    ''', 'idx_user_xp_xp'),
+    ("period leaderboard", '''
+        SELECT user_id, xp FROM xp_rollups WHERE period = ? AND bucket = ? AND guild_id = ?
+        ORDER BY xp DESC LIMIT ?
+    ''', 'idx_xp_rollups_rank'),
+    ("guild membership", '''
+        SELECT 1 FROM guild_xp WHERE user_id = ?
+    ''', 'idx_guild_xp_user'),
+    ("expired cached responses", '''
+        DELETE FROM response_cache WHERE expires_at < ?
+    ''', 'idx_response_cache_expires'),
+    ("music search cache", '''
+        SELECT results, created_at FROM music_search_cache WHERE query = ?
+    ''', 'sqlite_autoindex_music_search_cache_1'),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _apply(conn: sqlite3.Connection) -> Tuple[int, List[int]]:
+    """Apply pending migrations on the writer connection; returns (starting version, applied)"""
+    start = conn.execute('PRAGMA user_version').fetchone()[0]
+    applied = []
+    for version, description, script in MIGRATIONS:
+        if version <= start:
+            continue
+        # DDL is not implicitly transactional in sqlite3, so open one explicitly per migration
+        conn.execute('BEGIN')
+        for statement in split_script(script):
+            conn.execute(statement)
+        conn.execute(f'PRAGMA user_version = {version}')
+        conn.commit()
+        applied.append(version)
+    return start, applied
+
+
+def _explain_all() -> List[Tuple[str, bool, str]]:
+    conn = sqlite3.connect(':memory:')
+    try:
+        _apply(conn)
+        results = []
+        for name, query, expected in QUERY_PLAN_CHECKS:
+            sql = ' '.join(query.split())
+            rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', (None,) * sql.count('?')).fetchall()
+            plan = '; '.join(row[3] for row in rows)
+            results.append((name, expected in plan, plan))
+        return results
+    finally:
+        conn.close()
+
+
+async def check_query_plans() -> List[Tuple[str, bool, str]]:
+    """EXPLAIN QUERY PLAN each known cog query and flag any that stop using their index"""
+    results = await asyncio.to_thread(_explain_all)
+    for name, ok, plan in results:
+        if not ok:
+            expected = next(index for check, _, index in QUERY_PLAN_CHECKS if check == name)
+            logger.warning(f"Query plan regression for '{name}' (expected {expected}): {plan}")
+    passed = sum(ok for _, ok, _ in results)
+    logger.info(f"Query plan checks: {passed}/{len(results)} using their expected index")
+    return results
+
+
+async def migrate(db: Database) -> int:
+    """Bring the database schema to the latest version; cheap to call again once done"""
+    if db.schema_version >= LATEST_VERSION:
+        return db.schema_version
+    start, applied = await db.transaction(_apply)
+    descriptions = {version: description for version, description, _ in MIGRATIONS}
+    for version in applied:
+        logger.info(f"Applied schema migration {version}: {descriptions[version]}")
+    db.schema_version = applied[-1] if applied else start
+    await check_query_plans()
+    return db.schema_version
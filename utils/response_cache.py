@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from utils.database import Database, get_database
+
+
+def normalize_prompt(text: str) -> str:
+    """Normalize prompt text so trivially different questions share a cache key"""
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.rstrip(' ?!.')
+
+
+class ResponseCache:
+    """Bounded in-memory LRU in front of the response_cache table for AI responses"""
+
+    def __init__(self, db: Database, max_entries: int = 512, default_ttl: float = 7 * 24 * 3600,
+                 purge_interval: float = 3600.0):
+        self.logger = logging.getLogger('discord_bot')
+        self.db = db
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.purge_interval = purge_interval
+        self._task: Optional[asyncio.Task] = None
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.metrics = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+
+    @staticmethod
+    def make_key(command: str, model: str, prompt: str) -> str:
+        raw = f"{command}|{model}|{normalize_prompt(prompt)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, command: str, expires_at: float, value: str):
+        self._memory[key] = (expires_at, value, command)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, command: str, model: str, prompt: str) -> Optional[str]:
+        """Return a cached response, checking memory first and then SQLite"""
+        key = self.make_key(command, model, prompt)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self.metrics['memory_hits'] += 1
+                return entry[1]
+            del self._memory[key]
+
+        try:
+            row = await self.db.fetchone(
+                'SELECT expires_at, response FROM response_cache WHERE cache_key = ?', (key,)
+            )
+        except Exception as e:
+            self.logger.error(f"Response cache read failed: {str(e)}")
+            row = None
+
+        if row and row[0] > now:
+            self._remember(key, command, row[0], row[1])
+            self.metrics['disk_hits'] += 1
+            return row[1]
+
+        self.metrics['misses'] += 1
+        return None
+
+    async def set(self, command: str, model: str, prompt: str, value: str, ttl: Optional[float] = None):
+        """Store a response in memory and persist it"""
+        if not value:
+            return
+        key = self.make_key(command, model, prompt)
+        expires_at = time.time() + (ttl or self.default_ttl)
+        self._remember(key, command, expires_at, value)
+        self.metrics['stores'] += 1
+        try:
+            await self.db.execute('''
+                INSERT OR REPLACE INTO response_cache
+                (cache_key, command, model, prompt, response, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, command, model, normalize_prompt(prompt), value, time.time(), expires_at))
+        except Exception as e:
+            self.logger.error(f"Response cache write failed: {str(e)}")
+
+    async def invalidate(self, command: Optional[str] = None, model: Optional[str] = None,
+                         prompt: Optional[str] = None) -> int:
+        """Drop one entry (command, model and prompt given), a whole command, or everything"""
+        key = self.make_key(command, model, prompt) if command and model and prompt else None
+        if key:
+            self._memory.pop(key, None)
+            result = await self.db.execute('DELETE FROM response_cache WHERE cache_key = ?', (key,))
+        elif command:
+            for cached_key in [k for k, entry in self._memory.items() if entry[2] == command]:
+                del self._memory[cached_key]
+            result = await self.db.execute('DELETE FROM response_cache WHERE command = ?', (command,))
+        else:
+            self._memory.clear()
+            result = await self.db.execute('DELETE FROM response_cache')
+        return result.rowcount
+
+    async def start(self):
+        """Purge expired responses now and then every purge_interval"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._purge_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _purge_loop(self):
+        while True:
+            try:
+                purged = await self.purge_expired()
+                if purged:
+                    self.logger.info(f"Purged {purged} expired cached responses")
+            except Exception as e:
+                self.logger.error(f"Error purging response cache: {str(e)}")
+            await asyncio.sleep(self.purge_interval)
+
+    async def purge_expired(self) -> int:
+        now = time.time()
+        for key in [k for k, entry in self._memory.items() if entry[0] <= now]:
+            del self._memory[key]
+        result = await self.db.execute('DELETE FROM response_cache WHERE expires_at < ?', (now,))
+        return result.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.metrics['memory_hits'] + self.metrics['disk_hits']
+        lookups = hits + self.metrics['misses']
+        return {
+            **self.metrics,
+            'memory_entries': len(self._memory),
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache(bot=None) -> ResponseCache:
+    """Return the bot's shared response cache, or a process-wide default one"""
+    global _default_cache
+    if bot is not None and getattr(bot, 'response_cache', None) is not None:
+        return bot.response_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache(get_database(bot))
+    return _default_cache
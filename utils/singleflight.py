@@ -0,0 +1,116 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamCall:
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        self.waiters = 0
+
+    def notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """Share one upstream call between concurrent callers asking for the same key"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._streams: Dict[Hashable, _StreamCall] = {}
+        self.metrics = {'leaders': 0, 'followers': 0, 'failures': 0}
+
+    def _forget(self, table: Dict[Hashable, Any], key: Hashable, call: Any):
+        if table.get(key) is call:
+            del table[key]
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await factory() once per key; overlapping callers get the same result or exception"""
+        while True:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call(asyncio.ensure_future(factory()))
+                self._calls[key] = call
+                # Results are never reused once the call settles; later callers start fresh
+                call.task.add_done_callback(lambda _, c=call: self._forget(self._calls, key, c))
+                self.metrics['leaders'] += 1
+            else:
+                self.metrics['followers'] += 1
+
+            call.waiters += 1
+            try:
+                return await asyncio.shield(call.task)
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if call.task.cancelled() and not (current and current.cancelling()):
+                    # The shared call was abandoned by its last waiter before we joined; retry
+                    continue
+                raise
+            except Exception:
+                self.metrics['failures'] += 1
+                raise
+            finally:
+                call.waiters -= 1
+                if call.waiters == 0 and not call.task.done():
+                    # Nobody is waiting any more, so stop paying for the upstream call
+                    self._forget(self._calls, key, call)
+                    call.task.cancel()
+
+    async def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Iterate factory() once per key and replay every chunk to all overlapping callers"""
+        call = self._streams.get(key)
+        if call is None:
+            call = _StreamCall()
+            self._streams[key] = call
+            call.task = asyncio.ensure_future(self._pump(key, call, factory))
+            self.metrics['leaders'] += 1
+        else:
+            self.metrics['followers'] += 1
+
+        call.waiters += 1
+        index = 0
+        try:
+            while True:
+                if index < len(call.chunks):
+                    yield call.chunks[index]
+                    index += 1
+                    continue
+                if call.done:
+                    if call.error is not None:
+                        self.metrics['failures'] += 1
+                        raise call.error
+                    return
+                await call.changed.wait()
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.done:
+                self._forget(self._streams, key, call)
+                call.task.cancel()
+
+    async def _pump(self, key: Hashable, call: _StreamCall, factory: Callable[[], AsyncIterator[Any]]):
+        try:
+            async for chunk in factory():
+                call.chunks.append(chunk)
+                call.notify()
+        except asyncio.CancelledError:
+            call.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            call.error = e
+        finally:
+            call.done = True
+            self._forget(self._streams, key, call)
+            call.notify()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.metrics, 'in_flight': len(self._calls) + len(self._streams)}
@@ -0,0 +1,171 @@
+import asyncio
+import heapq
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from utils.database import Database, get_database
+
+TimerHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class TimerService:
+    """Persistent one-shot timers: a heap in memory, the timers table on disk and a single loop task
+
+    A timer whose handler raises is retried up to max_retries times, retry_delay seconds later
+    and doubling each time, before it is dropped.
+    """
+
+    def __init__(self, db: Database, max_concurrent: int = 10, max_retries: int = 3, retry_delay: float = 30.0):
+        self.logger = logging.getLogger('discord_bot')
+        self.db = db
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.handlers: Dict[str, TimerHandler] = {}
+        self.heap: List[Tuple[float, int, str, Dict[str, Any]]] = []
+        self.queued: Set[int] = set()  # Ids in the heap
+        self.cancelled: Set[int] = set()  # Queued ids to skip when they reach the top
+        self.attempts: Dict[int, int] = {}  # Failed runs so far, for timers that have failed
+        self.metrics = {'scheduled': 0, 'fired': 0, 'failed': 0, 'retried': 0, 'max_lateness': 0.0}
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._running = set()
+        self._task: Optional[asyncio.Task] = None
+
+    # --- public API ---
+
+    def register(self, kind: str, handler: TimerHandler):
+        """Set the coroutine run when timers of this kind fire; call before start()"""
+        self.handlers[kind] = handler
+
+    async def schedule(self, kind: str, delay: float, payload: Dict[str, Any]) -> int:
+        """Persist a timer that fires after delay seconds and return its id"""
+        due = time.time() + delay
+        result = await self.db.execute(
+            'INSERT INTO timers (due, kind, payload, created_at) VALUES (?, ?, ?, ?)',
+            (due, kind, json.dumps(payload), time.time())
+        )
+        timer_id = result.lastrowid
+        self._push(due, timer_id, kind, payload)
+        self.metrics['scheduled'] += 1
+        return timer_id
+
+    async def cancel(self, timer_id: int):
+        """Drop a pending timer; it is skipped lazily when it reaches the top of the heap"""
+        if timer_id in self.queued:
+            self.cancelled.add(timer_id)
+        self.attempts.pop(timer_id, None)
+        await self.db.execute('DELETE FROM timers WHERE id = ?', (timer_id,))
+
+    async def start(self):
+        """Reload pending timers (overdue ones fire immediately) and start the loop"""
+        try:
+            rows = await self.db.fetchall('SELECT id, due, kind, payload, attempts FROM timers')
+            self.heap = [(due, timer_id, kind, json.loads(payload)) for timer_id, due, kind, payload, _ in rows]
+            heapq.heapify(self.heap)
+            self.queued = {timer_id for _, timer_id, _, _ in self.heap}
+            self.attempts = {timer_id: attempts for timer_id, _, _, _, attempts in rows if attempts}
+            self.logger.info(f"Timer service restored {len(self.heap)} pending timers")
+        except Exception as e:
+            self.logger.error(f"Error restoring timers: {str(e)}")
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Timers still being handled stay in the table and fire again after a restart
+        for task in list(self._running):
+            task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.metrics, 'pending': len(self.heap) - len(self.cancelled), 'running': len(self._running)}
+
+    # --- loop ---
+
+    def _push(self, due: float, timer_id: int, kind: str, payload: Dict[str, Any]):
+        heapq.heappush(self.heap, (due, timer_id, kind, payload))
+        self.queued.add(timer_id)
+        if self.heap[0][1] == timer_id:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            delay = self.heap[0][0] - time.time() if self.heap else None
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due, timer_id, kind, payload = heapq.heappop(self.heap)
+            self.queued.discard(timer_id)
+            if timer_id in self.cancelled:
+                self.cancelled.discard(timer_id)
+                continue
+            handler = self.handlers.get(kind)
+            if handler is None:
+                # Left in the table so a later run with the handler registered can fire it
+                self.logger.warning(f"No handler registered for timer kind '{kind}'")
+                continue
+
+            self.metrics['max_lateness'] = max(self.metrics['max_lateness'], time.time() - due)
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._fire(timer_id, kind, handler, payload))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, timer_id: int, kind: str, handler: TimerHandler, payload: Dict[str, Any]):
+        try:
+            await handler(payload)
+            self.metrics['fired'] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            attempts = self.attempts.get(timer_id, 0) + 1
+            if attempts <= self.max_retries:
+                delay = self.retry_delay * 2 ** (attempts - 1)
+                self.logger.warning(f"Timer {timer_id} ({kind}) failed, retrying in {delay:.0f}s: {str(e)}")
+                await self._retry(timer_id, kind, payload, attempts, time.time() + delay)
+                return
+            self.metrics['failed'] += 1
+            self.logger.error(f"Timer {timer_id} ({kind}) failed after {attempts} attempts: {str(e)}")
+        finally:
+            self._semaphore.release()
+        self.attempts.pop(timer_id, None)
+        await self.db.execute('DELETE FROM timers WHERE id = ?', (timer_id,))
+
+    async def _retry(self, timer_id: int, kind: str, payload: Dict[str, Any], attempts: int, due: float):
+        try:
+            result = await self.db.execute(
+                'UPDATE timers SET due = ?, attempts = ? WHERE id = ?', (due, attempts, timer_id)
+            )
+            if result.rowcount == 0:
+                return  # Cancelled while the handler ran
+        except Exception as e:
+            self.logger.error(f"Error rescheduling timer {timer_id}: {str(e)}")
+        self.attempts[timer_id] = attempts
+        self.metrics['retried'] += 1
+        self._push(due, timer_id, kind, payload)
+
+
+_default_timers: Optional[TimerService] = None
+
+
+def get_timer_service(bot=None) -> TimerService:
+    """Return the bot's shared timer service, or a process-wide default one"""
+    global _default_timers
+    if bot is not None and getattr(bot, 'timers', None) is not None:
+        return bot.timers
+    if _default_timers is None:
+        _default_timers = TimerService(get_database(bot))
+    return _default_timers
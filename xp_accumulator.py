@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.database import Database
+
+
+class XPAccumulator:
+    """Keep XP totals in memory for instant level-up checks and write the deltas behind in batches"""
+
+    def __init__(self, db: Database, calculate_level: Callable[[int], int], flush_interval: float = 5.0,
+                 max_pending: int = 500, max_cached: int = 20000):
+        self.logger = logging.getLogger('discord_bot')
+        self.db = db
+        self.calculate_level = calculate_level
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_cached = max_cached
+        self.totals: Dict[str, List[int]] = {}  # user_id -> [xp, level]
+        self.pending: Dict[str, List] = {}  # user_id -> [xp delta, last gain time]
+        self.guild_pending: Dict[Tuple[str, str], int] = {}  # (guild_id, user_id) -> xp delta
+        self.events: List[Tuple[str, str, int, float]] = []  # (guild_id, user_id, amount, time) for the ledger
+        # XP of loaded users who have no guild_xp row yet (earned before per-guild tracking); it is
+        # credited, once, to the first guild they gain XP in
+        self.unattributed: Dict[str, int] = {}
+        self.guild_listeners: List[Callable[[str, str, int], None]] = []  # called with (guild_id, user_id, gain)
+        self.metrics = {'messages': 0, 'flushed': 0, 'batches': 0, 'flush_failures': 0, 'flush_time': 0.0}
+        self._started = time.monotonic()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    # --- public API ---
+
+    async def add(self, user_id: str, amount: int, guild_id: Optional[str] = None) -> Tuple[int, int]:
+        """Apply XP in memory and queue the delta; returns (old level, new level)"""
+        entry = self.totals.get(user_id)
+        if entry is None:
+            entry = await self._load(user_id)
+
+        old_level = entry[1]
+        entry[0] += amount
+        entry[1] = self.calculate_level(entry[0])
+
+        delta = self.pending.setdefault(user_id, [0, 0.0])
+        delta[0] += amount
+        delta[1] = time.time()
+        self.events.append((guild_id or '', user_id, amount, delta[1]))
+        if guild_id is not None:
+            gain = amount + self.unattributed.pop(user_id, 0)
+            key = (guild_id, user_id)
+            self.guild_pending[key] = self.guild_pending.get(key, 0) + gain
+            for listener in self.guild_listeners:
+                listener(guild_id, user_id, gain)
+        self.metrics['messages'] += 1
+        if len(self.pending) >= self.max_pending:
+            self._wakeup.set()
+        return old_level, entry[1]
+
+    async def start(self):
+        self._started = time.monotonic()
+        self._stopping = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still pending"""
+        if self._task:
+            # Let an in-flight flush finish; cancelling it mid-write would drop its batch
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        guild_batch, self.guild_pending = self.guild_pending, {}
+        events, self.events = self.events, []
+        rows = [(user_id, xp, self.totals[user_id][1], gained_at) for user_id, (xp, gained_at) in batch.items()]
+        guild_rows = [(guild_id, user_id, xp) for (guild_id, user_id), xp in guild_batch.items()]
+        start = time.perf_counter()
+        try:
+            await self.db.transaction(lambda conn: self._write_batch(conn, rows, guild_rows, events))
+            self.metrics['flushed'] += len(rows)
+            self.metrics['batches'] += 1
+            self.metrics['flush_time'] += time.perf_counter() - start
+        except Exception as e:
+            # Merge the deltas back so the next flush retries them
+            for user_id, (xp, gained_at) in batch.items():
+                delta = self.pending.setdefault(user_id, [0, gained_at])
+                delta[0] += xp
+            for key, xp in guild_batch.items():
+                self.guild_pending[key] = self.guild_pending.get(key, 0) + xp
+            self.events[:0] = events
+            self.metrics['flush_failures'] += 1
+            self.logger.error(f"Error flushing XP for {len(rows)} users: {str(e)}")
+        self._evict()
+
+    def guild_pending_for(self, guild_id: str) -> Dict[str, int]:
+        """XP gained in a guild that has not been handed to the database yet, by user"""
+        return {user_id: xp for (guild, user_id), xp in self.guild_pending.items() if guild == guild_id}
+
+    def stats(self) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        batches = self.metrics['batches']
+        return {
+            **self.metrics,
+            'pending': len(self.pending),
+            'cached': len(self.totals),
+            'messages_per_second': self.metrics['messages'] / elapsed,
+            'avg_flush_ms': self.metrics['flush_time'] / batches * 1000 if batches else 0.0
+        }
+
+    # --- internals ---
+
+    async def _load(self, user_id: str) -> List[int]:
+        row = await self.db.fetchone('''
+            SELECT xp, level, EXISTS(SELECT 1 FROM guild_xp WHERE guild_xp.user_id = user_xp.user_id)
+            FROM user_xp WHERE user_id = ?
+        ''', (user_id,))
+        # Another message from the same user may have loaded it while we were waiting
+        entry = self.totals.get(user_id)
+        if entry is None:
+            entry = self.totals[user_id] = [row[0], row[1]] if row else [0, 1]
+            if row and not row[2] and row[0] > 0:
+                self.unattributed[user_id] = row[0]
+        return entry
+
+    def _evict(self):
+        """Drop cached totals that have nothing pending once the cache grows too large"""
+        excess = len(self.totals) - self.max_cached
+        if excess <= 0:
+            return
+        for user_id in [u for u in self.totals if u not in self.pending][:excess]:
+            del self.totals[user_id]
+            self.unattributed.pop(user_id, None)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _write_batch(self, conn: sqlite3.Connection, rows: List[Tuple[str, int, int, float]],
+                     guild_rows: List[Tuple[str, str, int]], events: List[Tuple[str, str, int, float]]):
+        conn.executemany('''
+            INSERT INTO user_xp (user_id, xp, level, last_xp_gain)
+            VALUES (?, ?, ?, datetime(?, 'unixepoch'))
+            ON CONFLICT(user_id) DO UPDATE SET
+                xp = xp + excluded.xp,
+                level = excluded.level,
+                last_xp_gain = excluded.last_xp_gain
+        ''', rows)
+        conn.executemany('''
+            INSERT INTO guild_xp (guild_id, user_id, xp) VALUES (?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET xp = xp + excluded.xp
+        ''', guild_rows)
+        conn.executemany(
+            'INSERT INTO xp_events (guild_id, user_id, amount, created_at) VALUES (?, ?, ?, ?)', events
+        )
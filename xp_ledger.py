@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from utils.database import Database
+from utils.migrations import migrate
+
+# Bucket label for an event timestamp, as SQLite expressions and the matching Python for "now"
+PERIODS = {
+    'day': "date(created_at, 'unixepoch')",
+    'week': "date(created_at, 'unixepoch', 'weekday 0', '-6 days')",  # Monday of the week
+    'month': "strftime('%Y-%m', created_at, 'unixepoch')",
+}
+
+# How long rolled-up data is kept before compaction drops it; month buckets are kept forever
+EVENT_RETENTION_DAYS = 14
+BUCKET_RETENTION_DAYS = {'day': 62, 'week': 730}
+
+
+def current_bucket(period: str, now: Optional[float] = None) -> str:
+    """Bucket label for the period containing now (UTC), matching PERIODS"""
+    day = datetime.fromtimestamp(now if now is not None else time.time(), tz=timezone.utc).date()
+    if period == 'day':
+        return day.isoformat()
+    if period == 'week':
+        return (day - timedelta(days=day.weekday())).isoformat()
+    if period == 'month':
+        return day.strftime('%Y-%m')
+    raise ValueError(f"Unknown period: {period}")
+
+
+class XPLedger:
+    """Append-only XP events rolled up into day, week and month buckets, with bounded storage"""
+
+    def __init__(self, db: Database, rollup_interval: float = 300.0):
+        self.logger = logging.getLogger('discord_bot')
+        self.db = db
+        self.rollup_interval = rollup_interval
+        self.metrics = {'rollups': 0, 'events_rolled': 0, 'events_compacted': 0, 'buckets_compacted': 0}
+        self._rollup_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def setup_database(self):
+        """Make sure the event log, the rollup table and the rollup watermark exist"""
+        try:
+            await migrate(self.db)
+        except Exception as e:
+            self.logger.error(f"Error setting up XP ledger database: {str(e)}")
+
+    # --- public API ---
+
+    async def start(self):
+        await self.setup_database()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def rollup(self) -> int:
+        """Fold events newer than the watermark into every period's buckets; returns events rolled"""
+        async with self._rollup_lock:
+            rolled = await self.db.transaction(self._rollup)
+        if rolled:
+            self.metrics['rollups'] += 1
+            self.metrics['events_rolled'] += rolled
+        return rolled
+
+    async def compact(self, now: Optional[float] = None):
+        """Drop rolled-up events and old day/week buckets past their retention"""
+        now = now if now is not None else time.time()
+        async with self._rollup_lock:
+            events, buckets = await self.db.transaction(lambda conn: self._compact(conn, now))
+        self.metrics['events_compacted'] += events
+        self.metrics['buckets_compacted'] += buckets
+
+    async def top(self, guild_id: str, period: str, count: int = 10) -> List[Tuple[str, int]]:
+        return await self.db.fetchall('''
+            SELECT user_id, xp FROM xp_rollups
+            WHERE period = ? AND bucket = ? AND guild_id = ?
+            ORDER BY xp DESC
+            LIMIT ?
+        ''', (period, current_bucket(period), guild_id, count))
+
+    async def rank(self, guild_id: str, period: str, user_id: str) -> Optional[Tuple[int, int]]:
+        """(rank, xp) of a user in the current bucket, or None if they have no XP in it"""
+        bucket = current_bucket(period)
+        row = await self.db.fetchone('''
+            SELECT xp FROM xp_rollups
+            WHERE period = ? AND bucket = ? AND guild_id = ? AND user_id = ?
+        ''', (period, bucket, guild_id, user_id))
+        if row is None:
+            return None
+        ahead = await self.db.fetchone('''
+            SELECT COUNT(*) FROM xp_rollups
+            WHERE period = ? AND bucket = ? AND guild_id = ? AND xp > ?
+        ''', (period, bucket, guild_id, row[0]))
+        return ahead[0] + 1, row[0]
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.metrics)
+
+    # --- internals (run on the writer thread) ---
+
+    def _rollup(self, conn: sqlite3.Connection) -> int:
+        last = conn.execute('SELECT last_event_id FROM xp_rollup_state WHERE id = 1').fetchone()[0]
+        high = conn.execute('SELECT MAX(id) FROM xp_events').fetchone()[0]
+        if high is None or high <= last:
+            return 0
+        for period, bucket in PERIODS.items():
+            conn.execute(f'''
+                INSERT INTO xp_rollups (period, bucket, guild_id, user_id, xp)
+                SELECT ?, {bucket}, guild_id, user_id, SUM(amount)
+                FROM xp_events
+                WHERE id > ? AND id <= ?
+                GROUP BY 2, 3, 4
+                ON CONFLICT(period, bucket, guild_id, user_id) DO UPDATE SET xp = xp + excluded.xp
+            ''', (period, last, high))
+        rolled = conn.execute('SELECT COUNT(*) FROM xp_events WHERE id > ? AND id <= ?', (last, high)).fetchone()[0]
+        conn.execute('UPDATE xp_rollup_state SET last_event_id = ? WHERE id = 1', (high,))
+        return rolled
+
+    def _compact(self, conn: sqlite3.Connection, now: float) -> Tuple[int, int]:
+        last = conn.execute('SELECT last_event_id FROM xp_rollup_state WHERE id = 1').fetchone()[0]
+        events = conn.execute(
+            'DELETE FROM xp_events WHERE id <= ? AND created_at < ?',
+            (last, now - EVENT_RETENTION_DAYS * 86400)
+        ).rowcount
+        buckets = 0
+        for period, days in BUCKET_RETENTION_DAYS.items():
+            buckets += conn.execute(
+                'DELETE FROM xp_rollups WHERE period = ? AND bucket < ?',
+                (period, current_bucket(period, now - days * 86400))
+            ).rowcount
+        return events, buckets
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.rollup_interval)
+            try:
+                await self.rollup()
+                await self.compact()
+            except Exception as e:
+                self.logger.error(f"Error rolling up XP events: {str(e)}")